@@ -17,9 +17,25 @@ Modifications:
                Added error checking for times -KP
     3/11/2023: Add neighborhood and phone number input to newFB -KS
                Added validate phone number function -KS
+    10/18/2026: Replaced the two import-time connections with cursors borrowed from the shared connection pool
+                Run every query as a named prepared statement from queryffy.py
+                New food bank and food item IDs come from allocateIds() instead of MAX(id) + 1
+                Uploaded food items are written with the bulk loader in importffy.py
+                Data log export streams through exportffy.py in chunks, with optional gzip and a progress bar
+                Data log export runs on a worker thread; its progress window is modal and Export is disabled meanwhile
+                Opening times are saved to opening_hours as one row per open day, in minutes
+                Saving a food bank invalidates the schedule index in scheduleffy.py
+                Locations come from the metadata cache in utilffy; saving a food bank invalidates it
+                Data log searches run on a worker thread through taskffy.py, with a busy indicator
+                Both tables are tableffy.PagedTable, loading keyset pages of rows as the user scrolls
+                Data log item search matches any part of the name, case-insensitively, through searchffy.py
+                Data log search as you type: searches after a short pause, narrowing loaded rows when they can
+                Added Trends tab: daily and weekly outgoing totals per item, category and food bank (trendffy.py)
+                Saving a new food bank imports its items before writing the bank, so IDs are reserved before the first write
 
 Table used:
     Outgoing
+    Outgoing rollup
     Food Banks
     Food Items
 
@@ -32,21 +48,20 @@ Notes:
         - FB: Food Bank
 """
 from utilffy import *
+import queryffy as sql
 from tkinter import filedialog
 import timepicker as time           #necessary for time widget in addFB screen
+from importffy import importItems   #bulk loader for the uploaded food item file
+from exportffy import exportOutgoing, exportFilename    #streaming export of the outgoing log
+import scheduleffy                  #opening hours index, reloaded after new hours are saved
+from taskffy import BackgroundQueries, busyIndicator, Debouncer    #runs data log searches off the UI thread
+from tableffy import PagedTable, pageAfter                  #tables that load pages of rows as the user scrolls
+from searchffy import itemFilter, narrows, rowMatcher       #indexed item name search
+import trendffy                                             #outgoing trends read from the rollup tables
 import csv
 import os
 import datetime
 
-
-FBconnection = connectToDatabase()
-#FBconnection = connectToDatabase("kp", "pass", "127.0.0.1", 3306, "foodforyou")
-FBcursor = FBconnection.cursor()
-
-Dconnection = connectToDatabase()
-#Dconnection = connectToDatabase("kp", "pass", "127.0.0.1", 3306, "foodforyou")
-Dcursor = Dconnection.cursor()
-
 class FBView:
     """FBView: class
         GUI which allows the user to insert a new food bank, and view the newly inserted data.
@@ -62,30 +77,37 @@ class FBView:
                 Grabs data in database of the newly inserted food bank, and places in table
                 Input: newFBID is the new food bank
             """
-            FBcursor.execute(                   # selects all rows/columns from food item table with the food bank location which is known from the new FB ID
-                f"SELECT fi.Item_name, fi.Quantity, fi.Units, fi.fd_id, fb.Location from food_item fi join food_bank fb using(fb_id) where fb.fb_id = {newFBID}")
-            rows = FBcursor.fetchall()          # stores query as list
+            def page(lastRow, limit):
+                with getPool().connection() as FBconnection:
+                    # selects the next rows from food item table with the food bank location which is known from the new FB ID
+                    return sql.fetch(FBconnection, "bank.items_page", (newFBID,) + pageAfter(lastRow, False) + (limit,))
 
-            # Delete the old table and insert each row in the current database to accomplish refresh
-            if rows != 0:
-                table.delete(*table.get_children())
-                for row in rows:
-                    table.insert('', END, values=row)
+            def count():
+                with getPool().connection() as FBconnection:
+                    return sql.fetch(FBconnection, "bank.items_count", (newFBID,))[0][0]
+
+            # replaces the table's rows with the first page, later pages load as the user scrolls
+            table.load(page, count)
 
         #================== user widgets =============================================================
         AddFBButton = ttk.Button(self.root, text="New Food Bank +", width=20, command=self.addFB)
         AddFBButton.place(x=675, y=200)
 
+        # shows that the table is loading
+        statusLabel = ttk.Label(self.root, text="")
+        statusLabel.place(x=675, y=240)
+        self.queries = BackgroundQueries(self.root, busyIndicator(self.root, statusLabel, "Loading..."))   #loads pages off the UI thread
+
         #================== view table from database ==================================================
             # (credit due to Jerry Pi)
         viewFrame = Frame(self.root, bd=5, relief='ridge', bg='wheat')   #frame to hold the table
         viewFrame.place(x=30, y=110, width=600, height=350)
         xScroll = Scrollbar(viewFrame, orient=HORIZONTAL)   #allows the user to scroll
         yScroll = Scrollbar(viewFrame, orient=VERTICAL)
-        table = ttk.Treeview(viewFrame, columns=(           #sets up the table
+        table = PagedTable(viewFrame, columns=(             #sets up the table
             'item_to_filter', 'quantity_to_filter', 'units', 'fid_to_filter', 'location_to_filter'),
                              xscrollcommand=xScroll.set,
-                             yscrollcommand=yScroll.set)
+                             scrollbar=yScroll, runner=self.queries)     #first page, later pages and count load on a worker thread
         #table column headers
         table.heading("item_to_filter", text="item")
         table.heading("quantity_to_filter", text="quantity")
@@ -244,66 +266,35 @@ class FBView:
                 if newloc == None:              #validates they insert a food bank location
                     messagebox.showerror("ERROR", "Please input a Food Bank location")
 
-                FBcursor.execute(f"select MAX(fb.fb_ID) from food_bank fb")     #grabs max exisiting food bank id
-                maxfb_ID = FBcursor.fetchall()                                  #holds such above
-                FBcursor.execute(f"select MAX(fi.fd_ID) from food_item fi")     #grabs max exisiting food item id
-                maxfd_ID = FBcursor.fetchall()                                  #holds such above
-                if (maxfd_ID != []):   #creates a new id for the new food bank
-                    maxfd_ID = int(maxfd_ID[0][0]) + 1
-                else:                                       # if no existing food bank already
-                    maxfd_ID = 1
-                newfb_ID = None
-                if (maxfb_ID != []):     #creates a new id for the new food item
-                    newfb_ID = int(maxfb_ID[0][0]) + 1
-                else:                   # if no existing food item already
-                    newfb_ID = 1
-                FBcursor.execute(f"select * from food_bank fb where fb.Location = '{FBName}'")
-                locationCheck = FBcursor.fetchall()         #pulls existing food banks with such name
-                FBcursor.execute(f"select * from food_bank fb where fb.Address = '{newloc}'")
-                addressCheck = FBcursor.fetchall()          #pulls existing food banks with such address
-                if(openTimes != None):                      #verifies not all days are closed
-                    if (locationCheck == [] and addressCheck == []):        #verifies no similar food bank name or location already exists
-                        # adds food bank to database
-                        FBcursor.execute(f"insert into foodforyou.food_bank values('{FBName}', " + \
-                                        f"'{newloc}', '{neighborhood}', '{phone_number}', '{newfb_ID}')")
-                        FBcursor.execute(
-                            f"insert into foodforyou.hours values ('{newfb_ID}', '{openTimes[0]}', '{openTimes[1]}'," + \
-                            f"'{openTimes[2]}', '{openTimes[3]}','{openTimes[4]}', '{openTimes[5]}'," + \
-                            f"'{openTimes[6]}', '{openTimes[7]}','{openTimes[8]}', '{openTimes[9]}'," + \
-                            f"'{openTimes[10]}', '{openTimes[11]}','{openTimes[12]}', '{openTimes[13]}')")
-                        nonlocal filedata
-                        # imports data from file to Food Item database
-                        for line in filedata:
-                            # grabs row from data from csv -> will become a new entry in database
-                            item_name = line[0]
-                            category = line[1]
-                            quantity = int(line[2])
-                            units = line[3]
-
-                            FBcursor.execute(f"select * from food_item fi where fi.Item_name='{item_name}' and fi.units = '{units}' and fi.category = '{category}' and fi.location = '{FBName}'")
-                                    #checks by (union by item_name, units, category, FBName)
-                            duplicateCheck = FBcursor.fetchall()
-                            #comibines duplicate food items
-                            if(duplicateCheck==[]):  #no duplicates
-                                FBcursor.execute(
-                                    f"insert into foodforyou.food_item values ('{item_name}', '{category}', {quantity}, '{units}', '{FBName}', {int(newfb_ID)}, {maxfd_ID})")
-                                maxfd_ID += 1       #creates a new row in data base, -> creates new food item ID
-                            else:
-                                duplicateID = duplicateCheck[0][6]      #merge by item id
-                                insertQuantity = quantity+int(duplicateCheck[0][2])     #merge quantities
-                                FBcursor.execute(       #change quantity of item id
-                                    f"update foodforyou.food_item set Quantity={insertQuantity} where fd_ID = {duplicateID}"
-                                )
-
-                        FBconnection.commit()       # modifies the database with such changes
-                        fetchData(newfb_ID)         # resets the GUI table
-                        newFBScreen.destroy()       # closes out window
-                    else:       # error checking -> doesn't allow user to change, still views FB screen
-                        messagebox.showerror("ERROR", "Food bank with this name or address appears to already exist.")
+                with getPool().connection() as FBconnection:     #borrow a connection for this save
+                    locationCheck = sql.fetch(FBconnection, "bank.by_name", (FBName,))         #pulls existing food banks with such name
+                    addressCheck = sql.fetch(FBconnection, "bank.by_address", (newloc,))       #pulls existing food banks with such address
+                    if(openTimes != None):                      #verifies not all days are closed
+                        if (locationCheck == [] and addressCheck == []):        #verifies no similar food bank name or location already exists
+                            nonlocal filedata
+                            newfb_ID = allocateIds("food_bank")         #reserves the new food bank's id
+                            # imports data from file to Food Item database in batches,
+                                # combining duplicate food items (by item_name, units, category)
+                                # first, so its food item ids are reserved before this transaction writes (SQLite has one writer)
+                            imported = importItems(FBconnection, int(newfb_ID), FBName, filedata)
+                            # adds food bank to database
+                            sql.execute(FBconnection, "bank.insert", (FBName, newloc, neighborhood, phone_number, newfb_ID))
+                            sql.executeMany(FBconnection, "hours.insert", hoursToRows(newfb_ID, openTimes))   # one row per open day
+
+                            FBconnection.commit()       # modifies the database with such changes
+                            scheduleffy.invalidate()    # new opening hours: rebuild the schedule index on next use
+                            invalidateMetadata()        # new location, neighborhood and possibly items/categories
+                            if filedata:
+                                print(f"Imported {imported['rows']} rows as {imported['inserted']} food items "
+                                      f"({imported['merged']} merged) at {imported['rows_per_second']:,.0f} rows/s")
+                            fetchData(newfb_ID)         # resets the GUI table
+                            newFBScreen.destroy()       # closes out window
+                        else:       # error checking -> doesn't allow user to change, still views FB screen
+                            messagebox.showerror("ERROR", "Food bank with this name or address appears to already exist.")
+                            return
+                    else:
+                        messagebox.showerror("ERROR", "One of the open times is after the close time.")
                         return
-                else:
-                    messagebox.showerror("ERROR", "One of the open times is after the close time.")
-                    return
             else:
                 messagebox.showerror("ERROR", "The food bank times are all closed, a food bank must have at least one open day to be added.")
                 return
@@ -431,6 +422,12 @@ class FBView:
                 return False
         return True
 
+    def close(self):
+        """ close()
+        Stops the table's background page loads; called before the window closes the connection pool.
+        """
+        self.queries.shutdown(wait=True)
+
 
 class DataView:
     """DataView: class
@@ -439,26 +436,43 @@ class DataView:
     def __init__(self, parent):
         self.root = Frame(parent, bg="white")
 
-        self.locations = fetchLocations(Dcursor)    #all exisitng food bank locations
+        self.locations = fetchLocations()       #all exisitng food bank locations (cached)
         # ========= holds user input of the search criteria =========
         self.foodItemSearchText = StringVar()   #food item
         self.ascSort = BooleanVar()             #ascending sort (true: asc, false: desc)
         self.loc_to_update = StringVar()        #food bank location
+        self.compressExport = BooleanVar()      #gzip the export (true: .csv.gz, false: .csv)
+        self.shownCriteria = None               #search criteria of the rows currently in the table
 
 
         def fetchData():
-            search() #call search function to store all entries in cursor
-            rows = Dcursor.fetchall() #set rows from cursor
-
-            # Delete the old table and insert each row in the current database to accomplish refresh
-            if rows != 0:
-                table.delete(*table.get_children())
-
-                for row in rows: #populate table with new entries
-                    table.insert('', END, values=row)
+            criteria = searchCriteria() #read the search boxes on the UI thread
+            self.shownCriteria = criteria
+            # loads the first page on a worker thread, later pages load as the user scrolls;
+                # a newer search replaces one still running
+            table.load(lambda lastRow, limit: search(criteria, lastRow, limit), lambda: countMatches(criteria))
+
+        def liveSearch():
+            """searches the data log as the user types (called once typing pauses), filtering the loaded rows
+                without a query when the new text only narrows a fully loaded search"""
+            try:
+                criteria = searchCriteria()
+            except ValueError:
+                return #the item ID box does not hold a whole number yet
+            shown = self.shownCriteria
+            if criteria == shown:
+                return #nothing changed
+            item, location, fd_id, ascending = criteria
+            if (shown is not None and shown[1] == location and shown[3] == ascending
+                    and narrows((shown[0], shown[2]), (item, fd_id))):
+                keep = rowMatcher(item, fd_id)
+                if table.narrow(lambda row: keep(row[0], row[3])):
+                    self.shownCriteria = criteria
+                    return
+            fetchData()
 
-        def search():
-            """searches Outgoing Database for user input search criteria"""
+        def searchCriteria():
+            """reads the search boxes and returns (item, location, fd_id, ascending) for search()"""
             item = ItemSearch.get() #get item name from search box
             locationBool = True #initialize location bool to true
             itemBool = True #initialize item bool to true
@@ -473,34 +487,83 @@ class DataView:
                 fd_id = "%"
             else:
                 fd_id = int(fd_id.strip())
-            if (ascending): #if ascending is specified, execute this query
-                Dcursor.execute(
-                    f"SELECT fi.Item_name, fi.Quantity, fi.Units, fi.fd_id, fb.Location from outgoing fi join food_bank fb using(fb_id) where fi.Item_name like '{item}' and fb.location like '{location}' and fi.fd_id like '{fd_id}' order by fi.Quantity ASC")
-            else: #if ascending not specified use this query
-                Dcursor.execute(
-                    f"SELECT fi.Item_name, fi.Quantity, fi.Units, fi.fd_id, fb.Location from outgoing fi join food_bank fb using(fb_id) where fi.Item_name like '{item}' and fb.location like '{location}' and fi.fd_id like '{fd_id}'")
+            return item, location, fd_id, ascending
+
+        def search(criteria, lastRow, limit):
+            """searches Outgoing Database for the page of up to 'limit' rows after 'lastRow' (None for the first
+                page) matching the user's search criteria; runs on a worker thread"""
+            item, location, fd_id, ascending = criteria
+            filterName, filters = itemFilter(item, fd_id) #indexed substring/prefix match of the item name
+            filters += (location,)
+            with getPool().connection() as Dconnection:
+                if (ascending): #if ascending is specified, page by quantity then food id
+                    return sql.fetch(Dconnection, f"datalog.search_page_asc:{filterName}", filters + pageAfter(lastRow, True) + (limit,))
+                else: #if ascending not specified page by food id
+                    return sql.fetch(Dconnection, f"datalog.search_page:{filterName}", filters + pageAfter(lastRow, False) + (limit,))
+
+        def countMatches(criteria):
+            """returns the number of data log rows matching the search criteria; runs on a worker thread"""
+            item, location, fd_id, ascending = criteria
+            filterName, filters = itemFilter(item, fd_id)
+            with getPool().connection() as Dconnection:
+                return sql.fetch(Dconnection, f"datalog.search_count:{filterName}", filters + (location,))[0][0]
 
 
         def export():
-            """Exports Outgoing data base as a csv"""
-            Dcursor.execute("SELECT * from outgoing")       #selects everything from database
-            result = Dcursor.fetchall()                     #calls such query
-            toWrite = []                   #list to hold data from database, which will be used to import to csv
-
+            """Exports Outgoing data base as a csv, streaming it in chunks and showing progress"""
             now = datetime.datetime.now()           #take current time
             currentTime = now.strftime("%H%M%S")           #reformats to hours, minute, second
-            filename = "FoodForYou_Export_" + currentTime + ".csv"      #creates new file name for export
-
-            if (result):            #if query is not empty
-                toWrite.append(["Item_name", "Category", "Quantity", "Units", "Location", "fb_ID", "fd_ID"]) #sets headers of csv
-                for row in result:  #appends each row in database to toWrite
-                    toWrite.append(row)
-                with open(filename, 'w', newline='\n') as csvF:     # creates filename (will overwrite if file is already existing in directory, else creates new file in directory)
-                    csvw = csv.writer(csvF, quotechar='"', delimiter=',')   #removes quotes and delimites by commas
-                    for line in toWrite:
-                        csvw.writerow(line)         #writes data as line
-            else:
-                messagebox.showerror("ERROR", "There are no entries in the database.")
+            filename = exportFilename(currentTime, self.compressExport.get())     #creates new file name for export
+
+            compress = self.compressExport.get()    #read on the Tk thread, before the export starts
+
+            # small modal window with a progress bar: the rest of the view waits until the export is done
+            progressScreen = Toplevel(self.root)
+            progressScreen.title("Exporting")
+            progressScreen.transient(self.root)
+            progressScreen.protocol("WM_DELETE_WINDOW", lambda: None)    #stays open until the export ends
+            progressText = StringVar(value="Exporting to " + filename)
+            ttk.Label(progressScreen, textvariable=progressText).pack(padx=20, pady=(15, 5))
+            progressBar = ttk.Progressbar(progressScreen, length=300, mode='determinate')
+            progressBar.pack(padx=20, pady=(0, 15))
+            progressScreen.grab_set()
+            exportButton.configure(state=DISABLED)
+
+            progress = {"written": 0, "total": 0}   #set by the worker after every chunk, shown by the Tk thread
+            refresh = [None]                        #after() id of the next progress redraw
+
+            def showProgress():
+                if progress["total"]:
+                    progressBar.configure(maximum=progress["total"], value=progress["written"])
+                    progressText.set(f"Exporting to {filename}: {progress['written']:,} of {progress['total']:,} rows")
+                refresh[0] = progressScreen.after(100, showProgress)
+
+            def work():
+                def record(written, total):
+                    progress.update(written=written, total=total)
+                with getPool().connection() as Dconnection:
+                    # (will overwrite if file is already existing in directory, else creates new file in directory)
+                    return exportOutgoing(Dconnection, filename, compress, progress=record)
+
+            def finish():
+                progressScreen.after_cancel(refresh[0])
+                progressScreen.grab_release()
+                progressScreen.destroy()
+                exportButton.configure(state=NORMAL)
+
+            def done(result):
+                finish()
+                if result["rows"]:          #if query is not empty
+                    print(f"Exported {result['rows']} rows to {filename} at {result['rows_per_second']:,.0f} rows/s")
+                else:
+                    messagebox.showerror("ERROR", "There are no entries in the database.")
+
+            def failed(error):
+                finish()
+                messagebox.showerror("ERROR", f"The export failed: {error}")
+
+            showProgress()
+            self.exports.submit("export", work, done, failed)
 
         #====================== user input widgets ======================
         ttk.Label(self.root, text="Search by item").place(x=675, y=110)
@@ -514,6 +577,11 @@ class DataView:
         IDSearch = ttk.Entry(self.root, width=25)
         IDSearch.place(x=675, y=190)
 
+        # searches as the user types, once typing pauses
+        self.typing = Debouncer(self.root, liveSearch)
+        ItemSearch.bind("<KeyRelease>", self.typing)
+        IDSearch.bind("<KeyRelease>", self.typing)
+
         # prompts for user to search by location
         ttk.Label(self.root, text="Sort by location").place(x=675, y=230)
         LocationFilter = ttk.Combobox(self.root, values=self.locations)
@@ -532,6 +600,17 @@ class DataView:
         exportButton = ttk.Button(self.root, text="Export data", width=15, command=export)
         exportButton.place(x=675, y=420)
 
+        # compresses the export with gzip
+        CompressButton = ttk.Checkbutton(self.root, text="Compress export (gzip)", onvalue=True,
+                                         offvalue=False, variable=self.compressExport)
+        CompressButton.place(x=675, y=455)
+
+        # shows that a search is running
+        statusLabel = ttk.Label(self.root, text="")
+        statusLabel.place(x=675, y=385)
+        self.queries = BackgroundQueries(self.root, busyIndicator(self.root, statusLabel))   #runs searches off the UI thread
+        self.exports = BackgroundQueries(self.root, workers=1)      #runs the export off the UI thread
+
         # ================== view table =============================================================
         # (credit due to Jerry Pi)
         viewFrame = Frame(self.root, bd=5, relief='ridge', bg='wheat')   #frame to hold data
@@ -539,10 +618,10 @@ class DataView:
 
         xScroll = Scrollbar(viewFrame, orient=HORIZONTAL)       #allows user to scroll through table
         yScroll = Scrollbar(viewFrame, orient=VERTICAL)
-        table = ttk.Treeview(viewFrame, columns=(
+        table = PagedTable(viewFrame, columns=(
             'item_to_filter', 'quantity_to_filter', 'units', 'fid_to_filter', 'location_to_filter'),
                              xscrollcommand=xScroll.set,
-                             yscrollcommand=yScroll.set)      #table to display database
+                             scrollbar=yScroll, runner=self.queries)      #table to display database, loaded a page at a time
 
         # creates column headers
         table.heading("item_to_filter", text="item")
@@ -562,10 +641,135 @@ class DataView:
         fetchData()
         table.pack(fill=BOTH, expand=1)
 
+    def close(self):
+        """ close()
+        Drops a search waiting for typing to pause and stops the searches, page loads and export running in the
+            background (an export stopped midway leaves no file); called before the window closes the connection pool.
+        """
+        self.typing.cancel()
+        self.queries.shutdown(wait=True)
+        self.exports.shutdown(wait=True)
+
+class TrendsView:
+    """TrendsView: class
+        GUI which shows the items, categories or food banks with the most outgoing quantity over a range of days
+        or weeks, and a bar chart of the outgoing quantity per day/week of the selected one (or of everything).
+    """
+    def __init__(self, parent):
+        self.root = Frame(parent, bg="white")
+
+        # ========= holds user input of the trend shown =========
+        self.dimension = StringVar(value="Category")        #what the totals are grouped by
+        self.range = StringVar(value="Last 12 weeks")       #range and period of the totals
+        self.rows = {}                                      #top list item id -> rollup key
+
+        def fetchData(*args):
+            """loads the top list and the overall chart for the chosen grouping and range on a worker thread"""
+            dimension = trendffy.dimensions[self.dimension.get()]
+            rangeName = self.range.get()
+
+            def work():
+                with getPool().connection() as Tconnection:
+                    return (trendffy.topKeys(Tconnection, dimension, rangeName),
+                            trendffy.series(Tconnection, dimension, None, rangeName))
+
+            def show(result):
+                top, points = result
+                table.delete(*table.get_children())
+                self.rows = {}
+                for key, label, quantity, events in top:
+                    self.rows[table.insert('', END, values=(label, quantity, events))] = key
+                drawChart(points, "All outgoing")
+
+            self.queries.submit("trends", work, show)
+
+        def showSeries(e):
+            """charts the outgoing quantity of the selected row"""
+            selected = table.focus()
+            if selected not in self.rows:
+                return
+            dimension = trendffy.dimensions[self.dimension.get()]
+            rangeName = self.range.get()
+            key, label = self.rows[selected], table.item(selected)['values'][0]
+
+            def work():
+                with getPool().connection() as Tconnection:
+                    return trendffy.series(Tconnection, dimension, key, rangeName)
+
+            self.queries.submit("trends.series", work, lambda points: drawChart(points, label))
+
+        def drawChart(points:list, title:str):
+            """draws one bar per period of 'points' ((period start, quantity, events) rows) on the chart"""
+            chart.delete("all")
+            width, height = int(chart["width"]), int(chart["height"])
+            top = max((quantity for start, quantity, events in points), default=0) or 1
+            barWidth = (width - 20) / max(len(points), 1)
+            chart.create_text(10, 10, anchor="nw", text=f"{title} (max {top})", font=(font, 9))
+            for i, (start, quantity, events) in enumerate(points):
+                x = 10 + i * barWidth
+                barHeight = (height - 50) * quantity / top
+                chart.create_rectangle(x + 1, height - 20 - barHeight, x + barWidth - 1, height - 20,
+                                       fill="wheat", outline="tan")
+            if points:
+                chart.create_text(10, height - 5, anchor="sw", text=str(points[0][0]), font=(font, 8))
+                chart.create_text(width - 10, height - 5, anchor="se", text=str(points[-1][0]), font=(font, 8))
+
+        #====================== user input widgets ======================
+        ttk.Label(self.root, text="Trend by").place(x=675, y=110)
+        DimensionSelect = ttk.Combobox(self.root, values=list(trendffy.dimensions), textvariable=self.dimension,
+                                       state="readonly")
+        DimensionSelect.place(x=675, y=130)
+        DimensionSelect.bind("<<ComboboxSelected>>", fetchData)
+
+        ttk.Label(self.root, text="Range").place(x=675, y=170)
+        RangeSelect = ttk.Combobox(self.root, values=list(trendffy.ranges), textvariable=self.range,
+                                   state="readonly")
+        RangeSelect.place(x=675, y=190)
+        RangeSelect.bind("<<ComboboxSelected>>", fetchData)
+
+        # reloads the totals
+        RefreshButton = ttk.Button(self.root, text="Refresh", width=15, command=fetchData)
+        RefreshButton.place(x=675, y=350)
+
+        # shows that the totals are loading
+        statusLabel = ttk.Label(self.root, text="")
+        statusLabel.place(x=675, y=385)
+        self.queries = BackgroundQueries(self.root, busyIndicator(self.root, statusLabel, "Loading..."))
+
+        # ================== top list and chart =============================================================
+        viewFrame = Frame(self.root, bd=5, relief='ridge', bg='wheat')   #frame to hold the top list
+        viewFrame.place(x=30, y=110, width=600, height=170)
+        yScroll = Scrollbar(viewFrame, orient=VERTICAL)
+        table = ttk.Treeview(viewFrame, columns=('name', 'quantity', 'events'), yscrollcommand=yScroll.set)
+        yScroll.config(command=table.yview)
+        yScroll.pack(side=RIGHT, fill=Y)
+        table.heading("name", text="name")
+        table.heading("quantity", text="quantity out")
+        table.heading("events", text="decreases")
+        table.column("name", width=250)
+        table.column("quantity", width=100)
+        table.column("events", width=100)
+        table['show'] = 'headings'
+        table.bind("<<TreeviewSelect>>", showSeries)
+        table.pack(fill=BOTH, expand=1)
+
+        chart = Canvas(self.root, width=600, height=170, bg="white", highlightthickness=1,
+                       highlightbackground="wheat")     #outgoing quantity per day/week
+        chart.place(x=30, y=290)
+
+        fetchData()
+
+    def close(self):
+        """ close()
+        Stops the trend queries running in the background; called before the window closes the connection pool.
+        """
+        self.queries.shutdown(wait=True)
+
 def onClose():
     """called when root window is closed to close out database connnections"""
-    Dconnection.close()     #closes out Outgoing database
-    FBconnection.close()    #closes out Food Bank database
+    for view in views:
+        view.close()        #stops each tab's background queries before their connections go away
+    closePool()             #closes out the pooled database connections
     root.destroy()          #closes out root window
 
 root = Tk()                 #creates Tkinter window
@@ -574,11 +778,16 @@ root.geometry('900x540')                    #set geometry of screen
 tabControl = ttk.Notebook(root)             #creates "tabs" widget
 use_theme(root, "10")                             #use theme for screen to applied to widgets
 
-tab1 = FBView(root).root                    #sets food bank view frame as a tab
+views = [FBView(root), DataView(root), TrendsView(root)]    #kept so onClose() can stop their background queries
+
+tab1 = views[0].root                        #sets food bank view frame as a tab
 tabControl.add(tab1, text="Food Banks")
 
-tab2 = DataView(root).root                  #sets data log view frame as tab
+tab2 = views[1].root                        #sets data log view frame as tab
 tabControl.add(tab2, text="Data Log")
 
+tab3 = views[2].root                        #sets outgoing trends frame as tab
+tabControl.add(tab3, text="Trends")
+
 tabControl.pack(expand=1, fill="both")      #places frame on screen
 root.mainloop()
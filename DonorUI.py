@@ -17,29 +17,44 @@ Modifications:
     March 10, 2023: implemented the write_file method of the DonorGUI class
     March 11, 2023: cleaned up code and added comments
     March 12, 2023: added more comments
+    October 18, 2026: borrow cursors from the shared connection pool instead of holding a connection open
+    October 18, 2026: run queries as named prepared statements from queryffy.py
+    October 18, 2026: read hours from opening_hours in minutes; open now is checked with one query per report
+    October 18, 2026: hours and open now come from the in-memory schedule index in scheduleffy.py
+    October 18, 2026: the report query returns each food bank's address and phone number, so format_results()
+                      makes no query per food bank
+    October 18, 2026: get_locations() and get_category() read from the metadata cache in utilffy
+    October 18, 2026: the search runs on a worker thread through taskffy.py; the window shows it is busy
+                      and closes when the report is written
+    October 18, 2026: write_file() lays out the report with renderffy.py, writing to the file and standard output
+                      in one pass; format_results() no longer measures the columns
 """
 
 # libraries used
 from tkinter import *
 import mysql.connector as mysql
 import datetime
+import sys
 
 # modules
 from utilffy import *
+import queryffy as sql
+from scheduleffy import getSchedule
+from taskffy import BackgroundQueries, busyIndicator
+from renderffy import writeNeeds
 
 
-def get_locations(cursor):
+def get_locations(connection=None):
     """
     function which retrieves all neighborhoods which contain a food bank,
     formatted for a dropdown menu
 
-    parameter: MySQL Connector Cursor (mysql.connector.cursor.MySQLCursor)
+    parameter: MySQL Connector Connection (mysql.connector.connection.MySQLConnection), optional,
+               only used when the metadata cache has to read the list again
     """
 
-    # executes SQL query
-    cursor.execute("SELECT DISTINCT Neighborhood FROM foodforyou.food_bank ORDER BY Neighborhood")
-    # retrieves a list of neighborhoods, sorted in alphabetical order
-    neighborhoods = cursor.fetchall()
+    # retrieves a list of neighborhoods, sorted in alphabetical order, from the metadata cache
+    neighborhoods = metadataRows("bank.neighborhoods", connection)
 
     # formats list of neighborhoods
     locations = [area[0] for area in neighborhoods]
@@ -50,18 +65,17 @@ def get_locations(cursor):
     return locations
 
 
-def get_category(cursor):
+def get_category(connection=None):
     """
     function which retrieves all food categories in the database,
     formatted for a dropdown menu
 
-    parameter: MySQL Connector Cursor (mysql.connector.cursor.MySQLCursor)
+    parameter: MySQL Connector Connection (mysql.connector.connection.MySQLConnection), optional,
+               only used when the metadata cache has to read the list again
     """
 
-    # executes SQL query
-    cursor.execute("SELECT DISTINCT Category FROM foodforyou.food_item ORDER BY Category")
-    # retrieves a list of food categories, sorted in alphabetical order
-    foods = cursor.fetchall()
+    # retrieves a list of food categories, sorted in alphabetical order, from the metadata cache
+    foods = metadataRows("item.categories", connection)
 
     # formats list of food categories
     categories = [food[0] for food in foods]
@@ -71,11 +85,11 @@ def get_category(cursor):
     return categories
 
 
-def get_hours(cursor, fb_id):
+def get_hours(connection, fb_id):
     """
     function which retrieves the hours of operation for the food bank specified by the fb_id
 
-    parameters: MySQL Connector Cursor (mysql.connector.cursor.MySQLCursor)
+    parameters: MySQL Connector Connection (mysql.connector.connection.MySQLConnection)
                 Food Bank ID (int)
     """
 
@@ -84,16 +98,24 @@ def get_hours(cursor, fb_id):
         print("ERROR: food bank ID must be an int")
         return [('', '')]
 
-    # retrieves name of the current day of the week
-    day = datetime.datetime.today().strftime('%A')
+    # retrieves today's openings, in minutes after midnight, from the schedule index
+    openings = getSchedule(connection).today(fb_id)
+    # closed today
+    if len(openings) == 0:
+        return [('', '')]
+    # formats the earliest opening and latest closing as H:MM:00
+    return [(formatMinute(openings[0][0]), formatMinute(openings[-1][1]))]
+
+
+def get_open_banks(connection):
+    """
+    function which retrieves the IDs of every food bank open at the time of DonorUI being run,
+    in one pass over the schedule index
 
-    # executes the SQL query
-    query = f"SELECT {day}, {day}_close FROM hours WHERE fb_ID = {fb_id}"
-    cursor.execute(query)
+    parameter: MySQL Connector Connection (mysql.connector.connection.MySQLConnection)
+    """
 
-    # retrieves and returns a list of hours
-    hours = cursor.fetchall()
-    return hours
+    return set(getSchedule(connection).openNow())
 
 
 class DonorGUI:
@@ -120,20 +142,15 @@ class DonorGUI:
         self.interface.title('Food4You Food Bank Finder')
         self.interface.resizable(False, False)
 
-        # establishes connection to Food Resource Database
-        self.connection = connectToDatabase()
-        self.cursor = self.connection.cursor()
-        assert self.connection
-        assert self.cursor
+        # retrieves the list of all neighborhoods (cached)
+        self.all_locations = get_locations()
+        # retrieves the list of all food categories (cached)
+        self.all_categories = get_category()
 
-        # retrieves the list of all neighborhoods
-        self.all_locations = get_locations(self.cursor)
         # creates the variable for the location dropdown menu and sets it to the first option
         self.location = StringVar()
         self.location.set(self.all_locations[0])
 
-        # retrieves the list of all food categories
-        self.all_categories = get_category(self.cursor)
         # creates the variable for the food category dropdown menu and sets it to the first option
         self.category = StringVar()
         self.category.set(self.all_categories[0])
@@ -235,13 +252,28 @@ class DonorGUI:
             self.address = self.address.get()
             self.phone = self.phone.get()
 
+            # runs the query and writes the report on a worker thread, then closes the window
+            search_button.state(["disabled"])
+            queries.submit("search", self.query, lambda done: interface.destroy(), failed)
+
+        def failed(error):
+            """
+            function called on the tkinter thread if the search could not be completed
+            """
+
+            messagebox.showerror("ERROR", f"The search could not be completed: {error}")
             interface.destroy()
-            self.query()
 
         # creates the search button and displays it in the tkinter window
         search_button = ttk.Button(interface, text='search', command=search)
         search_button.pack()
         search_button.place(relx=0.5, rely=0.8, anchor=CENTER)
+
+        # shows that the search is running
+        status_label = ttk.Label(interface, text="")
+        status_label.pack()
+        status_label.place(relx=0.5, rely=0.86, anchor=CENTER)
+        queries = BackgroundQueries(interface, busyIndicator(interface, status_label))
         interface.update()
 
         # starts the main loop
@@ -262,67 +294,34 @@ class DonorGUI:
         if category == "All Categories":
             category = "%"
 
-        # creates the SQL query which retrieves all food banks which match the user's preferences
-        query = f"SELECT temp.fb_ID, temp.Location, SUM(temp.total) AS final_total " \
-                f"FROM food_bank fb JOIN " \
-                f"(SELECT fi.fb_ID, fi.Location, fi.Category, SUM(fi.Quantity) AS total " \
-                f"FROM food_item fi " \
-                f"WHERE fi.Category LIKE '{category}' " \
-                f"GROUP BY fi.fb_ID, fi.Location, fi.Category) AS temp USING(fb_ID, Location) " \
-                f"WHERE fb.Neighborhood LIKE '{neighborhood}' " \
-                f"GROUP BY temp.fb_ID, temp.Location " \
-                f"ORDER BY final_total"
-
-        # executes the SQL query and returns results
-        self.cursor.execute(query)
-        results = self.cursor.fetchall()
+        # executes the SQL query which retrieves all food banks which match the user's preferences
+        with getPool().connection() as connection:
+            results = sql.fetch(connection, "donor.needs", (category, neighborhood))
         self.format_results(results)
 
-    def get_food_bank_info(self, fb_id):
+    def get_food_bank_info(self, connection, fb_id):
         """
         function which retrieves the address, phone number, and name for the food bank specified by the fb_id
 
-        parameter: Food Bank ID (int)
+        parameters: MySQL Connector Connection (mysql.connector.connection.MySQLConnection)
+                    Food Bank ID (int)
         """
 
-        # creates the SQL query which retrieves the address, phone number, and name
-        # for the food bank specified by the food bank ID
-        query = f"SELECT Address, Phone_number, Location FROM food_bank " \
-                f"WHERE fb_ID = {fb_id}"
-
-        # executes the SQL query and returns results
-        self.cursor.execute(query)
-        fb_info = self.cursor.fetchall()
+        # executes the SQL query which retrieves the address, phone number, and name
+        # for the food bank specified by the food bank ID, and returns results
+        fb_info = sql.fetch(connection, "bank.info", (fb_id,))
         return fb_info
 
-    def is_open(self, fb_id):
+    def is_open(self, connection, fb_id):
         """
         function which checks if the food bank specified by the fd_id is open at the time of DonorUI being run
 
-        parameter: Food Bank ID (int)
+        parameters: MySQL Connector Connection (mysql.connector.connection.MySQLConnection)
+                    Food Bank ID (int)
         """
 
-        # retrieves the "current" hour and minute, where current is the time at which DonorUI.py was run
-        hour = datetime.datetime.now().hour
-        minute = datetime.datetime.now().minute
-        # formats the time
-        now = f"{hour}:{minute:02}:00"
-
-        # retrieves the hours of operation for the food bank specified by the given fb_id
-        hours = get_hours(self.cursor, fb_id)
-        opening = hours[0][0]
-        closing = hours[0][1]
-
-        invalid_hours = ['', "", ' ', " "]
-        # food bank is closed today
-        if (opening in invalid_hours) or (closing in invalid_hours):
-            now_open = False
-        # food bank is always open
-        elif (opening == '00:00:00') and (closing == '00:00:00'):
-            now_open = True
-        else:
-            # checks if the current time is within the hours of operation
-            now_open = (now >= opening) and (now <= closing)
+        # checks if the time at which DonorUI.py was run is within one of the food bank's openings
+        now_open = getSchedule(connection).isOpen(fb_id)
         return now_open
 
     def format_results(self, results):
@@ -334,137 +333,79 @@ class DonorGUI:
 
         fb_ids = []
         fb_info = {}
-        # creates a dictionary to contain the length of the longest address, name, and phone number for formatting purposes
-        max_lengths = {"address": 5, "location": 1, "phone": 1}
-
-        # iterates over each item in results
-        for item in results:
-            fb_id, category, total = item
-            fb_id = int(fb_id)
 
-            # if the user opted to only show food banks currently open
+        # borrows one connection for the schedule index (hours and open now are then read from memory)
+        with getPool().connection() as connection:
+            # if the user opted to only show food banks currently open, finds them all in one pass
             if self.open_now:
-                if not self.is_open(fb_id):
-                    continue
-
-            # if the food bank has not been processed
-            if fb_id not in fb_info:
-                fb_ids.append(fb_id)
-                info = self.get_food_bank_info(fb_id)
-                address, phone, location = info[0][0], info[0][1], info[0][2]
-
-                # strips address of newline character
-                address.strip()
-                if address[-1:] == "\n":
-                    length = len(address)
-                    address = address[:length - 1]
-                max_lengths["address"] = max(max_lengths["address"], len(address))
-
-                # strips phone number of newline character
-                phone.strip()
-                if phone[-1:] == "\n":
-                    length = len(phone)
-                    phone = phone[:length - 1]
-                max_lengths["phone"] = max(max_lengths["phone"], len(phone))
-
-                # strips name of newline character
-                location.strip()
-                if location[-1:] == "\n":
-                    length = len(location)
-                    location = location[:length - 1]
-                max_lengths["location"] = max(max_lengths["location"], len(location))
-
-                # append food bank information to food bank dictionary
-                fb_info[fb_id] = [address, location, phone]
-
-                if self.hours:
-                    fb_info[fb_id].append(get_hours(self.cursor, fb_id))
+                open_banks = get_open_banks(connection)
+
+            # iterates over each item in results; each row already holds the food bank's address and phone number
+            for item in results:
+                fb_id, location, total, address, phone = item
+                fb_id = int(fb_id)
+
+                # if the user opted to only show food banks currently open
+                if self.open_now:
+                    if fb_id not in open_banks:
+                        continue
+
+                # if the food bank has not been processed
+                if fb_id not in fb_info:
+                    fb_ids.append(fb_id)
+
+                    # strips address of newline character
+                    address.strip()
+                    if address[-1:] == "\n":
+                        length = len(address)
+                        address = address[:length - 1]
+
+                    # strips phone number of newline character
+                    phone.strip()
+                    if phone[-1:] == "\n":
+                        length = len(phone)
+                        phone = phone[:length - 1]
+
+                    # strips name of newline character
+                    location.strip()
+                    if location[-1:] == "\n":
+                        length = len(location)
+                        location = location[:length - 1]
+
+                    # append food bank information to food bank dictionary
+                    fb_info[fb_id] = [address, location, phone]
+
+                    if self.hours:
+                        fb_info[fb_id].append(get_hours(connection, fb_id))
 
         self.fb_info = fb_info
-        self.write_file(fb_ids, max_lengths)
+        self.write_file(fb_ids)
 
-    def write_file(self, fb_ids, max_lengths):
+    def write_file(self, fb_ids):
         """
-        function which writes results to file
+        function which writes results to file and to standard output together,
+        laid out by renderffy.py with the columns the user checked
 
         parameters: Food Bank ID's (list)
-                    max_lengths (dictionary, for formatting purposes)
         """
 
-        # strips location and category of all spaces
-        location = "".join(str(self.location).split())
-        category = "".join(str(self.category).split())
+        # creates the name of the file which will be written to, from location and category stripped of all spaces
+        filename = f"FoodNeedsAt{''.join(str(self.location).split())}For{''.join(str(self.category).split())}.txt"
 
-        # creates the name of the file which will be written to
-        filename = f"FoodNeedsAt{location}For{category}.txt"
-
-        # retrieves the length of the longest address, name, and phone number for formatting purposes
-        max_address = max_lengths["address"]
-        max_location = max_lengths["location"]
-        max_phone = max_lengths["phone"]
+        # one row per food bank: name, address, phone number and today's (opening, closing) hours
+        banks = []
+        for food_bank in fb_ids:
+            address, location, phone = self.fb_info[food_bank][:3]
+            hours = self.fb_info[food_bank][3][0] if self.hours else ('', '')
+            banks.append((location, address, phone, hours))
 
+        # writes the report to the file and displays it on standard output, without reading the file back
         with open(filename, "w") as f:
-            # writes the header
-            f.write(f"Results for Food Banks in {self.location} in Need of {self.category}\n")
-
-            if self.open_now:
-                f.write("showing those open now\n")
-
-            # if there is no data
-            if len(fb_ids) == 0:
-                f.write("No Results")
-            else:
-                # write the header
-                f.write(f"Name{' ':{max_location}}")
-                if self.address:
-                    f.write(f"Address {' ':{max_address - 4}}")
-                if self.hours:
-                    f.write(f"Hours {' ':18}")
-                if self.phone:
-                    f.write(f"Phone # {' ':{max_phone}}")
-
-            f.write("\n")
-
-            # iterates over each food bank in fb_ids list
-            for food_bank in fb_ids:
-                location = self.fb_info[food_bank][1]
-                f.write(f"{location:{max_location + 4}}")
-
-                # if the user opted to show addresses
-                if self.address:
-                    f.write(f"{self.fb_info[food_bank][0]:{max_address + 4}}")
-
-                # if the user opted to show hours
-                if self.hours:
-                    # retrieves the hours of operation for the food bank
-                    hours = self.fb_info[food_bank][3]
-                    opening = hours[0][0]
-                    closing = hours[0][1]
-
-                    invalid_hours = ['', "", ' ', " "]
-                    # food bank is closed today
-                    if (opening in invalid_hours) or (closing in invalid_hours):
-                        hours = "Closed Today"
-                    else:
-                        hours = f"{opening} - {closing}"
-
-                    f.write(f"{hours:24}")
-
-                # if the user opted to show phone number
-                if self.phone:
-                    f.write(f"{self.fb_info[food_bank][2]:{max_phone}}")
-
-                f.write("\n")
-            f.write("\n")
-
-        # displays results on standard output
-        with open(filename, "r") as f:
-            lines = f.readlines()
-            for line in lines:
-                print(line.strip())
+            writeNeeds((f, sys.stdout), self.location, self.category, banks, self.open_now,
+                       self.address, self.hours, self.phone)
 
 
 # create a DonorGUI instance
 donor = DonorGUI()
-# closes database connection
-donor.connection.close()
+# closes database connections
+closePool()
@@ -24,23 +24,29 @@ Modification Date: February 27rd, 2023 - created document and built user interfa
     March 9th, 2023 - added comments, LVH
     March 11th, 2023 - added checkboxes, LVH
     March 12th, 2023 - cleaned up code and added more commentary, LVH
+    October 18th, 2026 - queries borrow cursors from the shared connection pool in utilffy
+    October 18th, 2026 - queries run as named prepared statements from queryffy.py
+    October 18th, 2026 - opennow() reads today's opening_hours with one indexed query that also flags open banks
+    October 18th, 2026 - opennow() answers from the in-memory schedule index in scheduleffy.py
+    October 18th, 2026 - dropdown options come from the metadata cache in utilffy
+    October 18th, 2026 - searches run on a worker thread through taskffy.py, with a busy indicator
+    October 18th, 2026 - search_database() and opennow() use the search shared with the headless service in recipientffy.py
+    October 18th, 2026 - writetofile() lays out the report with renderffy.py, writing to the file and stdout in one pass
 """
 import tkinter as tk
 import datetime
+import sys
 from utilffy import *
+from scheduleffy import getSchedule
+from taskffy import BackgroundQueries, busyIndicator
+from recipientffy import searchItems, openBanks
+from renderffy import availabilityRows, writeAvailability
 
-# Connect to database
-connection = connectToDatabase()
-# Store connection as c
-c = connection.cursor()
+# get the food options from the metadata cache, store it in food_options
+food_options = [row[0] for row in metadataRows("item.names")]
 
-# get the food options from the database, store it in food_options
-c.execute("SELECT DISTINCT Item_name FROM food_item")
-food_options = [row[0] for row in c.fetchall()]
-
-#get neighborhood options from database, store it in neighborhood_options
-c.execute("SELECT DISTINCT Neighborhood FROM food_bank")
-neighborhood_options = [row[0] for row in c.fetchall()]
+#get neighborhood options from the metadata cache, store it in neighborhood_options
+neighborhood_options = [row[0] for row in metadataRows("bank.neighborhoods")]
 
 # create the GUI window
 root = tk.Tk()
@@ -128,51 +134,13 @@ def opennow(neighborhood) -> list:
             Returns list, open_stat of all foodbanks that are currently open. If no food banks are currently open,
             it returns an empty list
         Note: If the user selected "All Neighborhoods" the function pulls the open now stat for every food bank
-            Hours are stored as Military time
+            Hours are stored as minutes after midnight and returned formatted as H:MM:00
     """
-    # List of days of the week
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    # Get the current date and time
-    today = datetime.datetime.now()
-    # Translate the time to military
-    time_str = today.strftime("%H:%M")
-    # Gets the current day index
-    dayofweek = today.weekday()
-    # Translate the day index into day name
-    day = days[dayofweek]
-    # Empty list of currently open food banks
-    open_stat = []
-    # Base query, using day of the week
-    # Selects the open and close time of a specific location from the hours table
-    # Also selects the location from food_bank table
-    # The open and close times are not null
-    query = (f"SELECT h.{day}, h.{day}_close, fb.Location "
-             f"FROM hours h "
-             f"JOIN food_bank fb USING(fb_id) "
-             f"WHERE h.{day} <> '' AND h.{day}_close <> '' ")
-
-    # If a specific neighborhood is chosen, filter results by neighborhood
-    if neighborhood != "All Neighborhoods":
-        # update query string
-        query += f"AND fb.Neighborhood = '{neighborhood}'"
-
-    # Execute the query
-    c.execute(query)
-
-    # Store the results of the query is variable hours
-    hours = c.fetchall()
-    # Check if nothing was pulled
-    if len(hours) == 0:
-        # If nothing is pulled, return an empty list
-        return open_stat, hours
-    # Step through each food bank that has hours during this weekday
-    for entry in hours:
-        # Check if current time is greater than the Open Time and less than the Close Time of food bank
-        if entry[0] <= time_str <= entry[1]:
-            # Check food bank isn't already in the list
-            if entry[2] not in open_stat:
-                # Add the food bank to the list
-                open_stat.append(entry[2])
+    # Get the schedule index (only reloaded from the database when the hours changed)
+    with getPool().connection() as connection:
+        schedule = getSchedule(connection)
+    # List the food banks open right now and every opening today, shared with the headless service
+    open_stat, hours = openBanks(schedule, neighborhood, datetime.datetime.now())
     # Return a list of Open food banks and results from query
     return open_stat, hours
 
@@ -189,309 +157,44 @@ def writetofile(filename, results, open_stat, open_time, food, neighborhood):
             - Output
                 No set return, but does create a file named after filename input and prints data
                 to stdout
+            Note: the report is laid out by renderffy.py, which picks the columns from the checkboxes and
+                writes each chunk of lines to the file and stdout together
         """
-    # Check if the user only wants to see Open food banks
-    if opennow_var.get():
-        # Check if there are no open food banks
-        if open_stat == []:
-            # Alerts the user to the empty results
-            print(f"No Food Banks are currently open.\n"
-                  f"Please either select a different neighborhood or allow closed Food Banks. Thank you!\n")
-            # Exit
-            return
-    # Open filename as f
-    with open(filename, 'w') as f:
-        # next chunk of code is used to calculate the max length of each field to help with formatting
-        # Set Default values for open and close max
-        maxopen = 5
-        maxclose = 5
-        # Ensure that open_time isn't empty
-        if open_time != []:
-            # max open time length
-            maxopen = max(len(entry[0]) for entry in open_time)
-            # max close time length
-            maxclose = max(len(entry[1]) for entry in open_time)
-        # max item length
-        maxitem = max(len(entry[0]) for entry in results)
-        # max location legnth
-        maxlocation = max(len(entry[1]) for entry in results)
-        # max status length
-        maxstatus = max(len(entry[4]) for entry in results)
-        # max address length
-        maxaddress = max(len(entry[2]) for entry in results)
-
-        # minstat checks if every item is listed as unavailable
-        minstat = min(len(entry[4]) for entry in results)
-
-        # check if every status is set to unavailable
-        if minstat == 11:
-            # Alerts the user to there was no food available
-            print(f"{food} is not available at the food banks located in {neighborhood}. "
-            f"Please either select a different food item or neighborhood. Thank you!")
-            # Exit
-            return
-
-        # Prints an error informing statement for the User to understand the ordering of entries
-        f.write(f"Entries are listed in Descending order by Quantity.\n"
-                f"Entries at the top of the table have the greatest availabilty.\n"
-                f"Entries marked as Low Stock have 20 units or less available.")
-        print(f"Entries are listed in Descending order by Quantity.\n"
-              f"Entries at the top of the table have the greatest availabilty.\n"
-              f"Entries marked as Low Stock have 20 units or less available.\n")
-
-        # Use the max length variables to create space buffers
-        # Item space buffer
-        ispace = (maxitem + 5 - 4) * " "
-        #location space buffer
-        lspace = (maxlocation + 5 - 8) * " "
-        # status space buffer
-        sspace = (maxstatus + 5 - 6) * " "
-        # address space buffer
-        aspace = (maxaddress + 5 - 8) * " "
-        # phone space buffer
-        pspace = (14 + 5 - 12) * " "
-        # open time space buffer
-        ospace = (maxopen + 5 - 4) * " "
-        # close time space buffer
-        cspace = maxclose * " "
-        # Write the headers to filename
-        if address_var.get() and phone_var.get() and hours_var.get():
-            f.write(f"Item{ispace}Location{lspace}Status{sspace}Address{aspace}Phone Number{pspace}Open{ospace}Close{cspace}Hours")
-            # Write a dashed line for Visual ease in filename
-            f.write('-' * (maxitem + maxlocation + maxaddress + 75) + '\n')
-            # Write headers to stdout
-            print(f"Item{ispace}Location{lspace}Status{sspace}Address{aspace}Phone Number{pspace}Open{ospace}Close{cspace}Hours")
-            # Write a dashed line for visual ease in stdout
-            print("-" * (maxitem + maxlocation + maxaddress + 75))
-        elif address_var.get() and hours_var.get():
-            f.write(f"Item{ispace}Location{lspace}Status{sspace}Address{aspace}Open{ospace}Close{cspace}Hours\n")
-            # Write a dashed line for Visual ease in filename
-            f.write('-' * (maxitem + maxlocation + maxaddress + maxopen + maxclose + 48) + '\n')
-            # Write headers to stdout
-            print(f"Item{ispace}Location{lspace}Status{sspace}Address{aspace}Open{ospace}Close{cspace}Hours")
-            # Write a dashed line for visual ease in stdout
-            print("-" * (maxitem + maxlocation + maxaddress + maxopen + maxclose + 48))
-        elif address_var.get():
-            f.write(f"Item{ispace}Location{lspace}Status{sspace}Address{aspace}Hours\n")
-            # Write a dashed line for Visual ease in filename
-            f.write('-' * (maxitem + maxlocation + maxaddress + 34) + '\n')
-            # Write headers to stdout
-            print(f"Item{ispace}Location{lspace}Status{sspace}Address{aspace}Hours")
-            # Write a dashed line for visual ease in stdout
-            print("-" * (maxitem + maxlocation + maxaddress + 34))
-        elif phone_var.get() and hours_var.get():
-            f.write(f"Item{ispace}Location{lspace}Status{sspace}Phone Number{pspace}Open{ospace}Close{cspace}Hours\n")
-            # Write a dashed line for Visual ease in filename
-            f.write('-' * (maxitem + maxlocation + maxopen + maxclose + 60) + '\n')
-            # Write headers to stdout
-            print(f"Item{ispace}Location{lspace}Status{sspace}Phone Number{pspace}Open{ospace}Close{cspace}Hours")
-            # Write a dashed line for visual ease in stdout
-            print("-" * (maxitem + maxlocation + maxopen + maxclose + 60))
-        elif phone_var.get():
-            f.write(f"Item{ispace}Location{lspace}Status{sspace}Phone Number{pspace}Hours\n")
-            # Write a dashed line for Visual ease in filename
-            f.write('-' * (maxitem + maxlocation + 50) + '\n')
-            # Write headers to stdout
-            print(f"Item{ispace}Location{lspace}Status{sspace}Phone Number{pspace}Hours")
-            # Write a dashed line for visual ease in stdout
-            print("-" * (maxitem + maxlocation + 50))
-        elif hours_var.get():
-            f.write(f"Item{ispace}Location{lspace}Status{sspace}Open{ospace}Close{cspace}Hours\n")
-            # Write a dashed line for Visual ease in filename
-            f.write('-' * (maxitem + maxlocation + 65) + '\n')
-            # Write headers to stdout
-            print(f"Item{ispace}Location{lspace}Status{sspace}Open{ospace}Close{cspace}Hours")
-            # Write a dashed line for visual ease in stdout
-            print("-" * (maxitem + maxlocation + 65))
-        else:
-            f.write(f"Item{ispace}Location{lspace}Status{sspace}Hours\n")
-            # Write a dashed line for Visual ease in filename
-            f.write('-' * (maxitem + maxlocation + 34) + '\n')
-            # Write headers to stdout
-            print(f"Item{ispace}Location{lspace}Status{sspace}Hours")
-            # Write a dashed line for visual ease in stdout
-            print("-"*(maxitem + maxlocation + 34))
-
-        # Step through each entry in results
-        for entry in results:
-            # Get the food name, location name, address name, phone number, and status
-            fname, lname, aname, pname, stat = (entry[i].rstrip() for i in range(5))
-            # Create dynamic space buffers for each field. First letter of variable denotes which
-            # variable it is holding (i.e. fspace -> food space, lspace -> location space)
-            # food space buffer
-            fspace = (maxitem + 5 - len(fname)) * " "
-            # location space buffer
-            lspace = (maxlocation + 5 - len(lname)) * " "
-            # address space buffer
-            aspace = (maxaddress + 4 - len(aname)) * " "
-            # phone space buffer
-            pspace = (14 + 5 - len(pname)) * " "
-            # stat space buffer
-            sspace = (maxstatus + 5 - len(stat)) * " "
-
-            # initialize open hour time to be blank, will fill in later
-            openh = ""
-
-            # If the food is unavailable, don't display it
-            if stat == "Unavailable":
-                # move on to next entry
-                break
-
-            # Check if there is an open food bank
-            if open_stat != []:
-                # If location is in open_stat, it's open now
-                if lname in open_stat:
-                    hours = "Open Now"
-                    for entry in open_time:
-                        # match up the location name in open_time to lname
-                        if entry[2] == lname:
-                            # Grab the open and close times and set it for openh and close h, strip and trailing \n
-                            openh = entry[0].rstrip()
-                            closeh = entry[1].rstrip()
-                # Location isn't open now
-                else:
-                    # set everything (hours, openh, closeh) to be closed
-                    hours = "Closed"
-                    openh = "Closed"
-                    closeh = "Closed"
-            # Location isn't open now
-            else:
-                hours = "Closed"
-                # Check if location is open at some point today
-                for entry in open_time:
-                    # match up the location name in open_time to lname
-                    if entry[2] == lname:
-                        # Grab the open and close times and set it for openh and close h, strip and trailing \n
-                        openh = entry[0].rstrip()
-                        closeh = entry[1].rstrip()
-                # If we still haven't set open, it's closed
-                if openh == "":
-                    # Set to closed
-                    openh = "Closed"
-                    closeh = "Closed"
-
-            # Create space buffers for open (ospace) and close (cspace)
-            ospace = (maxopen + 5 - len(openh)) * " "
-            cspace = (maxclose + 5 - len(closeh)) * " "
-
+    # Check if the user only wants to see Open food banks, and there are no open food banks
+    if opennow_var.get() and open_stat == []:
+        # Alerts the user to the empty results
+        print(f"No Food Banks are currently open.\n"
+              f"Please either select a different neighborhood or allow closed Food Banks. Thank you!\n")
+        # Exit
+        return
+    # Check if every item is listed as unavailable
+    if all(entry[4] == "Unavailable" for entry in results):
+        # Alerts the user to there was no food available
+        print(f"{food} is not available at the food banks located in {neighborhood}. "
+              f"Please either select a different food item or neighborhood. Thank you!")
+        # Exit
+        return
 
-            # Now we print everything out, but must specify based on what was selected
-            # If we only want to see open now
-            if opennow_var.get():
-                # Check if hours are set to Open Now
-                if hours == "Open Now":
-                    # Each of the following print statements prints selected info details first to filename and then to stdout
-                    # Check if the FB is open now and if the user has selected all three checkboxes
-                    if address_var.get() and phone_var.get() and hours_var.get():
-                        # Write to file
-                        f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{pname}{pspace}{openh}{ospace}{closeh}{cspace}{hours}\n")
-                        # Write to stdout
-                        print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{pname}{pspace}{openh}{ospace}{closeh}{cspace}{hours}")
-                    # Check if the FB is open now and the user has selected the address and hours checkboxes
-                    elif address_var.get() and hours_var.get():
-                        f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{openh}{ospace}{closeh}{cspace}{hours}\n")
-                        print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{openh}{ospace}{closeh}{cspace}{hours}")
-                    # Check if the FB is open now and the user has selected the address checkbox
-                    elif address_var.get():
-                        f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{hours}\n")
-                        print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{hours}")
-                    # Check if the FB is open now and the user has selected the phone and hours checkboxes
-                    elif phone_var.get() and hours_var.get():
-                        f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{pname}{pspace}{openh}{ospace}{closeh}{cspace}{hours}\n")
-                        print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{pname}{pspace}{openh}{ospace}{closeh}{cspace}{hours}")
-                    # Check if FB is open now and user has selected phone checkbox
-                    elif phone_var.get():
-                        f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{pname}{pspace}{hours}\n")
-                        print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{pname}{pspace}{hours}")
-                    # Check if FB is open now and user has selected hours checkbox
-                    elif hours_var.get():
-                        f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{openh}{ospace}{closeh}{cspace}{hours}\n")
-                        print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{openh}{ospace}{closeh}{cspace}{hours}")
-                    # Check if FB is open now, no checkboxes were selected
-                    else:
-                        f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{hours}\n")
-                        print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{hours}")
-            # User doesn't care if FB is open now
-            else:
-                # Check if user selected address, phone, and hours checkbox
-                if address_var.get() and phone_var.get() and hours_var.get():
-                    f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{pname}{pspace}{openh}{ospace}{closeh}{cspace}{hours}\n")
-                    print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{pname}{pspace}{openh}{ospace}{closeh}{cspace}{hours}")
-                # Check if user selected address and hours checkbox
-                elif address_var.get() and hours_var.get():
-                    f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{openh}{ospace}{closeh}{cspace}{hours}\n")
-                    print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{openh}{ospace}{closeh}{cspace}{hours}")
-                # User only selected address checkbox
-                elif address_var.get():
-                    f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{hours}\n")
-                    print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{aname}{aspace}{hours}")
-                # User selected both phone and hours checkbox
-                elif phone_var.get() and hours_var.get():
-                    f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{pname}{pspace}{openh}{ospace}{closeh}{cspace}{hours}\n")
-                    print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{pname}{pspace}{openh}{ospace}{closeh}{cspace}{hours}")
-                # User selected only phone checkbox
-                elif phone_var.get():
-                    f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{pname}{pspace}{hours}\n")
-                    print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{pname}{pspace}{hours}")
-                # User only selected hours checkbox
-                elif hours_var.get():
-                    f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{openh}{ospace}{closeh}{cspace}{hours}\n")
-                    print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{openh}{ospace}{closeh}{cspace}{hours}")
-                # No checkboxes were selected
-                else:
-                    f.write(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{hours}\n")
-                    print(f"{fname}{fspace}{lname}{lspace}{stat}{sspace}{hours}")
-        # Print newlines so there is space between requests
-        print("\n")
+    # Work out the status and hours of each available item (and drop closed food banks if asked to)
+    rows = availabilityRows(results, open_stat, open_time, opennow_var.get())
+    # Open filename as f, and write the report to it and to stdout
+    with open(filename, 'w') as f:
+        writeAvailability((f, sys.stdout), rows, address_var.get(), phone_var.get(), hours_var.get())
 
 
-def search_database():
-    """ search_database():
+def search_database(food, neighborhood):
+    """ search_database(food: str, neighborhood: str):
                 performs queries based on what the user has selected from the UI
             - Parameters
-                no parameters, but does pull information from the dropdowns on the UI
+                food and neighborhood are the user's dropdown selections
             - Output
                 returns the results in a list variable, results
+            Note: runs on a worker thread, so it must not read or change any widget
     """
-    # Get the user selection of food category
-    food = food_var.get()
-    # Get the user neighborhood selection
-    neighborhood = neighborhood_var.get()
-
-    # This is our base select clause, everything the user might want to reference
-    select_clause = "SELECT fi.Item_name, fi.Location, fb.Address, fb.Phone_number, "
-    # Clause that labels quantities
-    stock_status_clause = "CASE WHEN Quantity = 0 THEN 'Unavailable' " \
-                          "WHEN Quantity < 21 THEN 'Low Stock' ELSE 'Available' END AS stock_status "
-    # Where we are pulling data from
-    from_clause = "FROM food_item fi " \
-                  "LEFT JOIN food_bank fb USING(fb_ID) "
-    # How we want to order the data
-    order_by_clause = "ORDER BY fi.Quantity DESC"
-
-    # Checks if any specifications were made
-    if neighborhood == "All Neighborhoods" and food == "All Food":
-        # None were made, so no need for a where_clause
-        where_clause = ""
-    # A food selection was made, but not a neighborhood selection
-    elif neighborhood == "All Neighborhoods":
-        # Add to query to specify the food category
-        where_clause = f"WHERE fi.Item_name = '{food}' "
-    # A neighborhood selection was made, but not a food selection
-    elif food == "All Food":
-        # Add to query to specify the neighborhood category
-        where_clause = f"WHERE fb.Neighborhood = '{neighborhood}' "
-    # Both a food and a neighborhood selection were made
-    else:
-        # Add to query to specify the food category and neighborhood
-        where_clause = f"WHERE fi.Item_name = '{food}' AND fb.Neighborhood = '{neighborhood}' "
-
-    # Format the query
-    query = select_clause + stock_status_clause + from_clause + where_clause + order_by_clause
-    # Execute the query
-    c.execute(query)
-    # Store the query return in results
-    results = c.fetchall()
+    # Execute the search on a pooled connection, with the statements shared with the headless service
+    with getPool().connection() as connection:
+        # Store the query return in results
+        results = searchItems(connection, food, neighborhood)
 
     # Return results, and the food and neighborhood user selections
     return results, food, neighborhood
@@ -499,15 +202,34 @@ def search_database():
 
 def main():
     """ main():
-                once the user presses the submit button, it calls search_database(), creates filename
-                calls opennow(), and writetofile(filename, results, open_stat, open_time)
+                once the user presses the submit button, it reads the dropdowns and runs search_database()
+                and opennow() on a worker thread; show_results() gets their results back on the UI thread
             - Parameters
                 no parameters
+            - Output
+                no returns
+    """
+    # Get the user selection of food category and neighborhood
+    food = food_var.get()
+    neighborhood = neighborhood_var.get()
+
+    def work():
+        # Search the database and check hours of Food Banks with opennow()
+        return search_database(food, neighborhood), opennow(neighborhood)
+
+    # A newer search replaces one still running
+    queries.submit("search", work, show_results)
+
+
+def show_results(found):
+    """ show_results(found):
+                creates filename and calls writetofile(filename, results, open_stat, open_time)
+            - Parameters
+                found is ((results, food, neighborhood), (open_stat, open_time)) from main()'s search
             - Output
                 no returns, but does print an error statement is we return an empty query
     """
-    # Search the database
-    results, food, neighborhood = search_database()
+    (results, food, neighborhood), (open_stat, open_time) = found
     # Check if there was an empty query result return
     if results == []:
         # Alerts the user to the empty results
@@ -516,8 +238,6 @@ def main():
         # Exit
         return
 
-    # Check hours of Food Banks with opennow()
-    open_stat, open_time = opennow(neighborhood)
     # Create a file named after food and neighborhood selections
     filename = f"{food}AvailabilityAt{neighborhood}.txt"
     # Write everything to stdout and file named filename
@@ -532,9 +252,14 @@ search_button.place(relx=0.5, rely=.8, anchor=tk.CENTER)
 # create the label to display the results
 result_label = ttk.Label(root, text="")
 result_label.pack()
+result_label.place(relx=0.5, rely=.86, anchor=tk.CENTER)
+
+# runs searches off the UI thread, showing "Searching..." in result_label meanwhile
+queries = BackgroundQueries(root, busyIndicator(root, result_label))
 
 # start the main loop
 root.mainloop()
 
-# close the database connection when finished
-connection.close()
+# stop the background searches, then close the database connections when finished
+queries.shutdown(wait=True)
+closePool()
@@ -0,0 +1,670 @@
+"""
+Name: benchffy.py
+Created: 10/18/2026
+
+Benchmarks for the Food-For-You database access paths. Each benchmark runs against the database configured in
+utilffy.py and prints its measurements.
+
+Usage:
+    python3 benchffy.py statements [--iterations N]
+        Compares statement throughput of the old f-string queries against the prepared statements in queryffy.py
+    python3 benchffy.py ids [--iterations N] [--writers N]
+        Has many parallel writers reserve food item IDs at once and checks that no ID is handed out twice
+    python3 benchffy.py import [--iterations N]
+        Loads N generated CSV rows into an existing food bank with importffy.py, then rolls the import back
+    python3 benchffy.py schedule [--iterations N]
+        Compares answering "which food banks are open now" with the open-now query against the schedule index
+    python3 benchffy.py search [--iterations N]
+        Compares the staff item search through the ngram index and the Item_name index against LIKE '%text%' scans
+    python3 benchffy.py trends [--iterations N]
+        Times loading a year of trends (top list and chart) from outgoing_rollup against aggregating outgoing_events
+    python3 benchffy.py move [--iterations N]
+        Counts the statements and times staff moves, updates and deletes the way staffUI used to run them and
+        through the stored procedures of inventoryffy.py
+    python3 benchffy.py upsert [--iterations N] [--writers N]
+        Has many parallel writers add the same new item at once and checks it ends up as one row with every unit
+    python3 benchffy.py recipient [--iterations N] [--writers N]
+        Load-tests the recipient search service over HTTP with N kiosks, with and without its answer cache
+    python3 benchffy.py lookup [--iterations N]
+        Times recipient searches answered in process by RecipientService, with and without its answer cache
+    python3 benchffy.py export [--iterations N]
+        Times N full exports of the outgoing log to a temporary CSV file
+    python3 benchffy.py donor [--iterations N]
+        Times N single donor reports the way DonorUI writes them, and the batch of every donor report
+    python3 benchffy.py suite [--scale X] [--label TEXT] --json FILE
+        Runs search, move, import, export, lookup and donor one after another (iterations times X) and writes
+        every measurement, with the row counts of the database and the Python version, to FILE
+
+    Every benchmark also takes --json FILE to save its measurements, and --host, --port, --user, --password and
+    --database to run against another database than the one in utilffy.py, e.g. a local copy filled by dataffy.py:
+        python3 migrateffy.py upgrade --database bench
+        python3 dataffy.py generate --items 1000000 --database bench
+        python3 benchffy.py suite --database bench --label "1M items" --json bench-1M.json
+"""
+import argparse
+import datetime
+import http.client
+import io
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import utilffy
+from utilffy import getPool, closePool, allocateIds, ConnectionPool, metadataRows, useDatabase, databaseOptions, databaseSettings
+from importffy import importItems
+from scheduleffy import ScheduleIndex, minuteOfWeek
+from searchffy import itemFilter, likeEscape
+import trendffy
+from inventoryffy import addItem, adjustQuantity, moveItem, deleteItem
+from recipientffy import RecipientService, makeServer, allFood, allNeighborhoods
+from exportffy import exportOutgoing
+from renderffy import writeNeeds
+import reportffy
+import queryffy as sql
+
+
+def timed(function, iterations:int) -> float:
+    """ timed(function, iterations)
+    Calls function(i) for i in range(iterations) and returns the elapsed wall time in seconds.
+    """
+    start = time.perf_counter()
+    for i in range(iterations):
+        function(i)
+    return time.perf_counter() - start
+
+
+def benchStatements(iterations:int=2000) -> dict:
+    """ benchStatements(iterations)
+    Runs the same mix of lookups used by staffUI (food bank id, item lookup, inventory search) 'iterations' times,
+        once by formatting values into the SQL text like the original code did, and once through the prepared
+        statements in queryffy.py.
+    Returns statements per second for both approaches.
+    """
+    with getPool().connection() as connection:
+        banks = sql.fetch(connection, "bank.locations")
+        items = sql.fetch(connection, "item.names")
+        if not banks or not items:
+            raise SystemExit("The database needs at least one food bank and one food item to benchmark.")
+        locations = [row[0] for row in banks]
+        names = [row[0] for row in items]
+        bankID = sql.fetch(connection, "bank.id_by_location", (locations[0],))[0][0]
+
+        def stringBuilt(i):
+            location = locations[i % len(locations)]
+            item = names[i % len(names)]
+            cursor = connection.cursor()
+            cursor.execute(f"select fb.fb_ID from food_bank fb where fb.Location = '{location}'")
+            cursor.fetchall()
+            cursor.execute(f"select * from food_item fi where fi.Item_name = '{item}' and fi.fb_ID = {bankID}")
+            cursor.fetchall()
+            cursor.execute(f"SELECT fi.Item_name, fi.Quantity, fi.Units, fi.fd_id, fb.Location from food_item fi "
+                           f"join food_bank fb using(fb_id) where fi.Item_name like '{item}' and fb.location like '%' "
+                           f"and fi.fd_id like '%'")
+            cursor.fetchall()
+            cursor.close()
+
+        def prepared(i):
+            location = locations[i % len(locations)]
+            item = names[i % len(names)]
+            sql.fetch(connection, "bank.id_by_location", (location,))
+            sql.fetch(connection, "item.find_by_name", (item, bankID))
+            sql.fetch(connection, "staff.search", (item, "%", "%"))
+
+        statementsRun = iterations * 3
+        results = {}
+        for label, function in (("f-string", stringBuilt), ("prepared", prepared)):
+            function(0)         #warm up: opens the statements once so only steady state is timed
+            elapsed = timed(function, iterations)
+            results[label] = {"seconds": elapsed, "statements_per_second": statementsRun / elapsed}
+        connection.rollback()
+    return results
+
+
+def benchIds(iterations:int=200, writers:int=16) -> dict:
+    """ benchIds(iterations, writers)
+    Starts 'writers' threads, each with its own connection, that reserve food item IDs 'iterations' times,
+        mixing single IDs (staff NewItem) with blocks of up to 50 (CSV imports).
+    Raises AssertionError if any ID was handed out twice; returns allocations per second.
+    """
+    pool = ConnectionPool(size=writers)
+    reserved = [[] for _ in range(writers)]     #(first id, count) per writer, only touched by that writer
+    failures = []
+    ready = threading.Barrier(writers)
+
+    def writer(index):
+        chooser = random.Random(index)
+        try:
+            ready.wait()        #every writer starts at the same moment
+            for _ in range(iterations):
+                count = 1 if chooser.random() < 0.8 else chooser.randint(2, 50)
+                reserved[index].append((allocateIds("food_item", count, pool), count))
+        except Exception as e:
+            failures.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    pool.closeAll()
+    if failures:
+        raise failures[0]
+
+    handedOut = [first + offset for blocks in reserved for first, count in blocks for offset in range(count)]
+    duplicates = len(handedOut) - len(set(handedOut))
+    assert duplicates == 0, f"{duplicates} food item IDs were handed out more than once"
+    allocations = writers * iterations
+    return {"allocator": {"writers": writers, "allocations": allocations, "ids": len(handedOut),
+                          "duplicates": duplicates, "allocations_per_second": allocations / elapsed}}
+
+
+def benchImport(iterations:int=20000) -> dict:
+    """ benchImport(iterations)
+    Imports 'iterations' generated rows (about one in ten repeating an earlier item) into the first food bank
+        and reports rows per second. The import is rolled back; only the reserved food item IDs are used up.
+    """
+    categories = ["Canned", "Dry", "Produce", "Dairy", "Frozen"]
+    rows = [(f"bench item {i % (iterations - iterations // 10 or 1)}", categories[i % len(categories)],
+             str(i % 40), "cans") for i in range(iterations)]
+    with getPool().connection() as connection:
+        banks = sql.fetch(connection, "bank.locations")
+        if not banks:
+            raise SystemExit("The database needs at least one food bank to benchmark.")
+        location = banks[0][0]
+        bankID = sql.fetch(connection, "bank.id_by_location", (location,))[0][0]
+        stats = importItems(connection, bankID, location, rows)
+        connection.rollback()
+    return {"bulk import": stats}
+
+
+def benchSchedule(iterations:int=2000) -> dict:
+    """ benchSchedule(iterations)
+    Answers "which food banks are open now" 'iterations' times, at a different minute of the week each time,
+        once with the indexed open-now query and once from a ScheduleIndex loaded a single time.
+    Returns lookups per second for both, and the seconds taken to build the index.
+    """
+    start = datetime.datetime(2026, 10, 19)         #a Monday
+    moments = [start + datetime.timedelta(minutes=(i * 37) % (7 * 24 * 60)) for i in range(iterations)]
+    with getPool().connection() as connection:
+        def query(i):
+            minute = minuteOfWeek(moments[i]) % (24 * 60)
+            sql.fetch(connection, "hours.open_now", (moments[i].weekday(), minute, minute))
+
+        built = time.perf_counter()
+        schedule = ScheduleIndex(sql.fetch(connection, "hours.schedule"))
+        built = time.perf_counter() - built
+
+        query(0)
+        elapsed = timed(query, iterations)
+        results = {"query": {"seconds": elapsed, "lookups_per_second": iterations / elapsed}}
+        elapsed = timed(lambda i: schedule.openNow(moments[i]), iterations)
+        results["index"] = {"seconds": elapsed, "lookups_per_second": iterations / elapsed, "build_seconds": built}
+    return results
+
+
+def benchSearch(iterations:int=500) -> dict:
+    """ benchSearch(iterations)
+    Runs 'iterations' first-page staff searches for pieces of real item names, once as the LIKE '%text%' scan the
+        search box used to need, and once through searchffy.itemFilter(); prefix searches ("text*") through the
+        Item_name index are timed as well. Both ways must return the same rows.
+    Returns searches per second for each.
+    """
+    with getPool().connection() as connection:
+        names = [row[0] for row in sql.fetch(connection, "item.names") if len(row[0].strip()) >= 4]
+        if not names:
+            raise SystemExit("The database needs food items with names of 4 or more characters to benchmark.")
+        chooser = random.Random(422)
+        pieces = []
+        for i in range(iterations):
+            name = chooser.choice(names).strip()
+            start = chooser.randrange(0, len(name) - 2)
+            pieces.append(name[start:start + chooser.randint(3, 6)].strip() or name)
+        prefixes = [chooser.choice(names).strip()[:chooser.randint(2, 4)] for i in range(iterations)]
+        page = (-1, 200)        #first page, ordered by food item ID
+
+        def scan(text):
+            return sql.fetch(connection, "staff.search_page:like", (text, "%") + page)
+
+        def indexed(text):
+            filterName, filters = itemFilter(text)
+            return sql.fetch(connection, f"staff.search_page:{filterName}", filters + ("%",) + page)
+
+        for text in pieces[:20]:
+            assert scan("%" + likeEscape(text) + "%") == indexed(text), f"searches for {text!r} disagree"
+        results = {}
+        for label, function in (("like scan", lambda i: scan("%" + likeEscape(pieces[i]) + "%")),
+                                ("ngram", lambda i: indexed(pieces[i])),
+                                ("index prefix", lambda i: indexed(prefixes[i] + "*"))):
+            function(0)
+            elapsed = timed(function, iterations)
+            results[label] = {"seconds": elapsed, "searches_per_second": iterations / elapsed,
+                              "ms_per_search": elapsed * 1000 / iterations}
+    return results
+
+
+def benchTrends(iterations:int=50) -> dict:
+    """ benchTrends(iterations)
+    Loads the "Last 52 weeks" trends dashboard (top categories, items and food banks, and the overall chart)
+        'iterations' times from the rollup, and the same top lists by aggregating the event log directly.
+    Returns dashboards per second and milliseconds per dashboard for both.
+    """
+    rangeName = "Last 52 weeks"
+    with getPool().connection() as connection:
+        since = trendffy.rangeStarts(rangeName)[0]
+        if getattr(connection, "dialect", "mysql") == "sqlite":
+            weekStart = "date(ts, '-' || ((strftime('%w', ts) + 6) % 7) || ' days')"      #Monday, like WEEKDAY()
+        else:
+            weekStart = "DATE(ts) - INTERVAL WEEKDAY(ts) DAY"
+
+        def rollup(i):
+            for dimension in trendffy.dimensions.values():
+                trendffy.topKeys(connection, dimension, rangeName)
+            trendffy.series(connection, "category", None, rangeName)
+
+        def events(i):
+            cursor = connection.cursor()
+            for key in ("Item_name", "Category", "fb_ID"):
+                cursor.execute(f"SELECT {key}, SUM(delta) FROM outgoing_events WHERE ts >= %s "
+                               f"GROUP BY {key} ORDER BY 2 DESC LIMIT {trendffy.topCount}", (since,))
+                cursor.fetchall()
+            cursor.execute(f"SELECT {weekStart}, SUM(delta) FROM outgoing_events "
+                           "WHERE ts >= %s GROUP BY 1 ORDER BY 1", (since,))
+            cursor.fetchall()
+            cursor.close()
+
+        results = {}
+        for label, function in (("event scan", events), ("rollup", rollup)):
+            function(0)
+            elapsed = timed(function, iterations)
+            results[label] = {"seconds": elapsed, "dashboards_per_second": iterations / elapsed,
+                              "ms_per_dashboard": elapsed * 1000 / iterations}
+    return results
+
+
+def questions(connection) -> int:
+    """number of statements this connection has sent to the server (the SHOW itself included)"""
+    if getattr(connection, "dialect", "mysql") == "sqlite":
+        connection.statements += 1      #counts itself, like the SHOW below
+        return connection.statements
+    cursor = connection.cursor()
+    cursor.execute("SHOW SESSION STATUS LIKE 'Questions'")
+    count = int(cursor.fetchall()[0][1])
+    cursor.close()
+    return count
+
+
+def oldMove(connection, fd_id:int, item:str, units:str, source:str, destination:str, quantity:int):
+    """the statements the move branch of staffUI.UpdateItem ran before inventoryffy.moveItem()"""
+    fb_id = sql.fetch(connection, "bank.id_by_location", (source,))[0][0]
+    origQuantity = sql.fetch(connection, "item.quantity", (fd_id,))[0][0]
+    movefb_id = sql.fetch(connection, "bank.id_by_location", (destination,))[0][0]
+    itemCheck = sql.fetch(connection, "item.find_in_bank", (item, movefb_id, units))
+    if itemCheck:
+        sql.fetch(connection, "item.find_by_name", (item, fb_id))
+        newFoodID = sql.fetch(connection, "item.id_by_name", (movefb_id, item))[0][0]
+        existing = sql.fetch(connection, "item.quantity", (newFoodID,))[0][0]
+        sql.execute(connection, "item.set_quantity", (origQuantity - quantity, fd_id))
+        sql.execute(connection, "item.set_quantity", (existing + quantity, newFoodID))
+    else:
+        sql.fetch(connection, "bank.id_by_location", (destination,))
+        item1 = sql.fetch(connection, "item.find_by_name", (item, fb_id))[0]
+        newFoodID = allocateIds("food_item")    #before the writes: on SQLite it would wait for them to commit
+        sql.execute(connection, "item.set_quantity", (origQuantity - quantity, fd_id))
+        sql.execute(connection, "item.insert", (item, item1[1], quantity, units, destination, movefb_id, newFoodID))
+
+
+def oldUpdate(connection, fd_id:int, item:str, units:str, location:str, quantity:int):
+    """the statements the update branch of staffUI.UpdateItem ran before inventoryffy.adjustQuantity()"""
+    fb_id = sql.fetch(connection, "bank.id_by_location", (location,))[0][0]
+    origEntry = sql.fetch(connection, "item.find_in_bank", (item, fb_id, units))[0]
+    sql.execute(connection, "item.update", (item, quantity, units, location, fb_id, fd_id))
+    if quantity < origEntry[2]:
+        sql.execute(connection, "outgoing.record", (fd_id, fb_id, origEntry[2] - quantity, item, origEntry[1],
+                                                    origEntry[3], origEntry[4]))
+
+
+def measured(connection, action, undo, iterations:int) -> dict:
+    """statements sent by one action() (from the server's Questions counter) and actions per second, calling
+        undo(result) after every action, outside of the timing, to put the data back"""
+    start = questions(connection)
+    result = action()
+    statements = questions(connection) - start - 1
+    undo(result)
+    elapsed = 0.0
+    for i in range(iterations):
+        begin = time.perf_counter()
+        result = action()
+        elapsed += time.perf_counter() - begin
+        undo(result)
+    return {"statements": statements, "actions_per_second": iterations / elapsed}
+
+
+def benchMove(iterations:int=500) -> dict:
+    """ benchMove(iterations)
+    Moves one unit of a food item to a food bank that has the same item and to one that does not, and sets the
+        item's quantity to the same value, 'iterations' times each, the old way and through the stored procedures
+        of inventoryffy.py. The old way ends with a commit like staffUI did, which is counted and then undone by
+        rolling back instead; procedure calls commit themselves, so they are undone by moving the unit back
+        (and deleting the item a move created). Only reserved food item IDs are used up.
+    Returns statements per action and actions per second.
+    """
+    with getPool().connection() as connection:
+        cursor = connection.cursor()
+        # an item with stock, a food bank that has the same item, and one that does not
+        cursor.execute("SELECT src.fd_ID, src.Item_name, src.Units, src.Location, dst.Location, other.Location "
+                       "FROM food_item src "
+                       "JOIN food_item dst ON dst.Item_name = src.Item_name AND dst.Units = src.Units "
+                       "AND dst.Category = src.Category AND dst.fb_ID <> src.fb_ID "
+                       "JOIN food_bank other ON other.fb_ID <> src.fb_ID AND NOT EXISTS (SELECT 1 FROM food_item o "
+                       "WHERE o.fb_ID = other.fb_ID AND o.Item_name = src.Item_name AND o.Units = src.Units) "
+                       "WHERE src.Quantity > 0 LIMIT 1")
+        found = cursor.fetchall()
+        cursor.close()
+        if not found:
+            raise SystemExit("The database needs an item stocked at two food banks and missing from a third.")
+        fd_id, item, units, source, existing, missing = found[0]
+
+        quantity = sql.fetch(connection, "item.quantity", (fd_id,))[0][0]
+
+        def oldCommitted(action):
+            def run():
+                action()
+                connection.rollback()   #stands in for the commit, which the procedures do on the server
+            return run
+
+        def moveBack(result):
+            target, created = result
+            moveItem(connection, target, source, 1)
+            if created:
+                deleteItem(connection, target)
+
+        results = {}
+        for case, destination in (("existing", existing), ("new", missing)):
+            results[f"move before {case}"] = measured(connection, oldCommitted(
+                lambda: oldMove(connection, fd_id, item, units, source, destination, 1)), lambda result: None, iterations)
+            results[f"move after {case}"] = measured(connection, lambda: moveItem(connection, fd_id, destination, 1),
+                                                     moveBack, iterations)
+        results["update before"] = measured(connection, oldCommitted(
+            lambda: oldUpdate(connection, fd_id, item, units, source, quantity)), lambda result: None, iterations)
+        results["update after"] = measured(connection, lambda: adjustQuantity(connection, fd_id, item, units, quantity),
+                                           lambda result: None, iterations)
+    return results
+
+
+def benchUpsert(iterations:int=100, writers:int=16) -> dict:
+    """ benchUpsert(iterations, writers)
+    Starts 'writers' threads, each with its own connection, that add one unit of the same brand-new item to the
+        first food bank 'iterations' times, committing every time, the way staff NewItem does.
+    Raises AssertionError unless the item ends up as exactly one row holding every unit added; the item is
+        deleted afterwards. Returns intakes per second.
+    """
+    pool = ConnectionPool(size=writers)
+    with pool.connection() as connection:
+        banks = sql.fetch(connection, "bank.locations")
+    if not banks:
+        raise SystemExit("The database needs at least one food bank to benchmark.")
+    location, item = banks[0][0], f"bench upsert {time.time():.0f}"
+    failures = []
+    ready = threading.Barrier(writers)
+
+    def writer(index):
+        try:
+            with pool.connection() as connection:
+                ready.wait()        #every writer starts at the same moment
+                for _ in range(iterations):
+                    addItem(connection, item, "Bench", 1, "cans", location)
+                    connection.commit()
+        except Exception as e:
+            failures.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with pool.cursor(commit=True) as cursor:
+        cursor.execute("SELECT fd_ID, Quantity FROM food_item WHERE Item_name = %s AND Location = %s",
+                       (item, location))
+        rows = cursor.fetchall()
+        cursor.execute("DELETE FROM food_item WHERE Item_name = %s AND Location = %s", (item, location))
+    pool.closeAll()
+    if failures:
+        raise failures[0]
+    intakes = writers * iterations
+    assert len(rows) == 1, f"the item was stored as {len(rows)} rows"
+    assert rows[0][1] == intakes, f"{intakes} units were added but the item holds {rows[0][1]}"
+    return {"upsert": {"writers": writers, "intakes": intakes, "rows": len(rows), "quantity": int(rows[0][1]),
+                       "intakes_per_second": intakes / elapsed}}
+
+
+def benchRecipient(iterations:int=500, writers:int=16) -> dict:
+    """ benchRecipient(iterations, writers)
+    Starts the recipient search service on a free local port and has 'writers' kiosks (threads, each with its own
+        keep-alive HTTP connection) send 'iterations' searches each, spread over every food and neighborhood
+        choice, once with the answer cache and once with it switched off.
+    Returns requests per second, median and 99th percentile latency in milliseconds, and the cache's hits.
+    """
+    foods = [allFood] + [row[0] for row in metadataRows("item.names")]
+    neighborhoods = [allNeighborhoods] + [row[0] for row in metadataRows("bank.neighborhoods")]
+    chooser = random.Random(422)
+    paths = ["/search?" + urllib.parse.urlencode({"food": chooser.choice(foods),
+                                                   "neighborhood": chooser.choice(neighborhoods),
+                                                   "open": chooser.choice(("0", "1"))})
+             for i in range(iterations)]
+
+    results = {}
+    for label, size in (("cached", None), ("uncached", 0)):
+        pool = ConnectionPool(size=writers)
+        service = RecipientService(pool) if size is None else RecipientService(pool, size=size)
+        server = makeServer(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        latencies, failures = [], []
+        ready = threading.Barrier(writers)
+
+        def kiosk(offset):
+            client = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+            mine = []
+            try:
+                ready.wait()
+                for i in range(iterations):
+                    begin = time.perf_counter()
+                    client.request("GET", paths[(i + offset) % iterations])
+                    response = client.getresponse()
+                    response.read()
+                    mine.append(time.perf_counter() - begin)
+                    if response.status != 200:
+                        raise AssertionError(f"the service answered {response.status}")
+            except Exception as e:
+                failures.append(e)
+            finally:
+                client.close()
+                latencies.extend(mine)
+
+        threads = [threading.Thread(target=kiosk, args=(n * 7,)) for n in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+        server.server_close()
+        pool.closeAll()
+        if failures:
+            raise failures[0]
+        latencies.sort()
+        results[label] = {"requests_per_second": len(latencies) / elapsed,
+                          "p50_ms": latencies[len(latencies) // 2] * 1000,
+                          "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+                          "hits": service.stats()["hits"]}
+    return results
+
+
+def benchLookup(iterations:int=2000) -> dict:
+    """ benchLookup(iterations)
+    Answers 'iterations' recipient searches for random food and neighborhood choices (open food banks only, like
+        most kiosk searches) in process through RecipientService, once with its answer cache switched off and
+        once with it on.
+    Returns searches per second and milliseconds per search for both.
+    """
+    foods = [allFood] + [row[0] for row in metadataRows("item.names")]
+    neighborhoods = [allNeighborhoods] + [row[0] for row in metadataRows("bank.neighborhoods")]
+    chooser = random.Random(422)
+    choices = [(chooser.choice(foods), chooser.choice(neighborhoods)) for i in range(iterations)]
+    when = datetime.datetime.now()          #one minute for every search, so the cache can answer repeats
+
+    results = {}
+    for label, size in (("uncached", 0), ("cached", None)):
+        service = RecipientService() if size is None else RecipientService(size=size)
+        search = lambda i: service.search(*choices[i], openOnly=True, when=when)
+        elapsed = timed(search, iterations)
+        results[label] = {"seconds": elapsed, "searches_per_second": iterations / elapsed,
+                          "ms_per_search": elapsed * 1000 / iterations, "hits": service.stats()["hits"]}
+    return results
+
+
+def benchExport(iterations:int=3) -> dict:
+    """ benchExport(iterations)
+    Exports the whole outgoing log to a temporary CSV file 'iterations' times with exportffy.exportOutgoing().
+    Returns rows per second and seconds per export.
+    """
+    with tempfile.TemporaryDirectory() as directory, getPool().connection() as connection:
+        filename = os.path.join(directory, "export.csv")
+        rows = 0
+        elapsed = 0.0
+        for i in range(iterations):
+            stats = exportOutgoing(connection, filename)
+            rows += stats["rows"]
+            elapsed += stats["seconds"]
+    return {"export": {"rows": rows // max(1, iterations), "seconds_per_export": elapsed / max(1, iterations),
+                       "rows_per_second": rows / elapsed if elapsed else 0.0}}
+
+
+def benchDonor(iterations:int=200) -> dict:
+    """ benchDonor(iterations)
+    Writes 'iterations' donor reports for random neighborhood and category choices the way DonorUI does (the
+        donor.needs query and renderffy.writeNeeds(), into memory), then the batch of every donor report with
+        reportffy.py into a temporary folder twice: once from scratch and once with nothing changed.
+    Returns reports per second for single reports and both batch runs.
+    """
+    with getPool().connection() as connection:
+        neighborhoods = ["%"] + [row[0] for row in sql.fetch(connection, "bank.neighborhoods") if row[0] is not None]
+        categories = ["%"] + [row[0] for row in sql.fetch(connection, "item.categories") if row[0] is not None]
+        chooser = random.Random(422)
+        choices = [(chooser.choice(neighborhoods), chooser.choice(categories)) for i in range(iterations)]
+
+        def single(i):
+            neighborhood, category = choices[i]
+            rows = sql.fetch(connection, "donor.needs", (category, neighborhood))
+            banks = [(location, address, phone, ('', '')) for fb_ID, location, total, address, phone in rows]
+            writeNeeds((io.StringIO(),), neighborhood, category, banks, False, True, False, True)
+
+        single(0)
+        elapsed = timed(single, iterations)
+        results = {"single": {"seconds": elapsed, "reports_per_second": iterations / elapsed}}
+        snapshotTime = time.perf_counter()
+        snapshot = reportffy.takeSnapshot(connection)
+        snapshotTime = time.perf_counter() - snapshotTime
+    with tempfile.TemporaryDirectory() as directory:
+        for label in ("batch", "batch again"):
+            stats = reportffy.generateReports(snapshot, directory)
+            results[label] = dict(stats, reports_per_second=stats["reports"] / stats["seconds"],
+                                  snapshot_seconds=snapshotTime)
+    return results
+
+
+# (command, title, function, default iterations, takes writers) of every benchmark
+benchmarks = [
+    ("statements", "statement throughput", benchStatements, 2000, False),
+    ("ids", "parallel id allocation", benchIds, 200, True),
+    ("import", "csv import", benchImport, 20000, False),
+    ("schedule", "open now lookups", benchSchedule, 2000, False),
+    ("search", "item search", benchSearch, 500, False),
+    ("trends", "trends dashboard", benchTrends, 50, False),
+    ("move", "staff actions", benchMove, 500, False),
+    ("upsert", "concurrent intake", benchUpsert, 100, True),
+    ("recipient", "recipient search service", benchRecipient, 500, True),
+    ("lookup", "recipient search", benchLookup, 2000, False),
+    ("export", "outgoing export", benchExport, 3, False),
+    ("donor", "donor reports", benchDonor, 200, False),
+]
+suiteBenchmarks = ("search", "move", "import", "export", "lookup", "donor")     #what the suite command runs
+
+
+def describeDatabase(label:str=None) -> dict:
+    """ describeDatabase(label)
+    Returns what a set of measurements was taken on: the label, the time, the database, its row counts and the
+        Python version and platform, so results from different data sizes and machines can be compared.
+    """
+    with getPool().connection() as connection:
+        counts = sql.fetch(connection, "data.counts")[0]
+    return {"label": label, "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "backend": utilffy.backend,
+            "host": utilffy.host if utilffy.backend == "mysql" else None,
+            "database": utilffy.database if utilffy.backend == "mysql" else utilffy.sqliteFile,
+            "rows": dict(zip(("food_bank", "opening_hours", "food_item", "outgoing_events", "outgoing"),
+                             (int(count) for count in counts))),
+            "python": platform.python_version(), "platform": platform.platform()}
+
+
+def runBenchmark(command:str, iterations:int=None, writers:int=16, scale:float=1.0) -> tuple:
+    """ runBenchmark(command, iterations, writers, scale)
+    Runs the benchmark 'command' with 'iterations' (default: its own default times 'scale') and returns
+        (title, measurements).
+    """
+    for name, title, function, default, parallel in benchmarks:
+        if name == command:
+            iterations = iterations or max(1, int(default * scale))
+            return title, function(iterations, writers) if parallel else function(iterations)
+    raise ValueError(f"no benchmark named {command!r}")
+
+
+def report(name:str, results:dict):
+    """ report(name, results)
+    Prints one benchmark's measurements as a small table.
+    """
+    print(name)
+    width = max((len(label) for label in results), default=0) + 2     #the longest label still gets two spaces
+    for label, values in results.items():
+        print(f"    {label:<{width}}" + "  ".join(f"{key}={value:,.3f}" if isinstance(value, float) else f"{key}={value:,}"
+                                         for key, value in values.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Food-For-You database benchmarks")
+    parser.add_argument("benchmark", choices=[name for name, *rest in benchmarks] + ["suite"])
+    parser.add_argument("--iterations", type=int, default=None, help="repetitions of each measured operation")
+    parser.add_argument("--writers", type=int, default=16, help="parallel writers (or kiosks) for the ids, upsert and recipient benchmarks")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the default iterations of the suite")
+    parser.add_argument("--label", default=None, help="name of this run in the JSON file, e.g. the data size")
+    parser.add_argument("--json", default=None, help="file the measurements are written to as JSON")
+    databaseOptions(parser)
+    args = parser.parse_args()
+    useDatabase(**{name: getattr(args, name) for name in databaseSettings})
+
+    try:
+        results = {"run": describeDatabase(args.label), "benchmarks": {}}
+        for command in suiteBenchmarks if args.benchmark == "suite" else [args.benchmark]:
+            title, measured = runBenchmark(command, args.iterations, args.writers, args.scale)
+            report(title, measured)
+            results["benchmarks"][command] = measured
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"measurements written to {args.json}")
+    finally:
+        closePool()
+
+
+if __name__ == "__main__":
+    main()
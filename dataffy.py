@@ -0,0 +1,241 @@
+"""
+Name: dataffy.py
+Created: 10/18/2026
+
+Synthetic data for measuring Food-For-You at scale: food banks spread over neighborhoods, weekly opening hours,
+a food item inventory and a history of outgoing quantities, from a thousand rows to tens of millions.
+    - Everything is drawn from one seeded random.Random, so the same arguments always give the same database.
+    - Item names, categories and units come from a small vocabulary of real foods and variants; every food bank
+        stocks a different mix of it, a few items are out of stock and quantities are skewed like real shelves.
+    - Outgoing events are spread over the last --days days and favour the popular items; they are inserted into
+        outgoing_events, so the triggers keep outgoing and outgoing_rollup up to date as they do in use.
+    - Rows go in through multi-row INSERTs of batchSize rows (cursor.executemany), one commit per batch, and
+        item attributes are computed from the item's number, so memory stays flat at any size.
+
+Usage:
+    python3 dataffy.py generate --items N [--banks N] [--events N] [--days N] [--seed N] [--database NAME ...]
+    python3 dataffy.py clear --yes [--database NAME ...]
+        empties the inventory tables, for a fresh dataset; meant for a local benchmark database only
+
+Notes:
+    - The database must be at the latest schema version: load 422-finalv2.sql into it, then run
+        python3 migrateffy.py upgrade --database NAME
+    - Generated food banks are named "Synthetic Food Bank N", so they are easy to tell from real ones.
+"""
+import argparse
+import datetime
+import math
+import random
+import time
+
+import utilffy
+from utilffy import getPool, closePool, allocateIds, useDatabase, databaseOptions, databaseSettings, invalidateMetadata
+import queryffy as sql
+
+batchSize = 5000        #rows per multi-row INSERT and per commit
+itemsPerBank = 400      #default food items stocked by each food bank
+eventsPerItem = 2       #default outgoing events per food item
+historyDays = 365       #default days of outgoing history
+
+neighborhoods = ["Downtown", "Whiteaker", "Friendly", "South Eugene", "Bethel", "River Road", "Santa Clara",
+                 "Cal Young", "Harlow", "Ferry Street", "Churchill", "Jefferson Westside", "Fairmount", "Laurel Hill",
+                 "West University", "Goodpasture", "Crest Drive", "Amazon", "Trainsong", "Industrial Corridor"]
+streets = ["Main St", "Oak St", "Pearl St", "Willamette St", "Coburg Rd", "River Rd", "Blair Blvd", "Hilyard St",
+           "Franklin Blvd", "Agate St", "Polk St", "Chambers St", "Jefferson St", "Lincoln St", "Monroe St"]
+# (food, category, units)
+foods = [("Black beans", "Canned", "cans"), ("Kidney beans", "Canned", "cans"), ("Green beans", "Canned", "cans"),
+         ("Corn", "Canned", "cans"), ("Tomato soup", "Canned", "cans"), ("Chicken noodle soup", "Canned", "cans"),
+         ("Tuna", "Canned", "cans"), ("Peaches", "Canned", "cans"), ("Chili", "Canned", "cans"),
+         ("Spaghetti", "Dry", "boxes"), ("Macaroni", "Dry", "boxes"), ("White rice", "Dry", "lbs"),
+         ("Brown rice", "Dry", "lbs"), ("Oatmeal", "Dry", "boxes"), ("Cereal", "Dry", "boxes"), ("Flour", "Dry", "lbs"),
+         ("Peanut butter", "Dry", "jars"), ("Lentils", "Dry", "lbs"), ("Crackers", "Dry", "boxes"),
+         ("Apples", "Produce", "lbs"), ("Bananas", "Produce", "lbs"), ("Potatoes", "Produce", "lbs"),
+         ("Onions", "Produce", "lbs"), ("Carrots", "Produce", "lbs"), ("Cabbage", "Produce", "heads"),
+         ("Oranges", "Produce", "lbs"), ("Milk", "Dairy", "gallons"), ("Cheese", "Dairy", "lbs"),
+         ("Yogurt", "Dairy", "cups"), ("Eggs", "Dairy", "dozen"), ("Butter", "Dairy", "lbs"),
+         ("Frozen peas", "Frozen", "bags"), ("Frozen chicken", "Frozen", "lbs"), ("Fish sticks", "Frozen", "boxes"),
+         ("Frozen berries", "Frozen", "bags"), ("Bread", "Bakery", "loaves"), ("Tortillas", "Bakery", "packs"),
+         ("Bagels", "Bakery", "packs"), ("Baby formula", "Baby", "cans"), ("Diapers", "Baby", "packs"),
+         ("Apple juice", "Beverages", "bottles"), ("Coffee", "Beverages", "lbs"), ("Tea", "Beverages", "boxes")]
+variants = ["", "Organic", "Low sodium", "Family size", "Store brand", "Whole grain", "Gluten free", "Sugar free",
+            "Value pack", "Vegan", "Large", "Small", "Fresh", "Local", "Bulk"]
+vocabulary = [((variant + " " + food).strip(), category, units) for variant in variants
+              for food, category, units in foods]
+
+
+def stride(size:int) -> int:
+    """a step coprime to 'size', so stepping through a food bank's items visits distinct vocabulary entries"""
+    step = max(1, size // 3 + 1)
+    while math.gcd(step, size) != 1:
+        step += 1
+    return step
+
+
+class Layout:
+    """ class Layout(items, banks)
+    Where each of 'items' food items lives: item k (0-based) belongs to bank k // perBank, and its name,
+        category and units are computed from k, so no item list has to be kept in memory.
+    """
+    def __init__(self, items:int, banks:int):
+        self.items = items
+        self.perBank = max(1, math.ceil(items / max(1, banks)))
+        self.banks = math.ceil(items / self.perBank) if items else max(1, banks)
+        self.step = stride(len(vocabulary))
+
+    def bank(self, k:int) -> int:
+        """0-based food bank of item k"""
+        return k // self.perBank
+
+    def item(self, k:int) -> tuple:
+        """(Item_name, Category, Units) of item k, unique within its food bank"""
+        bank, index = divmod(k, self.perBank)
+        name, category, units = vocabulary[(index * self.step + bank) % len(vocabulary)]
+        if index >= len(vocabulary):
+            name = f"{name} {index // len(vocabulary) + 1}"     #more items than the vocabulary: number them
+        return name, category, units
+
+
+def bankRows(rng:random.Random, firstBank:int, count:int) -> list:
+    """food_bank rows (Location, Address, Neighborhood, Phone_number, fb_ID) of 'count' synthetic food banks"""
+    return [(f"Synthetic Food Bank {firstBank + b}", f"{rng.randint(100, 4999)} {rng.choice(streets)}",
+             rng.choice(neighborhoods), f"541-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}", firstBank + b)
+            for b in range(count)]
+
+
+def hoursRows(rng:random.Random, fb_ID:int) -> list:
+    """opening_hours rows (fb_ID, weekday, open_minute, close_minute): open 4 to 7 days a week, some days twice"""
+    rows = []
+    for weekday in sorted(rng.sample(range(7), rng.randint(4, 7))):
+        opening = rng.choice((7, 8, 9, 10, 11)) * 60 + rng.choice((0, 30))
+        closing = opening + rng.choice((3, 4, 6, 8)) * 60
+        if rng.random() < 0.2 and closing + 120 < 22 * 60:     #closed for a while, then opens again
+            rows.append((fb_ID, weekday, opening, closing))
+            opening, closing = closing + 60, min(closing + 60 + rng.choice((2, 3)) * 60, 23 * 60)
+        rows.append((fb_ID, weekday, opening, closing))
+    return rows
+
+
+def quantity(rng:random.Random) -> int:
+    """a shelf quantity: about one item in twelve is out of stock, most have a few dozen, some hundreds"""
+    if rng.random() < 0.08:
+        return 0
+    return int(rng.expovariate(1 / 45)) + 1
+
+
+def insertBatches(connection, statement:str, rows, size:int=batchSize) -> int:
+    """inserts the rows of an iterable in multi-row batches of 'size', committing after each; returns the count"""
+    cursor = connection.cursor()
+    total = 0
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                cursor.executemany(statement, batch)
+                connection.commit()
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(statement, batch)
+            connection.commit()
+            total += len(batch)
+    finally:
+        cursor.close()
+    return total
+
+
+def generate(items:int, banks:int=None, events:int=None, days:int=historyDays, seed:int=422,
+             now:datetime.datetime=None, progress=print) -> dict:
+    """ generate(items, banks, events, days, seed, now, progress)
+    Adds 'banks' food banks (default: one per itemsPerBank items) with opening hours, 'items' food items and
+        'events' outgoing events (default: eventsPerItem per item) over the 'days' days before 'now'.
+    progress(text) is called as each table is filled.
+    Returns the number of rows added to each table and the seconds taken.
+    """
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    now = now if now is not None else datetime.datetime.now().replace(microsecond=0)
+    layout = Layout(items, banks if banks else max(1, math.ceil(items / itemsPerBank)))
+    events = events if events is not None else items * eventsPerItem
+    stats = {}
+
+    firstBank = allocateIds("food_bank", layout.banks)
+    firstItem = allocateIds("food_item", items) if items else 0
+    banksAdded = bankRows(rng, firstBank, layout.banks)
+    locations = [row[0] for row in banksAdded]
+    with getPool().connection() as connection:
+        progress(f"  {layout.banks:,} food banks")
+        stats["food_bank"] = insertBatches(connection, sql.statements["bank.insert"], banksAdded)
+        stats["opening_hours"] = insertBatches(connection, sql.statements["hours.insert"],
+                                               (row for b in range(layout.banks) for row in hoursRows(rng, firstBank + b)))
+        progress(f"  {items:,} food items")
+        def inventory():
+            for k in range(items):
+                name, category, units = layout.item(k)
+                bank = layout.bank(k)
+                yield (name, category, quantity(rng), units, locations[bank], firstBank + bank, firstItem + k)
+
+        stats["food_item"] = insertBatches(connection, sql.statements["item.insert"], inventory())
+
+        def history():
+            span = days * 24 * 60 * 60
+            for i in range(events):
+                k = int(items * rng.random() ** 2)          #popular items (low k within the mix) go out more often
+                name, category, units = layout.item(k)
+                ts = now - datetime.timedelta(seconds=rng.randrange(span))
+                yield (ts, firstItem + k, firstBank + layout.bank(k), rng.randint(1, 20), name, category, units,
+                       locations[layout.bank(k)])
+
+        progress(f"  {events if items else 0:,} outgoing events over {days} days")
+        stats["outgoing_events"] = insertBatches(connection, sql.statements["outgoing.record_at"],
+                                                 history() if items else ())
+    invalidateMetadata()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+# tables emptied by clear(), children first; the outgoing totals and rollups go with the event log
+clearedTables = ("outgoing_rollup", "outgoing", "outgoing_events", "food_item", "opening_hours", "food_bank")
+
+def clear():
+    """ clear()
+    Empties the inventory tables and restarts the food bank and food item ID sequences.
+    """
+    with getPool().cursor(commit=True) as cursor:
+        for table in clearedTables:     #SQLite has no TRUNCATE; its DELETE keeps the name search indexes in step
+            cursor.execute(f"DELETE FROM {table}" if utilffy.backend == "sqlite" else f"TRUNCATE TABLE {table}")
+        cursor.execute("UPDATE id_sequences SET next_id = 1 WHERE name IN ('food_bank', 'food_item')")
+        cursor.execute("UPDATE data_versions SET version = version + 1 WHERE name = 'inventory'")  #TRUNCATE fires no triggers
+    invalidateMetadata()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Food-For-You synthetic data")
+    parser.add_argument("command", choices=["generate", "clear"])
+    parser.add_argument("--items", type=int, default=1000, help="food items to add")
+    parser.add_argument("--banks", type=int, default=None, help=f"food banks to add (default: one per {itemsPerBank} items)")
+    parser.add_argument("--events", type=int, default=None, help=f"outgoing events to add (default: {eventsPerItem} per item)")
+    parser.add_argument("--days", type=int, default=historyDays, help="days of outgoing history")
+    parser.add_argument("--seed", type=int, default=422, help="random seed")
+    parser.add_argument("--yes", action="store_true", help="confirms that clear may empty the tables")
+    databaseOptions(parser)
+    args = parser.parse_args()
+    useDatabase(**{name: getattr(args, name) for name in databaseSettings})
+
+    try:
+        if args.command == "generate":
+            print(f"generating {args.items:,} food items")
+            stats = generate(args.items, args.banks, args.events, args.days, args.seed)
+            print(", ".join(f"{table} {count:,}" for table, count in stats.items() if table != "seconds") +
+                  f" in {stats['seconds']:.1f} seconds")
+        else:
+            if not args.yes:
+                parser.error("clear empties " + ", ".join(clearedTables) + "; add --yes to go ahead")
+            clear()
+            print("emptied " + ", ".join(clearedTables))
+    finally:
+        closePool()
+
+
+if __name__ == "__main__":
+    main()
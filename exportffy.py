@@ -0,0 +1,74 @@
+"""
+Name: exportffy.py
+Created: 10/18/2026
+
+Streaming CSV export of the outgoing log, used by the "Export data" button of AdminView's data log tab.
+Rows are read through an unbuffered cursor in fixed-size chunks and written to the file as they arrive, so memory
+use stays the same whatever the size of the table. The file can optionally be gzip compressed.
+
+Notes:
+    - The export is written to "<filename>.part" first and renamed when complete, so a failed export never leaves
+        a truncated file behind under the final name.
+    - An unbuffered cursor must be read to the end before the connection runs anything else; the row count used
+        for progress is therefore fetched before the export query starts.
+"""
+import csv
+import gzip
+import os
+import time
+
+import queryffy as sql
+
+exportChunk = 5000      #rows fetched from the server per round trip
+headers = ["Item_name", "Category", "Quantity", "Units", "Location", "fb_ID", "fd_ID"]
+
+
+def exportFilename(stamp:str, compress:bool=False) -> str:
+    """ exportFilename(stamp, compress)
+    Returns the export file name for the time stamp 'stamp', ending in .csv.gz when compressed.
+    """
+    return "FoodForYou_Export_" + stamp + (".csv.gz" if compress else ".csv")
+
+
+def exportOutgoing(connection, filename:str, compress:bool=False, chunkSize:int=exportChunk, progress=None) -> dict:
+    """ exportOutgoing(connection, filename, compress, chunkSize, progress)
+    Writes the whole outgoing log, with a header row, to 'filename' as CSV (gzip compressed if 'compress').
+    progress: optional function called as progress(rowsWritten, totalRows) after every chunk
+    Returns a dict with the number of rows written, the seconds taken and rows per second.
+    Nothing is written if the table is empty (rows is 0).
+    """
+    start = time.perf_counter()
+    total = int(sql.fetch(connection, "outgoing.count")[0][0])
+    stats = {"rows": 0, "total": total}
+    if total:
+        partial = filename + ".part"
+        opener = gzip.open if compress else open
+        cursor = connection.cursor(buffered=False)      #streams rows instead of loading the whole result
+        try:
+            with opener(partial, 'wt', newline='') as csvF:
+                csvw = csv.writer(csvF, quotechar='"', delimiter=',')
+                csvw.writerow(headers)
+                cursor.execute(sql.statements["outgoing.all"])
+                while True:
+                    rows = cursor.fetchmany(chunkSize)
+                    if not rows:
+                        break
+                    csvw.writerows(rows)
+                    stats["rows"] += len(rows)
+                    if progress:
+                        progress(stats["rows"], max(total, stats["rows"]))
+            os.replace(partial, filename)       #only a finished export gets the real name
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            try:
+                connection.consume_results()    #drops the rest of the stream so the connection can be reused
+            except Exception:
+                pass
+            raise
+        finally:
+            cursor.close()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
@@ -0,0 +1,101 @@
+"""
+Name: inventoryffy.py
+Created: 10/18/2026
+
+Inventory changes shared by the staff program and the benchmarks, each written as one transaction with as few
+round trips as possible.
+
+addItem() takes in new stock with one INSERT ... SELECT ... ON DUPLICATE KEY UPDATE: the food bank is found by its
+location in the same statement, and the unique key on (fb_ID, Item_name, Units, Category) of schema version 7
+turns a second intake of the same item into an addition to its quantity, even when two terminals add it at once.
+
+adjustQuantity(), moveItem() and deleteItem() call the stored procedures of schema version 8 (adjust_quantity,
+move_item and delete_item). Each procedure checks the request, locks and changes the rows, appends decreases to
+outgoing_events and commits, all on the server, so nothing can change the inventory without its outgoing record
+and the action costs one CALL instead of a round trip per query.
+
+Notes:
+    - addItem() does not commit: the caller commits (or rolls back) together with the rest of its work.
+        The procedures commit their own transaction; a refused or failed call has rolled itself back.
+    - New food item IDs come from the block held by reserveId(), so most intakes and moves reserve no ID on the
+        server; an ID handed to a move that merges into an existing item is simply skipped.
+    - On the SQLite backend the procedures are the Python functions of sqliteffy.py, called the same way.
+"""
+from utilffy import reserveId, databaseErrors
+import queryffy as sql
+
+refused = 1644          #error number of SIGNAL SQLSTATE '45000' in the procedures
+duplicate = 1062        #error number of a duplicate key
+
+
+class InventoryError(Exception):
+    """ class InventoryError(title, message)
+    Raised when an inventory change is refused; nothing has been written when it is raised.
+        title and message are meant for the error box shown to the staff member.
+    """
+    def __init__(self, title:str, message:str):
+        super().__init__(message)
+        self.title = title
+
+
+def callAction(connection, procedure:str, args:tuple) -> tuple:
+    """ callAction(connection, procedure, args)
+    Calls one of the staff action procedures and returns the row it reports.
+    Raises InventoryError if the procedure refused the action or it would duplicate an item.
+    """
+    try:
+        rows = sql.call(connection, procedure, args)
+    except databaseErrors as e:
+        if e.errno == refused:
+            raise InventoryError("ERROR", e.msg) from None
+        if e.errno == duplicate:
+            raise InventoryError("ERROR", "The food bank already has an item with this name, units and category.") from None
+        raise
+    return rows[0]
+
+
+def addItem(connection, item:str, category:str, quantity:int, units:str, location:str) -> tuple:
+    """ addItem(connection, item, category, quantity, units, location)
+    Adds 'quantity' of an item to the food bank at 'location': to the item with the same name, units and category if
+        the food bank has one, otherwise as a new food item.
+    Returns (fd_ID of the item, True if it was created).
+    Raises InventoryError if there is no food bank at 'location'.
+    """
+    key = reserveId("food_item")
+    changed = sql.execute(connection, "item.upsert", (item, category, quantity, units, key, location))
+    existing = sql.lastInsertId(connection, "item.upsert")     #set by LAST_INSERT_ID(fd_ID) on a duplicate
+    if existing and existing != key:                            #SQLite's RETURNING also reports a new item's key
+        return existing, False
+    if not changed:
+        raise InventoryError("ERROR", "Location is not valid, please pick valid location.")
+    return key, True
+
+
+def adjustQuantity(connection, fd_id:int, item:str, units:str, quantity:int) -> int:
+    """ adjustQuantity(connection, fd_id, item, units, quantity)
+    Sets the name, units and quantity of food item 'fd_id'; a lower quantity is recorded as given out.
+    Returns the quantity recorded as given out (0 if the quantity did not go down).
+    Raises InventoryError if the change is not possible.
+    """
+    fd_ID, givenOut = callAction(connection, "adjust_quantity", (int(fd_id), item, units, int(quantity)))
+    return int(givenOut)
+
+
+def moveItem(connection, fd_id:int, destination:str, quantity:int) -> tuple:
+    """ moveItem(connection, fd_id, destination, quantity)
+    Moves 'quantity' of food item 'fd_id' to the food bank at location 'destination', adding it to the same item
+        (same name, units and category) there or creating that item if the food bank does not have it.
+    Returns (destination fd_ID, True if the destination item was created).
+    Raises InventoryError if the move is not possible.
+    """
+    target, created = callAction(connection, "move_item",
+                                 (int(fd_id), destination, int(quantity), reserveId("food_item")))
+    return int(target), bool(created)
+
+
+def deleteItem(connection, fd_id:int):
+    """ deleteItem(connection, fd_id)
+    Deletes food item 'fd_id'.
+    Raises InventoryError if it no longer exists.
+    """
+    callAction(connection, "delete_item", (int(fd_id),))
@@ -0,0 +1,758 @@
+"""
+Name: migrateffy.py
+Created: 10/18/2026
+
+Versioned schema migrations for the Food-For-You database. The database created from 422-finalv2.sql is version 0;
+each migration moves the schema one version forward and knows how to roll itself back. The version a database is
+at is recorded in the schema_migrations table.
+
+Usage:
+    python3 migrateffy.py status
+    python3 migrateffy.py upgrade [--to VERSION] [--batch-size ROWS]
+    python3 migrateffy.py downgrade --to VERSION [--batch-size ROWS]
+    python3 migrateffy.py partitions [--months N]
+        adds the monthly partitions of outgoing_events for the next N months (run it every month, e.g. from cron)
+    Each command also takes --host, --port, --user, --password and --database, e.g. for a local benchmark database.
+
+Notes:
+    - Tables are rebuilt by creating the new table next to the old one, copying rows across in batches (one
+        commit per batch), and swapping the two with a single RENAME TABLE, so readers never see a half-built table.
+    - Close the staff and admin programs while migrating; rows written to a table while it is being copied
+        are not carried over.
+    - An SQLite database (--backend sqlite) is created at the latest version by sqliteffy.py, so there is nothing
+        to migrate and outgoing_events is not partitioned.
+
+Migrations:
+    1: integer primary keys, VARCHAR columns, and indexes on food_bank, food_item, hours and outgoing
+    2: id_sequences table used by utilffy.allocateIds() in place of SELECT MAX(id) + 1
+    3: opening_hours table (one row per food bank, weekday and opening, in minutes after midnight); hours becomes
+        a read-only view with the old 14-column layout for older readers
+    4: ngram FULLTEXT indexes on the item names of food_item and outgoing, for searchffy.py
+    5: outgoing_events, an append-only log of every quantity given out, partitioned by month; a trigger keeps
+        outgoing up to date as the per-item total of the log
+    6: outgoing_rollup, daily and weekly totals of outgoing_events per item name, category and food bank, kept up
+        to date by a second trigger, for the trends tab of AdminView (trendffy.py)
+    7: unique key on food_item (fb_ID, Item_name, Units, Category), so new stock is merged into an existing item
+        with INSERT ... ON DUPLICATE KEY UPDATE; Units and Category become NOT NULL DEFAULT ''
+    8: stored procedures adjust_quantity, move_item and delete_item, which check, change and log a staff action
+        in one call and one transaction (inventoryffy.py)
+    9: data_versions, counters that triggers on food_item and food_bank bump on every change, so caches of
+        search results (recipientffy.py) can tell with one small sum whether the inventory changed
+    10: (Quantity, fd_ID) indexes on food_item and outgoing, so tables sorted by quantity (tableffy.py) read
+        one page of the index per page shown instead of sorting every matching row
+"""
+import argparse
+import datetime
+import time
+
+import utilffy
+from utilffy import getPool, closePool, weekdays, hoursToRows, useDatabase, databaseOptions, databaseSettings
+
+batchSize = 5000        #rows copied per batch (and per commit) while rebuilding a table
+
+# ------------------------------------------------------------------------------------------------------------------
+# Table definitions. {name} is filled in with the table being created, so the same definition builds
+# the replacement table next to the live one. Column order never changes between versions because the
+# programs insert with "values (...)" and read "select *" rows by position.
+# ------------------------------------------------------------------------------------------------------------------
+tablesV0 = {
+    "food_bank": """CREATE TABLE `{name}` (
+          `Location` text,
+          `Address` text,
+          `Neighborhood` text,
+          `Phone_number` text,
+          `fb_ID` int DEFAULT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+    "food_item": """CREATE TABLE `{name}` (
+          `Item_name` text,
+          `Category` text,
+          `Quantity` int DEFAULT NULL,
+          `Units` text,
+          `Location` text,
+          `fb_ID` int DEFAULT NULL,
+          `fd_ID` int DEFAULT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+    "hours": """CREATE TABLE `{name}` (
+          `fb_ID` int DEFAULT NULL,
+          `Monday` text, `Monday_close` text,
+          `Tuesday` text, `Tuesday_close` text,
+          `Wednesday` text, `Wednesday_close` text,
+          `Thursday` text, `Thursday_close` text,
+          `Friday` text, `Friday_close` text,
+          `Saturday` text, `Saturday_close` text,
+          `Sunday` text, `Sunday_close` text
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+    "outgoing": """CREATE TABLE `{name}` (
+          `Item_name` text,
+          `Category` text,
+          `Quantity` text,
+          `Units` text,
+          `Location` text,
+          `fb_ID` text,
+          `fd_ID` text
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+}
+
+tablesV1 = {
+    "food_bank": """CREATE TABLE `{name}` (
+          `Location` varchar(255) NOT NULL,
+          `Address` varchar(255) DEFAULT NULL,
+          `Neighborhood` varchar(100) DEFAULT NULL,
+          `Phone_number` varchar(32) DEFAULT NULL,
+          `fb_ID` int NOT NULL,
+          PRIMARY KEY (`fb_ID`),
+          KEY `idx_food_bank_location` (`Location`),
+          KEY `idx_food_bank_neighborhood` (`Neighborhood`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+    "food_item": """CREATE TABLE `{name}` (
+          `Item_name` varchar(255) NOT NULL,
+          `Category` varchar(100) DEFAULT NULL,
+          `Quantity` int NOT NULL DEFAULT 0,
+          `Units` varchar(50) DEFAULT NULL,
+          `Location` varchar(255) DEFAULT NULL,
+          `fb_ID` int NOT NULL,
+          `fd_ID` int NOT NULL,
+          PRIMARY KEY (`fd_ID`),
+          KEY `idx_food_item_bank_name_units` (`fb_ID`, `Item_name`, `Units`),
+          KEY `idx_food_item_name` (`Item_name`),
+          KEY `idx_food_item_category` (`Category`),
+          KEY `idx_food_item_location` (`Location`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+    "hours": """CREATE TABLE `{name}` (
+          `fb_ID` int NOT NULL,
+          `Monday` varchar(8) NOT NULL DEFAULT '', `Monday_close` varchar(8) NOT NULL DEFAULT '',
+          `Tuesday` varchar(8) NOT NULL DEFAULT '', `Tuesday_close` varchar(8) NOT NULL DEFAULT '',
+          `Wednesday` varchar(8) NOT NULL DEFAULT '', `Wednesday_close` varchar(8) NOT NULL DEFAULT '',
+          `Thursday` varchar(8) NOT NULL DEFAULT '', `Thursday_close` varchar(8) NOT NULL DEFAULT '',
+          `Friday` varchar(8) NOT NULL DEFAULT '', `Friday_close` varchar(8) NOT NULL DEFAULT '',
+          `Saturday` varchar(8) NOT NULL DEFAULT '', `Saturday_close` varchar(8) NOT NULL DEFAULT '',
+          `Sunday` varchar(8) NOT NULL DEFAULT '', `Sunday_close` varchar(8) NOT NULL DEFAULT '',
+          PRIMARY KEY (`fb_ID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+    "outgoing": """CREATE TABLE `{name}` (
+          `Item_name` varchar(255) NOT NULL,
+          `Category` varchar(100) DEFAULT NULL,
+          `Quantity` int NOT NULL DEFAULT 0,
+          `Units` varchar(50) DEFAULT NULL,
+          `Location` varchar(255) DEFAULT NULL,
+          `fb_ID` int NOT NULL,
+          `fd_ID` int NOT NULL,
+          PRIMARY KEY (`fd_ID`),
+          KEY `idx_outgoing_bank_name_units` (`fb_ID`, `Item_name`, `Units`),
+          KEY `idx_outgoing_name` (`Item_name`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci""",
+}
+
+columns = {
+    "food_bank": ["Location", "Address", "Neighborhood", "Phone_number", "fb_ID"],
+    "food_item": ["Item_name", "Category", "Quantity", "Units", "Location", "fb_ID", "fd_ID"],
+    "hours": ["fb_ID"] + [f"{day}{suffix}" for day in
+                          ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+                          for suffix in ("", "_close")],
+    "outgoing": ["Item_name", "Category", "Quantity", "Units", "Location", "fb_ID", "fd_ID"],
+}
+
+primaryKeys = {"food_bank": "fb_ID", "food_item": "fd_ID", "hours": "fb_ID", "outgoing": "fd_ID"}
+
+# version 3: hours in long format, weekday 0 = Monday like datetime's weekday()
+openingHours = """CREATE TABLE `opening_hours` (
+          `fb_ID` int NOT NULL,
+          `weekday` tinyint NOT NULL,
+          `open_minute` smallint NOT NULL,
+          `close_minute` smallint NOT NULL,
+          PRIMARY KEY (`fb_ID`, `weekday`, `open_minute`),
+          KEY `idx_opening_hours_day` (`weekday`, `open_minute`, `close_minute`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci"""
+
+def minuteText(column:str) -> str:
+    """SQL expression formatting a minute column as "H:MM:00", the way version 1 stored times"""
+    return f"CONCAT(({column} MOD 1440) DIV 60, ':', LPAD({column} MOD 60, 2, '0'), ':00')"
+
+# the old layout rebuilt from opening_hours; a day with more than one opening shows the earliest open and latest close
+hoursView = ("CREATE VIEW `hours` AS SELECT fb.fb_ID, " +
+             ", ".join(f"COALESCE(MAX(CASE WHEN d.weekday = {i} THEN {minuteText('d.open_minute')} END), '') AS `{day}`, "
+                       f"COALESCE(MAX(CASE WHEN d.weekday = {i} THEN {minuteText('d.close_minute')} END), '') AS `{day}_close`"
+                       for i, day in enumerate(weekdays)) +
+             " FROM food_bank fb LEFT JOIN (SELECT fb_ID, weekday, MIN(open_minute) AS open_minute, "
+             "MAX(close_minute) AS close_minute FROM opening_hours GROUP BY fb_ID, weekday) d USING(fb_ID) "
+             "GROUP BY fb.fb_ID")
+
+
+class MigrationError(Exception):
+    """ class MigrationError
+    Raised when the data cannot be moved to the new schema as-is (e.g. duplicate ids); nothing has been
+        changed when it is raised by a pre-check.
+    """
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# helpers
+# ------------------------------------------------------------------------------------------------------------------
+def run(statement:str, params:tuple=()):
+    """ run(statement, params)
+    Runs one statement (usually DDL) on a pooled connection and commits.
+    """
+    with getPool().cursor(commit=True) as cursor:
+        cursor.execute(statement, params)
+
+def fetch(statement:str, params:tuple=()) -> list:
+    """ fetch(statement, params)
+    Runs one SELECT on a pooled connection and returns its rows.
+    """
+    with getPool().cursor() as cursor:
+        cursor.execute(statement, params)
+        return cursor.fetchall()
+
+def copyRows(source:str, target:str, names:list, size:int, convert=None, insert:str=None) -> int:
+    """ copyRows(source, target, names, size, convert, insert)
+    Streams every row of 'source' into 'target' in batches of 'size' rows, committing after each batch.
+        - names: columns to copy, in order
+        - convert: optional function applied to each row before it is inserted
+        - insert: optional INSERT statement to use instead of a plain insert of 'names'
+    The source is read through an unbuffered cursor, so memory use stays at one batch whatever the table size.
+    Returns the number of rows copied.
+    """
+    columnList = ", ".join(f"`{c}`" for c in names)
+    if insert is None:
+        insert = f"INSERT INTO `{target}` ({columnList}) VALUES ({', '.join(['%s'] * len(names))})"
+    copied = 0
+    start = time.perf_counter()
+    with getPool().connection() as reader, getPool().connection() as writer:
+        readCursor = reader.cursor()        #unbuffered: rows arrive as they are fetched
+        writeCursor = writer.cursor()
+        readCursor.execute(f"SELECT {columnList} FROM `{source}`")
+        while True:
+            rows = readCursor.fetchmany(size)
+            if not rows:
+                break
+            if convert is not None:
+                rows = [convert(row) for row in rows]
+            writeCursor.executemany(insert, rows)
+            writer.commit()
+            copied += len(rows)
+            print(f"    {source} -> {target}: {copied} rows ({copied / (time.perf_counter() - start):,.0f} rows/s)")
+        readCursor.close()
+        writeCursor.close()
+    return copied
+
+def rebuildTable(table:str, definition:str, names:list, size:int, convert=None, insert:str=None) -> int:
+    """ rebuildTable(table, definition, names, size, convert, insert)
+    Replaces 'table' with a table built from 'definition', keeping its rows:
+        creates `<table>_new`, copies the rows across in batches, swaps the two tables in one RENAME TABLE and
+        drops the old one.
+    Returns the number of rows copied.
+    """
+    run(f"DROP TABLE IF EXISTS `{table}_new`")
+    run(definition.format(name=f"{table}_new"))
+    copied = copyRows(table, f"{table}_new", names, size, convert, insert)
+    run(f"DROP TABLE IF EXISTS `{table}_old`")
+    run(f"RENAME TABLE `{table}` TO `{table}_old`, `{table}_new` TO `{table}`")
+    run(f"DROP TABLE `{table}_old`")
+    return copied
+
+def checkKey(table:str, key:str):
+    """ checkKey(table, key)
+    Raises MigrationError if 'key' has NULL or repeated values in 'table', since it is about to become a primary key.
+    """
+    missing = fetch(f"SELECT COUNT(*) FROM `{table}` WHERE `{key}` IS NULL")[0][0]
+    if missing:
+        raise MigrationError(f"{table} has {missing} row(s) without a {key}; give them ids before migrating.")
+    repeated = fetch(f"SELECT `{key}`, COUNT(*) FROM `{table}` GROUP BY `{key}` HAVING COUNT(*) > 1 LIMIT 10")
+    if repeated:
+        raise MigrationError(f"{table} has repeated {key} values {[row[0] for row in repeated]}; "
+                             f"fix them before migrating.")
+
+def toInt(value):
+    """converts the text numbers stored by version 0 of outgoing to int (empty values become 0)"""
+    if value is None or str(value).strip() == "":
+        return 0
+    return int(str(value).strip())
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 1: keyed and indexed tables
+# ------------------------------------------------------------------------------------------------------------------
+def upgrade1(size:int):
+    for table in ("food_bank", "food_item", "hours"):
+        checkKey(table, primaryKeys[table])
+    for table in ("food_bank", "food_item"):
+        print(f"  rebuilding {table}")
+        rebuildTable(table, tablesV1[table], columns[table], size)
+
+    # closed days are stored as '' rather than NULL
+    print("  rebuilding hours")
+    rebuildTable("hours", tablesV1["hours"], columns["hours"], size,
+                 convert=lambda row: row[:1] + tuple('' if value is None else value for value in row[1:]))
+
+    # outgoing stored numbers as text and could hold more than one row per food item; rows for the same
+    # food item are merged by adding their quantities
+    print("  rebuilding outgoing")
+    names = columns["outgoing"]
+    insert = (f"INSERT INTO `outgoing_new` ({', '.join(names)}) VALUES ({', '.join(['%s'] * len(names))}) "
+              f"ON DUPLICATE KEY UPDATE Quantity = Quantity + VALUES(Quantity)")
+    rebuildTable("outgoing", tablesV1["outgoing"], names, size,
+                 convert=lambda row: row[:2] + (toInt(row[2]),) + row[3:5] + (toInt(row[5]), toInt(row[6])),
+                 insert=insert)
+
+def downgrade1(size:int):
+    for table in ("food_bank", "food_item", "hours", "outgoing"):
+        print(f"  rebuilding {table}")
+        rebuildTable(table, tablesV0[table], columns[table], size)
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 2: id sequences
+# ------------------------------------------------------------------------------------------------------------------
+def upgrade2(size:int):
+    run("CREATE TABLE id_sequences ("
+        "name varchar(32) NOT NULL PRIMARY KEY, "
+        "next_id int NOT NULL"
+        ") ENGINE=InnoDB")
+    # each sequence starts right after the largest id already in use
+    run("INSERT INTO id_sequences (name, next_id) VALUES "
+        "('food_item', (SELECT COALESCE(MAX(fd_ID), 0) + 1 FROM food_item)), "
+        "('food_bank', (SELECT COALESCE(MAX(fb_ID), 0) + 1 FROM food_bank))")
+
+def downgrade2(size:int):
+    run("DROP TABLE IF EXISTS id_sequences")
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 3: long-format opening hours
+# ------------------------------------------------------------------------------------------------------------------
+def upgrade3(size:int):
+    run("DROP TABLE IF EXISTS opening_hours")
+    run(openingHours)
+    # one hours row per food bank, each turned into up to seven opening_hours rows
+    names = columns["hours"]
+    rows = []
+    for row in fetch(f"SELECT {', '.join(names)} FROM hours"):
+        rows.extend(hoursToRows(row[0], list(row[1:])))
+    insert = "INSERT INTO opening_hours (fb_ID, weekday, open_minute, close_minute) VALUES (%s, %s, %s, %s)"
+    for i in range(0, len(rows), size):
+        with getPool().cursor(commit=True) as cursor:
+            cursor.executemany(insert, rows[i:i + size])
+    print(f"    hours -> opening_hours: {len(rows)} rows")
+    run("DROP TABLE IF EXISTS hours_old")
+    run("RENAME TABLE hours TO hours_old")
+    run(hoursView)
+    run("DROP TABLE hours_old")
+
+def downgrade3(size:int):
+    run("DROP TABLE IF EXISTS hours_new")
+    run(tablesV1["hours"].format(name="hours_new"))
+    run("INSERT INTO hours_new SELECT * FROM hours")     #the view already has the old layout
+    run("DROP VIEW hours")
+    run("RENAME TABLE hours_new TO hours")
+    run("DROP TABLE opening_hours")
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 4: item name search
+# ------------------------------------------------------------------------------------------------------------------
+searchIndexes = {"food_item": "ft_food_item_name", "outgoing": "ft_outgoing_name"}
+
+def upgrade4(size:int):
+    # the default stopword list holds single letters such as "a", and the ngram parser drops every ngram that
+    # contains a stopword, so the indexes are built with stopwords off or "bean" could never be found
+    with getPool().cursor(commit=True) as cursor:
+        cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        for table, index in searchIndexes.items():
+            print(f"  indexing {table}.Item_name")
+            cursor.execute(f"ALTER TABLE `{table}` ADD FULLTEXT KEY `{index}` (`Item_name`) WITH PARSER ngram")
+        cursor.execute("SET SESSION innodb_ft_enable_stopword = ON")
+
+def downgrade4(size:int):
+    for table, index in searchIndexes.items():
+        run(f"ALTER TABLE `{table}` DROP INDEX `{index}`")
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 5: append-only outgoing log
+# ------------------------------------------------------------------------------------------------------------------
+monthsAhead = 12        #monthly partitions kept ready past the current month
+
+# one row per decrease; the primary key holds ts because every unique key of a partitioned table must
+outgoingEvents = """CREATE TABLE `outgoing_events` (
+          `event_ID` bigint NOT NULL AUTO_INCREMENT,
+          `ts` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          `fd_ID` int NOT NULL,
+          `fb_ID` int NOT NULL,
+          `delta` int NOT NULL,
+          `Item_name` varchar(255) NOT NULL,
+          `Category` varchar(100) DEFAULT NULL,
+          `Units` varchar(50) DEFAULT NULL,
+          `Location` varchar(255) DEFAULT NULL,
+          PRIMARY KEY (`event_ID`, `ts`),
+          KEY `idx_outgoing_events_item` (`fd_ID`, `ts`),
+          KEY `idx_outgoing_events_bank` (`fb_ID`, `ts`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+        PARTITION BY RANGE (TO_DAYS(`ts`)) ({partitions})"""
+
+# outgoing becomes the rollup of the log: each new event adds its quantity to the item's total
+outgoingRollup = """CREATE TRIGGER `outgoing_events_total` AFTER INSERT ON `outgoing_events` FOR EACH ROW
+        INSERT INTO outgoing (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID)
+        VALUES (NEW.Item_name, NEW.Category, NEW.delta, NEW.Units, NEW.Location, NEW.fb_ID, NEW.fd_ID)
+        ON DUPLICATE KEY UPDATE Quantity = Quantity + NEW.delta, Item_name = NEW.Item_name, Category = NEW.Category,
+            Units = NEW.Units, Location = NEW.Location, fb_ID = NEW.fb_ID"""
+
+def monthStart(day:datetime.date, months:int=0) -> datetime.date:
+    """first day of the month 'months' after the month of 'day'"""
+    month = day.year * 12 + day.month - 1 + months
+    return datetime.date(month // 12, month % 12 + 1, 1)
+
+def monthPartition(start:datetime.date) -> str:
+    """partition holding the events of the month starting on 'start'"""
+    return f"PARTITION p{start:%Y%m} VALUES LESS THAN (TO_DAYS('{monthStart(start, 1):%Y-%m-%d}'))"
+
+def addPartitions(months:int=monthsAhead) -> int:
+    """ addPartitions(months)
+    Splits monthly partitions off the catch-all p_future partition of outgoing_events until the current month
+        and the next 'months' months have their own. Returns the number of partitions added.
+    """
+    existing = {row[0] for row in fetch("SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                                        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'outgoing_events'")}
+    last = max((name for name in existing if name[1:].isdigit()), default=None)
+    first = monthStart(datetime.date.today())
+    if last is not None:       #carry on right after the newest month, so missed months get their partition too
+        first = monthStart(datetime.date(int(last[1:5]), int(last[5:7]), 1), 1)
+    added = []
+    while first <= monthStart(datetime.date.today(), months):
+        added.append(first)
+        first = monthStart(first, 1)
+    if added:
+        run("ALTER TABLE outgoing_events REORGANIZE PARTITION p_future INTO (" +
+            ", ".join(monthPartition(start) for start in added) + ", PARTITION p_future VALUES LESS THAN MAXVALUE)")
+    return len(added)
+
+def upgrade5(size:int):
+    first = monthStart(datetime.date.today())
+    partitions = ([f"PARTITION p_past VALUES LESS THAN (TO_DAYS('{first:%Y-%m-%d}'))"] +
+                  [monthPartition(monthStart(first, i)) for i in range(monthsAhead + 1)] +
+                  ["PARTITION p_future VALUES LESS THAN MAXVALUE"])
+    run("DROP TABLE IF EXISTS outgoing_events")
+    run(outgoingEvents.format(partitions=", ".join(partitions)))
+    # the totals kept so far have no dates: each becomes one event at migration time
+    run("INSERT INTO outgoing_events (fd_ID, fb_ID, delta, Item_name, Category, Units, Location) "
+        "SELECT fd_ID, fb_ID, Quantity, Item_name, Category, Units, Location FROM outgoing "
+        "WHERE Quantity <> 0 ORDER BY fd_ID")
+    run(outgoingRollup)
+
+def downgrade5(size:int):
+    run("DROP TRIGGER IF EXISTS outgoing_events_total")
+    run("DROP TABLE outgoing_events")     #outgoing already holds the totals
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 6: daily and weekly outgoing rollups
+# ------------------------------------------------------------------------------------------------------------------
+# one row per period, dimension and key; a trend is a range of the primary key, a top list a range of the index
+outgoingTotals = """CREATE TABLE `outgoing_rollup` (
+          `period` enum('day','week') NOT NULL,
+          `period_start` date NOT NULL,
+          `dimension` enum('item','category','bank') NOT NULL,
+          `dim_key` varchar(255) NOT NULL,
+          `quantity` bigint NOT NULL DEFAULT 0,
+          `events` int NOT NULL DEFAULT 0,
+          PRIMARY KEY (`dimension`, `period`, `dim_key`, `period_start`),
+          KEY `idx_outgoing_rollup_period` (`dimension`, `period`, `period_start`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci"""
+
+# period -> start of the period holding ts (weeks start on Monday); dimension -> key of an event
+rollupPeriods = {"day": "DATE({ts})", "week": "DATE({ts}) - INTERVAL WEEKDAY({ts}) DAY"}
+rollupKeys = {"item": "{row}Item_name", "category": "COALESCE({row}Category, '')", "bank": "{row}fb_ID"}
+
+# each new event adds to its six rollup rows in one multi-row upsert
+outgoingRollupTrigger = ("CREATE TRIGGER `outgoing_events_rollup` AFTER INSERT ON `outgoing_events` FOR EACH ROW "
+                         "FOLLOWS `outgoing_events_total` "
+                         "INSERT INTO outgoing_rollup (period, period_start, dimension, dim_key, quantity, events) VALUES " +
+                         ", ".join(f"('{period}', {start.format(ts='NEW.ts')}, '{dimension}', "
+                                   f"{key.format(row='NEW.')}, NEW.delta, 1)"
+                                   for period, start in rollupPeriods.items() for dimension, key in rollupKeys.items()) +
+                         " ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity), events = events + 1")
+
+def upgrade6(size:int):
+    run("DROP TABLE IF EXISTS outgoing_rollup")
+    run(outgoingTotals)
+    for period, start in rollupPeriods.items():
+        for dimension, key in rollupKeys.items():
+            print(f"  rolling up outgoing_events by {period} and {dimension}")
+            run(f"INSERT INTO outgoing_rollup (period, period_start, dimension, dim_key, quantity, events) "
+                f"SELECT '{period}', {start.format(ts='ts')}, '{dimension}', {key.format(row='')}, SUM(delta), COUNT(*) "
+                f"FROM outgoing_events GROUP BY 2, 4")
+    run(outgoingRollupTrigger)
+
+def downgrade6(size:int):
+    run("DROP TRIGGER IF EXISTS outgoing_events_rollup")
+    run("DROP TABLE outgoing_rollup")
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 7: one row per item and food bank
+# ------------------------------------------------------------------------------------------------------------------
+def upgrade7(size:int):
+    # NULLs never collide in a unique key, so missing units and categories are stored as ''
+    repeated = fetch("SELECT fb_ID, Item_name, COALESCE(Units, ''), COALESCE(Category, ''), COUNT(*) FROM food_item "
+                     "GROUP BY 1, 2, 3, 4 HAVING COUNT(*) > 1 LIMIT 10")
+    if repeated:
+        raise MigrationError(f"food_item has the same item more than once in a food bank: "
+                             f"{[row[:4] for row in repeated]}; merge them before migrating.")
+    run("UPDATE food_item SET Units = COALESCE(Units, ''), Category = COALESCE(Category, '') "
+        "WHERE Units IS NULL OR Category IS NULL")
+    run("ALTER TABLE food_item "
+        "MODIFY `Category` varchar(100) NOT NULL DEFAULT '', "
+        "MODIFY `Units` varchar(50) NOT NULL DEFAULT '', "
+        "ADD UNIQUE KEY `uq_food_item_bank_item` (`fb_ID`, `Item_name`, `Units`, `Category`), "
+        "DROP KEY `idx_food_item_bank_name_units`")      #a prefix of the new key
+
+def downgrade7(size:int):
+    run("ALTER TABLE food_item "
+        "ADD KEY `idx_food_item_bank_name_units` (`fb_ID`, `Item_name`, `Units`), "
+        "DROP KEY `uq_food_item_bank_item`, "
+        "MODIFY `Category` varchar(100) DEFAULT NULL, "
+        "MODIFY `Units` varchar(50) DEFAULT NULL")
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 8: stored procedures for staff actions
+# ------------------------------------------------------------------------------------------------------------------
+# Each procedure runs its own transaction, so a staff action is a single CALL: any error (including the
+# SIGNALs that refuse an action, SQLSTATE 45000) rolls it back and is passed on to the caller. Each one ends
+# with a one-row result describing what it changed.
+procedures = {
+    # new name, units and quantity for an item; a decrease is appended to outgoing_events
+    "adjust_quantity": """CREATE PROCEDURE adjust_quantity(IN p_fd_ID int, IN p_name varchar(255),
+            IN p_units varchar(50), IN p_quantity int)
+        BEGIN
+            DECLARE v_quantity int DEFAULT NULL;
+            DECLARE v_name varchar(255);
+            DECLARE v_category varchar(100);
+            DECLARE v_units varchar(50);
+            DECLARE v_location varchar(255);
+            DECLARE v_bank int;
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+            IF p_quantity IS NULL OR p_quantity < 0 THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Quantity must be non-negative';
+            END IF;
+            START TRANSACTION;
+            SELECT Quantity, Item_name, Category, Units, Location, fb_ID
+                INTO v_quantity, v_name, v_category, v_units, v_location, v_bank
+                FROM food_item WHERE fd_ID = p_fd_ID FOR UPDATE;
+            IF v_quantity IS NULL THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'The item no longer exists.';
+            END IF;
+            UPDATE food_item SET Item_name = p_name, Units = p_units, Quantity = p_quantity WHERE fd_ID = p_fd_ID;
+            IF p_quantity < v_quantity THEN
+                INSERT INTO outgoing_events (fd_ID, fb_ID, delta, Item_name, Category, Units, Location)
+                    VALUES (p_fd_ID, v_bank, v_quantity - p_quantity, v_name, v_category, v_units, v_location);
+            END IF;
+            COMMIT;
+            SELECT p_fd_ID AS fd_ID, GREATEST(v_quantity - p_quantity, 0) AS given_out;
+        END""",
+    # moves stock to the same item at another food bank, creating it there as p_new_fd_ID if needed
+    "move_item": """CREATE PROCEDURE move_item(IN p_fd_ID int, IN p_destination varchar(255), IN p_quantity int,
+            IN p_new_fd_ID int)
+        BEGIN
+            DECLARE v_available int DEFAULT NULL;
+            DECLARE v_name varchar(255);
+            DECLARE v_category varchar(100);
+            DECLARE v_units varchar(50);
+            DECLARE v_source int;
+            DECLARE v_bank int DEFAULT NULL;
+            DECLARE v_target int DEFAULT NULL;
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+            IF p_quantity IS NULL OR p_quantity < 0 THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'The move quantity cannot be negative';
+            END IF;
+            START TRANSACTION;
+            SELECT fb_ID INTO v_bank FROM food_bank WHERE Location = p_destination LIMIT 1;
+            SELECT Quantity, Item_name, Category, Units, fb_ID INTO v_available, v_name, v_category, v_units, v_source
+                FROM food_item WHERE fd_ID = p_fd_ID FOR UPDATE;
+            IF v_available IS NULL OR v_bank IS NULL THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'The item or the food bank it was being moved to no longer exists.';
+            END IF;
+            IF p_quantity > v_available THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'The move quantity cannot be greater than the current quantity';
+            END IF;
+            IF v_bank = v_source THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Select a different location.';
+            END IF;
+            SELECT fd_ID INTO v_target FROM food_item
+                WHERE fb_ID = v_bank AND Item_name = v_name AND Units = v_units AND Category = v_category FOR UPDATE;
+            IF v_target IS NULL AND EXISTS (SELECT 1 FROM food_item
+                    WHERE fb_ID = v_bank AND Item_name = v_name AND Units = v_units) THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'The items are not the same. Check units and category.';
+            END IF;
+            UPDATE food_item SET Quantity = Quantity - p_quantity WHERE fd_ID = p_fd_ID;
+            IF v_target IS NULL THEN
+                INSERT INTO food_item (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID)
+                    VALUES (v_name, v_category, p_quantity, v_units, p_destination, v_bank, p_new_fd_ID);
+                COMMIT;
+                SELECT p_new_fd_ID AS fd_ID, 1 AS created;
+            ELSE
+                UPDATE food_item SET Quantity = Quantity + p_quantity WHERE fd_ID = v_target;
+                COMMIT;
+                SELECT v_target AS fd_ID, 0 AS created;
+            END IF;
+        END""",
+    "delete_item": """CREATE PROCEDURE delete_item(IN p_fd_ID int)
+        BEGIN
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION BEGIN ROLLBACK; RESIGNAL; END;
+            START TRANSACTION;
+            DELETE FROM food_item WHERE fd_ID = p_fd_ID;
+            IF ROW_COUNT() = 0 THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'The item no longer exists.';
+            END IF;
+            COMMIT;
+            SELECT p_fd_ID AS fd_ID;
+        END""",
+}
+
+def upgrade8(size:int):
+    for name, definition in procedures.items():
+        print(f"  creating procedure {name}")
+        run(f"DROP PROCEDURE IF EXISTS {name}")
+        run(definition)
+
+def downgrade8(size:int):
+    for name in procedures:
+        run(f"DROP PROCEDURE IF EXISTS {name}")
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 9: a version counter for the inventory
+# ------------------------------------------------------------------------------------------------------------------
+dataVersions = """CREATE TABLE `data_versions` (
+          `name` varchar(64) NOT NULL,
+          `shard` smallint unsigned NOT NULL,
+          `version` bigint unsigned NOT NULL DEFAULT 0,
+          PRIMARY KEY (`name`, `shard`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci"""
+
+# every change to what a recipient search shows bumps an "inventory" counter; the bump happens inside the
+# changing transaction, so a reader never sees the new counter before the new rows. The counter is split into
+# versionShards rows picked by connection, so terminals writing at the same time do not queue on one row lock;
+# the inventory version is the sum of the shards, which only ever grows
+versionedTables = ("food_item", "food_bank")
+versionEvents = ("INSERT", "UPDATE", "DELETE")
+versionShards = 64
+
+def upgrade9(size:int):
+    run("DROP TABLE IF EXISTS data_versions")
+    run(dataVersions)
+    run("INSERT INTO data_versions (name, shard, version) VALUES " +
+        ", ".join(f"('inventory', {shard}, {int(shard == 0)})" for shard in range(versionShards)))
+    for table in versionedTables:
+        for event in versionEvents:
+            run(f"DROP TRIGGER IF EXISTS {table}_version_{event.lower()}")
+            run(f"CREATE TRIGGER `{table}_version_{event.lower()}` AFTER {event} ON `{table}` FOR EACH ROW "
+                f"UPDATE data_versions SET version = version + 1 "
+                f"WHERE name = 'inventory' AND shard = CONNECTION_ID() % {versionShards}")
+
+def downgrade9(size:int):
+    for table in versionedTables:
+        for event in versionEvents:
+            run(f"DROP TRIGGER IF EXISTS {table}_version_{event.lower()}")
+    run("DROP TABLE data_versions")
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# 10: indexes for quantity-sorted pages
+# ------------------------------------------------------------------------------------------------------------------
+quantityIndexes = {"food_item": "idx_food_item_quantity", "outgoing": "idx_outgoing_quantity"}
+
+def upgrade10(size:int):
+    for table, index in quantityIndexes.items():
+        run(f"ALTER TABLE `{table}` ADD KEY `{index}` (`Quantity`, `fd_ID`)")
+
+def downgrade10(size:int):
+    for table, index in quantityIndexes.items():
+        run(f"ALTER TABLE `{table}` DROP KEY `{index}`")
+
+
+# (version, description, upgrade, downgrade), in version order
+migrations = [
+    (1, "integer primary keys, VARCHAR columns and indexes", upgrade1, downgrade1),
+    (2, "id sequences for food items and food banks", upgrade2, downgrade2),
+    (3, "opening hours in minutes, one row per opening; hours becomes a view", upgrade3, downgrade3),
+    (4, "ngram full-text indexes for item name search", upgrade4, downgrade4),
+    (5, "append-only outgoing_events log partitioned by month; outgoing becomes its rollup", upgrade5, downgrade5),
+    (6, "daily and weekly outgoing rollups per item, category and food bank", upgrade6, downgrade6),
+    (7, "unique food item per food bank, name, units and category", upgrade7, downgrade7),
+    (8, "stored procedures for adjusting, moving and deleting items", upgrade8, downgrade8),
+    (9, "inventory version counter kept by triggers, for search result caches", upgrade9, downgrade9),
+    (10, "quantity indexes for quantity-sorted table pages", upgrade10, downgrade10),
+]
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# runner
+# ------------------------------------------------------------------------------------------------------------------
+def currentVersion() -> int:
+    """ currentVersion()
+    Returns the schema version of the database, creating the schema_migrations table on first use.
+    """
+    run("CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version int NOT NULL PRIMARY KEY, "
+        "description varchar(255) NOT NULL, "
+        "applied_at datetime NOT NULL DEFAULT CURRENT_TIMESTAMP)")
+    version = fetch("SELECT MAX(version) FROM schema_migrations")[0][0]
+    return version if version is not None else 0
+
+def upgrade(target:int=None, size:int=batchSize):
+    """ upgrade(target, size)
+    Applies every migration after the current version, up to and including 'target' (default: the latest).
+    """
+    current = currentVersion()
+    target = migrations[-1][0] if target is None else target
+    for version, description, forward, backward in migrations:
+        if current < version <= target:
+            print(f"upgrading to {version}: {description}")
+            forward(size)
+            run("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)", (version, description))
+
+def downgrade(target:int, size:int=batchSize):
+    """ downgrade(target, size)
+    Rolls back every applied migration newer than 'target', newest first.
+    """
+    current = currentVersion()
+    for version, description, forward, backward in reversed(migrations):
+        if target < version <= current:
+            print(f"rolling back {version}: {description}")
+            backward(size)
+            run("DELETE FROM schema_migrations WHERE version = %s", (version,))
+
+def main():
+    parser = argparse.ArgumentParser(description="Food-For-You schema migrations")
+    parser.add_argument("command", choices=["status", "upgrade", "downgrade", "partitions"])
+    parser.add_argument("--to", type=int, default=None, help="version to upgrade or roll back to")
+    parser.add_argument("--months", type=int, default=monthsAhead, help="months of outgoing_events partitions to add")
+    parser.add_argument("--batch-size", type=int, default=batchSize, help="rows copied per batch")
+    databaseOptions(parser)
+    args = parser.parse_args()
+    useDatabase(**{name: getattr(args, name) for name in databaseSettings})
+
+    try:
+        if args.command == "status":
+            current = currentVersion()
+            for version, description, forward, backward in migrations:
+                print(f"{'*' if version <= current else ' '} {version}: {description}")
+            print(f"database is at version {current}")
+        elif args.command == "upgrade":
+            upgrade(args.to, args.batch_size)
+        elif args.command == "partitions" and utilffy.backend == "sqlite":
+            print("outgoing_events is not partitioned in an SQLite database")
+        elif args.command == "partitions":
+            print(f"added {addPartitions(args.months)} outgoing_events partitions")
+        else:
+            if args.to is None:
+                parser.error("downgrade needs --to VERSION")
+            downgrade(args.to, args.batch_size)
+    except MigrationError as e:
+        print("Migration stopped:", e)
+    finally:
+        closePool()
+
+
+if __name__ == "__main__":
+    main()
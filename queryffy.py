@@ -0,0 +1,303 @@
+"""
+Name: queryffy.py
+Created: 10/18/2026
+
+Holds every SQL statement used by the Food-For-You modules as a named, parameterized statement, and runs them
+as server-side prepared statements. Each connection keeps one prepared cursor per statement name, so a statement
+is parsed by the server once per connection and only its parameters are sent on every later call.
+
+Usage:
+    with getPool().connection() as connection:
+        rows = fetch(connection, "bank.id_by_location", (location,))
+
+Notes:
+    - Values are always passed as parameters, never formatted into the SQL text.
+    - Opening hours are read from opening_hours (schema version 3): one row per food bank, weekday
+        (0 = Monday) and opening, with times stored as minutes after midnight.
+    - Item name searches use the ngram FULLTEXT indexes of schema version 4, see searchffy.py.
+    - Staff actions run as stored procedures (schema version 8) through call().
+    - The same statements run on the embedded SQLite backend (sqliteffy.py); the few that SQLite words differently
+        have their SQLite version in sqliteStatements.
+"""
+import threading
+import weakref
+
+statements = {
+    # ------------------------------- food banks -------------------------------
+    "bank.locations": "SELECT fb.Location from food_bank fb order by fb.Location ASC",
+    "bank.neighborhoods": "SELECT DISTINCT Neighborhood FROM food_bank ORDER BY Neighborhood",
+    "bank.id_by_location": "select fb.fb_ID from food_bank fb where fb.Location = %s",
+    "bank.by_name": "select * from food_bank fb where fb.Location = %s",
+    "bank.by_address": "select * from food_bank fb where fb.Address = %s",
+    "bank.info": "SELECT Address, Phone_number, Location FROM food_bank WHERE fb_ID = %s",
+    "bank.insert": "insert into food_bank values (%s, %s, %s, %s, %s)",
+
+    # ------------------------------- food items -------------------------------
+    "item.categories": "SELECT DISTINCT fi.Category from food_item fi order by fi.Category ASC",
+    "item.names": "SELECT DISTINCT Item_name FROM food_item",
+    "item.quantity": "select fi.Quantity from food_item fi where fi.fd_id = %s",
+    "item.find_at_location": "select * from food_item fi where fi.Item_name = %s and fi.Units = %s "
+                             "and fi.Location = %s and fi.fb_ID = %s",
+    "item.find_in_bank": "select * from food_item fi where fi.Item_name = %s and fi.fb_ID = %s and fi.Units = %s",
+    "item.find_by_name": "select * from food_item fi where fi.Item_name = %s and fi.fb_ID = %s",
+    "item.find_duplicate": "select * from food_item fi where fi.Item_name = %s and fi.Units = %s "
+                           "and fi.Category = %s and fi.Location = %s",
+    "item.id_by_name": "select fi.fd_ID from food_item fi join food_bank fb using (fb_ID) "
+                       "where fb_ID = %s and fi.Item_name = %s",
+    "item.insert": "insert into food_item values (%s, %s, %s, %s, %s, %s, %s)",
+    "item.update": "update food_item set Item_name = %s, Quantity = %s, Units = %s, Location = %s, fb_ID = %s "
+                   "where fd_ID = %s",
+    "item.set_quantity": "update food_item set Quantity = %s where fd_ID = %s",
+    "item.delete": "delete from food_item where fd_ID = %s",
+    # intake in one statement (schema version 7): the food bank is found by location, new stock is added to the same
+    # item if the bank has it, and LAST_INSERT_ID(fd_ID) reports which existing item that was;
+    # params: Item_name, Category, Quantity, Units, new fd_ID, Location
+    "item.upsert": "insert into food_item (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID) "
+                   "select %s, %s, %s, %s, fb.Location, fb.fb_ID, %s from food_bank fb where fb.Location = %s "
+                   "on duplicate key update Quantity = Quantity + VALUES(Quantity), fd_ID = LAST_INSERT_ID(fd_ID)",
+
+    # ------------------------------- outgoing log -----------------------------
+    "outgoing.all": "SELECT * from outgoing",
+    "outgoing.count": "SELECT COUNT(*) from outgoing",
+    # outgoing_events is append-only; a trigger adds each event to the item's total in outgoing (schema version 5)
+    "outgoing.record": "insert into outgoing_events (fd_ID, fb_ID, delta, Item_name, Category, Units, Location) "
+                       "values (%s, %s, %s, %s, %s, %s, %s)",
+    # a past event with its own time stamp (synthetic history, dataffy.py)
+    "outgoing.record_at": "insert into outgoing_events (ts, fd_ID, fb_ID, delta, Item_name, Category, Units, Location) "
+                          "values (%s, %s, %s, %s, %s, %s, %s, %s)",
+    # row counts of the tables the benchmarks scale with
+    "data.counts": "SELECT (SELECT COUNT(*) FROM food_bank), (SELECT COUNT(*) FROM opening_hours), "
+                   "(SELECT COUNT(*) FROM food_item), (SELECT COUNT(*) FROM outgoing_events), "
+                   "(SELECT COUNT(*) FROM outgoing)",
+
+    # ------------------------------- outgoing trends (trendffy.py) ------------
+    # params: dimension, period, first period_start, top n, dimension
+    "trends.top": "SELECT t.dim_key, COALESCE(fb.Location, t.dim_key), t.quantity, t.events FROM "
+                  "(SELECT dim_key, SUM(quantity) AS quantity, SUM(events) AS events FROM outgoing_rollup "
+                  "WHERE dimension = %s AND period = %s AND period_start >= %s "
+                  "GROUP BY dim_key ORDER BY quantity DESC LIMIT %s) t "
+                  "LEFT JOIN food_bank fb ON %s = 'bank' AND fb.fb_ID = t.dim_key "
+                  "ORDER BY t.quantity DESC",
+    # params: dimension, period, key, first period_start
+    "trends.series": "SELECT period_start, quantity, events FROM outgoing_rollup "
+                     "WHERE dimension = %s AND period = %s AND dim_key = %s AND period_start >= %s "
+                     "ORDER BY period_start",
+    # every key of a dimension adds up to the same total, the category rollup has the fewest rows to add
+    # params: period, first period_start
+    "trends.total": "SELECT period_start, SUM(quantity), SUM(events) FROM outgoing_rollup "
+                    "WHERE dimension = 'category' AND period = %s AND period_start >= %s "
+                    "GROUP BY period_start ORDER BY period_start",
+
+    # ------------------------------- hours ------------------------------------
+    "hours.insert": "insert into opening_hours (fb_ID, weekday, open_minute, close_minute) values (%s, %s, %s, %s)",
+    # params: weekday, minute, minute
+    "hours.open_now": "SELECT DISTINCT fb_ID FROM opening_hours "
+                      "WHERE weekday = %s AND open_minute <= %s AND close_minute > %s",
+    # everything scheduleffy.ScheduleIndex needs, and the fingerprint it uses to notice changes
+    "hours.schedule": "SELECT oh.fb_ID, oh.weekday, oh.open_minute, oh.close_minute, fb.Location, fb.Neighborhood "
+                      "FROM opening_hours oh JOIN food_bank fb USING(fb_ID) "
+                      "ORDER BY oh.fb_ID, oh.weekday, oh.open_minute",
+    "hours.stamp": "SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS(',', fb_ID, weekday, open_minute, close_minute))), 0) "
+                   "FROM opening_hours",
+    # bumped by triggers on every change to food_item or food_bank (schema version 9), one shard per connection
+    "inventory.version": "SELECT CAST(SUM(version) AS UNSIGNED) FROM data_versions WHERE name = 'inventory'",
+
+    # ------------------------------- bulk item import (importffy.py) ----------
+    # run on a plain cursor: executemany turns the staging insert into multi-row INSERTs
+    "import.stage_create": "CREATE TEMPORARY TABLE IF NOT EXISTS import_stage ("
+                           "Item_name varchar(255) NOT NULL, Category varchar(100), Quantity int NOT NULL, "
+                           "Units varchar(50), fd_ID int NOT NULL PRIMARY KEY)",
+    "import.stage_insert": "INSERT INTO import_stage (Item_name, Category, Quantity, Units, fd_ID) "
+                           "VALUES (%s, %s, %s, %s, %s)",
+    # one upsert for the whole file: items the food bank has get the staged quantity added (schema version 7)
+    "import.upsert": "INSERT INTO food_item (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID) "
+                     "SELECT s.Item_name, s.Category, s.Quantity, s.Units, %s, %s, s.fd_ID "
+                     "FROM import_stage s ORDER BY s.fd_ID "
+                     "ON DUPLICATE KEY UPDATE food_item.Quantity = food_item.Quantity + s.Quantity",
+    "import.inserted": "SELECT COUNT(*) FROM import_stage s JOIN food_item fi USING(fd_ID)",
+    "import.stage_drop": "DROP TEMPORARY TABLE IF EXISTS import_stage",
+
+    # ------------------------------- id sequences -----------------------------
+    # LAST_INSERT_ID(expr) makes the new value readable on this connection without a second query
+    "sequence.advance": "update id_sequences set next_id = LAST_INSERT_ID(next_id + %s) where name = %s",
+
+    # ------------------------------- staff inventory --------------------------
+    "staff.search": "SELECT fi.Item_name, fi.Quantity, fi.Units, fi.fd_id, fb.Location "
+                    "from food_item fi join food_bank fb using(fb_id) "
+                    "where fi.Item_name like %s and fb.Location like %s and fi.fd_id like %s",
+
+    # ------------------------------- donor report -----------------------------
+    # one row per food bank with everything the report prints, so the report costs one round trip
+    "donor.needs": "SELECT temp.fb_ID, temp.Location, SUM(temp.total) AS final_total, "
+                   "COALESCE(fb.Address, '') AS Address, COALESCE(fb.Phone_number, '') AS Phone_number "
+                   "FROM food_bank fb JOIN "
+                   "(SELECT fi.fb_ID, fi.Location, fi.Category, SUM(fi.Quantity) AS total "
+                   "FROM food_item fi "
+                   "WHERE fi.Category LIKE %s "
+                   "GROUP BY fi.fb_ID, fi.Location, fi.Category) AS temp USING(fb_ID, Location) "
+                   "WHERE fb.Neighborhood LIKE %s "
+                   "GROUP BY temp.fb_ID, temp.Location, fb.Address, fb.Phone_number "
+                   "ORDER BY final_total",
+    # the quantity of every category at every food bank, for all donor reports at once (reportffy.py)
+    "donor.snapshot": "SELECT fi.fb_ID, fi.Location, fi.Category, SUM(fi.Quantity), fb.Neighborhood, "
+                      "COALESCE(fb.Address, ''), COALESCE(fb.Phone_number, '') "
+                      "FROM food_item fi JOIN food_bank fb USING(fb_ID, Location) "
+                      "GROUP BY fi.fb_ID, fi.Location, fi.Category, fb.Neighborhood, fb.Address, fb.Phone_number",
+}
+
+# ------------------------------- SQLite (sqliteffy.py) ------------------------
+# What SQLite words differently; every other statement runs there as written. RETURNING stands in for
+# LAST_INSERT_ID(expr): sqliteffy reports the first value it returns as the cursor's lastrowid.
+sqliteStatements = {
+    "item.upsert": "insert into food_item (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID) "
+                   "select %s, %s, %s, %s, fb.Location, fb.fb_ID, %s from food_bank fb where fb.Location = %s "
+                   "on conflict (fb_ID, Item_name, Units, Category) do update set Quantity = Quantity + excluded.Quantity "
+                   "returning fd_ID",
+    "import.upsert": "INSERT INTO food_item (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID) "
+                     "SELECT s.Item_name, s.Category, s.Quantity, s.Units, %s, %s, s.fd_ID "
+                     "FROM import_stage s WHERE true ORDER BY s.fd_ID "
+                     "ON CONFLICT (fb_ID, Item_name, Units, Category) DO UPDATE SET Quantity = Quantity + excluded.Quantity",
+    "import.stage_drop": "DROP TABLE IF EXISTS temp.import_stage",
+    "sequence.advance": "update id_sequences set next_id = next_id + %s where name = %s returning next_id",
+}
+
+# ------------------------------- paged tables ---------------------------------
+# statements behind tableffy.PagedTable, for the staff inventory ("staff.search"), the admin data log
+# ("datalog.search") and a food bank's items ("bank.items"):
+#   <name>_page      rows after the last fd_ID shown, params: filters, last fd_ID, page size
+#   <name>_page_asc  rows after the last (Quantity, fd_ID) shown, params: filters, Quantity, Quantity, fd_ID, page size
+#   <name>_count     number of matching rows, params: filters
+#   <name>_row       one food item if it matches the filters, params: filters, fd_ID
+# The two searches get one set per item filter of searchffy.itemFilter(), named "<name>_<kind>:<filter>";
+# their filters are the item parameters, the food item ID (for "+id" filters) and the location pattern.
+nameFilters = {
+    "all": "",
+    "like": "fi.Item_name like %s and ",
+    # the ngram index finds the candidates, LIKE keeps only exact substring matches
+    "contains": "match(fi.Item_name) against (%s in boolean mode) and fi.Item_name like %s and ",
+}
+# SQLite has no ngram parser: the FTS5 trigram index <table>_names of sqliteffy.py finds the candidates with the
+# LIKE pattern (?2, without its escapes); the boolean-mode phrase (?1) is not used there
+sqliteContains = ("fi.fd_ID in (select rowid from {table}_names where {table}_names.Item_name like replace(?2, '\\\\', '\\')) "
+                  "and fi.Item_name like ?2 escape '\\' and ")
+searchFilters = {}
+for nameMode, nameWhere in nameFilters.items():
+    searchFilters[nameMode] = "where " + nameWhere + "fb.Location like %s "
+    searchFilters[nameMode + "+id"] = "where " + nameWhere + "fi.fd_ID = %s and fb.Location like %s "
+
+tables = [("bank.items", "food_item", "", "where fb.fb_id = %s ")]
+for filterName, where in searchFilters.items():
+    tables.append(("staff.search", "food_item", ":" + filterName, where))
+    tables.append(("datalog.search", "outgoing", ":" + filterName, where))
+for name, table, variant, where in tables:
+    select = (f"SELECT fi.Item_name, fi.Quantity, fi.Units, fi.fd_id, fb.Location "
+              f"from {table} fi join food_bank fb using(fb_id) " + where)
+    statements[f"{name}_page{variant}"] = select + "and fi.fd_ID > %s order by fi.fd_ID limit %s"
+    # (Quantity, fd_ID) after the last row; the leading Quantity >= lets the (Quantity, fd_ID) index seek to it
+    statements[f"{name}_page_asc{variant}"] = (select + "and fi.Quantity >= %s and (fi.Quantity > %s or fi.fd_ID > %s) "
+                                                        "order by fi.Quantity, fi.fd_ID limit %s")
+    statements[f"{name}_count{variant}"] = f"SELECT COUNT(*) from {table} fi join food_bank fb using(fb_id) " + where
+    statements[f"{name}_row{variant}"] = select + "and fi.fd_ID = %s"
+    if variant.startswith(":contains"):
+        for kind in ("_page", "_page_asc", "_count", "_row"):
+            sqliteStatements[f"{name}{kind}{variant}"] = statements[f"{name}{kind}{variant}"].replace(
+                nameFilters["contains"], sqliteContains.format(table=table))
+
+# ------------------------------- recipient search -----------------------------
+# one statement per combination of filters, so each keeps its own plan
+recipientSearch = ("SELECT fi.Item_name, fi.Location, fb.Address, fb.Phone_number, "
+                   "CASE WHEN Quantity = 0 THEN 'Unavailable' "
+                   "WHEN Quantity < 21 THEN 'Low Stock' ELSE 'Available' END AS stock_status "
+                   "FROM food_item fi "
+                   "LEFT JOIN food_bank fb USING(fb_ID) ")
+statements["recipient.search"] = recipientSearch + "ORDER BY fi.Quantity DESC"
+statements["recipient.search_food"] = recipientSearch + "WHERE fi.Item_name = %s ORDER BY fi.Quantity DESC"
+statements["recipient.search_neighborhood"] = recipientSearch + "WHERE fb.Neighborhood = %s ORDER BY fi.Quantity DESC"
+statements["recipient.search_food_neighborhood"] = (recipientSearch + "WHERE fi.Item_name = %s AND fb.Neighborhood = %s "
+                                                                      "ORDER BY fi.Quantity DESC")
+
+
+_prepared = weakref.WeakKeyDictionary()     #connection -> {statement name: prepared cursor}
+_preparedLock = threading.Lock()            #guards _prepared when several threads share the pool
+
+
+def preparedCursor(connection, name:str):
+    """ preparedCursor(connection, name)
+    Returns the prepared cursor for statement 'name' on 'connection', creating it on first use.
+    The cursor keeps the server-side statement open, so later calls only send parameters.
+    Raises KeyError if 'name' is not a known statement.
+    """
+    statement = statements[name]
+    with _preparedLock:
+        cache = _prepared.setdefault(connection, {})
+        cursor = cache.get(name)
+        if cursor is None:
+            cursor = connection.cursor(prepared=True)
+            cache[name] = cursor
+    return cursor, statement
+
+
+def fetch(connection, name:str, params:tuple=()) -> list:
+    """ fetch(connection, name, params)
+    Runs the named SELECT statement with 'params' and returns all rows as a list of tuples.
+    """
+    cursor, statement = preparedCursor(connection, name)
+    cursor.execute(statement, tuple(params))
+    return cursor.fetchall()
+
+
+def execute(connection, name:str, params:tuple=()) -> int:
+    """ execute(connection, name, params)
+    Runs the named INSERT/UPDATE/DELETE statement with 'params' and returns the number of rows changed.
+    The caller is responsible for committing.
+    """
+    cursor, statement = preparedCursor(connection, name)
+    cursor.execute(statement, tuple(params))
+    return cursor.rowcount
+
+
+def lastInsertId(connection, name:str) -> int:
+    """ lastInsertId(connection, name)
+    Returns the id generated (or set through LAST_INSERT_ID(expr)) by the last run of the named statement.
+    """
+    cursor, statement = preparedCursor(connection, name)
+    return cursor.lastrowid
+
+
+def executeMany(connection, name:str, rows) -> int:
+    """ executeMany(connection, name, rows)
+    Runs the named statement once per parameter tuple in 'rows', reusing the single prepared statement.
+    Returns the total number of rows changed.
+    """
+    cursor, statement = preparedCursor(connection, name)
+    total = 0
+    for params in rows:
+        cursor.execute(statement, tuple(params))
+        total += cursor.rowcount
+    return total
+
+
+def call(connection, procedure:str, args:tuple=()) -> list:
+    """ call(connection, procedure, args)
+    Calls the stored procedure 'procedure' with 'args' through cursor.callproc() and returns the rows of the
+        result sets it produced. Errors signalled by the procedure are raised as mysql.connector errors.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.callproc(procedure, tuple(args))
+        return [row for result in cursor.stored_results() for row in result.fetchall()]
+    finally:
+        cursor.close()
+
+
+def forget(connection):
+    """ forget(connection)
+    Closes and drops every prepared statement cached for 'connection'.
+    """
+    with _preparedLock:
+        cache = _prepared.pop(connection, {})
+    for cursor in cache.values():
+        try:
+            cursor.close()
+        except Exception:
+            pass        #the connection is already gone, so are its statements
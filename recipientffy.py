@@ -0,0 +1,266 @@
+"""
+Name: recipientffy.py
+Created: 10/18/2026
+
+The recipient search without a window: the same statements and schedule index as RecipientUI, answered as plain
+data for kiosks and as JSON over a small local HTTP endpoint.
+
+RecipientService keeps the answers in a cache keyed by (food, neighborhood, minute), the minute being the one the
+open-now flags were worked out for, so every recipient asking the same question within a minute shares one query.
+The cache is dropped as soon as the inventory changes: triggers bump counters in data_versions (schema version 9)
+on every change to food_item or food_bank, and the service reads their sum at most every versionCheck seconds.
+
+Usage:
+    python3 recipientffy.py serve [--listen ADDRESS] [--listen-port N] [--connections N]
+        also takes --host, --port, --user, --password, --database, --backend and --sqlite-file of the database
+        GET /search?food=Beans&neighborhood=Downtown&open=1   items, open food banks and today's hours as JSON
+        GET /options                                            the food and neighborhood choices
+        GET /stats                                              cache hits, misses and size
+
+    service = RecipientService()
+    answer = service.search("Beans", "Downtown", openOnly=True)
+
+Notes:
+    - "All Food" and "All Neighborhoods" (or leaving them out of the URL) mean no filter, like the dropdowns.
+    - Opening hours come from the schedule index of scheduleffy.py, which notices changed hours by itself; a
+        cached answer is for one minute only, so new hours show up by the next minute.
+    - An answer read while the cache was being dropped is returned but not kept, so it cannot outlive the drop.
+    - A database error answers 500 with {"error": ...}; the connection stays open for the next request.
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import collections
+import datetime
+import json
+import threading
+import time
+
+from utilffy import (getPool, closePool, ConnectionPool, metadataRows, formatMinute, databaseErrors,
+                     useDatabase, databaseOptions, databaseSettings)
+from scheduleffy import getSchedule
+import queryffy as sql
+
+allFood = "All Food"                    #food choice that means every food
+allNeighborhoods = "All Neighborhoods"  #neighborhood choice that means every neighborhood
+cacheSize = 2048        #answers kept by a RecipientService (least recently used are dropped first)
+versionCheck = 1.0      #seconds between reads of the inventory version
+serviceHost = "127.0.0.1"
+servicePort = 8157
+
+
+def searchItems(connection, food:str, neighborhood:str) -> list:
+    """ searchItems(connection, food, neighborhood)
+    Returns the (Item_name, Location, Address, Phone_number, stock status) rows of 'food' at the food banks of
+        'neighborhood', most stocked first; allFood and allNeighborhoods leave out that filter.
+    """
+    if neighborhood == allNeighborhoods and food == allFood:
+        query, params = "recipient.search", ()
+    elif neighborhood == allNeighborhoods:
+        query, params = "recipient.search_food", (food,)
+    elif food == allFood:
+        query, params = "recipient.search_neighborhood", (neighborhood,)
+    else:
+        query, params = "recipient.search_food_neighborhood", (food, neighborhood)
+    return sql.fetch(connection, query, params)
+
+
+def openBanks(schedule, neighborhood:str, when:datetime.datetime) -> tuple:
+    """ openBanks(schedule, neighborhood, when)
+    Returns (locations of the food banks open at 'when', (open, close, location) of every opening on that day),
+        for the food banks of 'neighborhood' (allNeighborhoods: every food bank), with times formatted as H:MM:00.
+    """
+    area = None if neighborhood == allNeighborhoods else neighborhood
+    hours = []
+    for fb_ID in schedule.openToday(when, area):
+        for opening, closing in schedule.today(fb_ID, when):
+            hours.append((formatMinute(opening), formatMinute(closing), schedule.location[fb_ID]))
+    openNow = []
+    for fb_ID in schedule.openNow(when, area):
+        if schedule.location[fb_ID] not in openNow:
+            openNow.append(schedule.location[fb_ID])
+    return openNow, hours
+
+
+class RecipientService:
+    """ class RecipientService(pool, size, check)
+    Answers recipient searches from a cache of at most 'size' answers, read through 'pool' (default: the
+        program's shared pool) on a miss. Safe to call from many threads at once.
+    """
+    def __init__(self, pool:ConnectionPool=None, size:int=cacheSize, check:float=versionCheck):
+        self.pool = pool if pool is not None else getPool()
+        self.size = size
+        self.check = check
+        self._answers = collections.OrderedDict()   #(food, neighborhood, minute) -> {openOnly: (answer, body)}
+        self._lock = threading.Lock()
+        self._version = None            #inventory version the cached answers were read at
+        self._generation = 0            #bumped whenever the cache is dropped; loads begun before are not kept
+        self._checkedAt = 0.0           #time.monotonic() of the last version read
+        self._hits = 0
+        self._misses = 0
+
+    def search(self, food:str=allFood, neighborhood:str=allNeighborhoods, openOnly:bool=False,
+               when:datetime.datetime=None) -> dict:
+        """ search(food, neighborhood, openOnly, when)
+        Returns the answer to a recipient search at 'when' (default: now) as a dict: the items (only those at food
+            banks open then if 'openOnly'), the open food banks and the day's opening hours.
+        """
+        return self._answer(food, neighborhood, openOnly, when)[0]
+
+    def searchBody(self, food:str=allFood, neighborhood:str=allNeighborhoods, openOnly:bool=False,
+                   when:datetime.datetime=None) -> bytes:
+        """ searchBody(food, neighborhood, openOnly, when)
+        Returns the same answer as search(), encoded as UTF-8 JSON (encoded once per cached answer).
+        """
+        return self._answer(food, neighborhood, openOnly, when)[1]
+
+    def invalidate(self):
+        """ invalidate()
+        Drops every cached answer, e.g. right after this program changed the inventory.
+        """
+        with self._lock:
+            self._answers.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        """ stats()
+        Returns the number of hits and misses, the answers cached and the inventory version they belong to.
+        """
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "cached": len(self._answers), "version": self._version}
+
+    def _answer(self, food, neighborhood, openOnly, when) -> tuple:
+        """(answer, JSON body) from the cache, filling it in on a miss"""
+        when = (when if when is not None else datetime.datetime.now()).replace(second=0, microsecond=0)
+        key = (food or allFood, neighborhood or allNeighborhoods, when)
+        self._checkVersion()
+        with self._lock:
+            entry = self._answers.get(key)
+            if entry is not None:
+                self._answers.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+            generation = self._generation
+        if entry is None:
+            entry = self._load(*key)
+            with self._lock:
+                if self.size > 0 and generation == self._generation:   #else it may predate the drop
+                    self._answers[key] = entry
+                    while len(self._answers) > self.size:
+                        self._answers.popitem(last=False)
+        answer, body = entry[bool(openOnly)]
+        if body is None:
+            body = json.dumps(answer, separators=(",", ":")).encode("utf-8")
+            entry[bool(openOnly)] = (answer, body)  #encoded once; a racing thread encodes the same bytes
+        return answer, body
+
+    def _load(self, food, neighborhood, when) -> dict:
+        """reads one search from the database: {False: (every item, None), True: (open items only, None)}"""
+        with self.pool.connection() as connection:
+            rows = searchItems(connection, food, neighborhood)
+            schedule = getSchedule(connection)
+        openNow, hours = openBanks(schedule, neighborhood, when)
+        isOpen = set(openNow)
+        items = [{"item": item, "location": location, "address": address, "phone": phone, "status": status,
+                  "open": location in isOpen} for item, location, address, phone, status in rows]
+        answer = {"food": food, "neighborhood": neighborhood, "minute": when.isoformat(timespec="minutes"),
+                  "openNow": openNow,
+                  "hours": [{"open": opening, "close": closing, "location": location} for opening, closing, location in hours],
+                  "items": items}
+        return {False: (answer, None), True: (dict(answer, items=[item for item in items if item["open"]]), None)}
+
+    def _checkVersion(self):
+        """drops the cache if the inventory version changed; reads it at most every 'check' seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checkedAt < self.check:
+                return
+            self._checkedAt = now       #other threads keep using the cache while this one reads
+        with self.pool.connection() as connection:
+            version = sql.fetch(connection, "inventory.version")[0][0]
+        with self._lock:
+            if version != self._version:
+                self._answers.clear()
+                self._generation += 1
+                self._version = version
+
+
+class RecipientHandler(BaseHTTPRequestHandler):
+    """ class RecipientHandler
+    HTTP/1.1 request handler for the endpoints listed at the top of this file; the server it runs under must
+        have a 'service' attribute holding the RecipientService.
+    """
+    protocol_version = "HTTP/1.1"       #keeps connections open between requests of the same kiosk
+    disable_nagle_algorithm = True      #headers and body go out as two writes; Nagle would hold the body back
+                                        #  until the kiosk's delayed ACK of the headers, about 40 ms a request
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            self._route(url, query)
+        except databaseErrors as e:
+            self._send(500, json.dumps({"error": f"database error: {e}"}).encode("utf-8"))
+
+    def _route(self, url, query:dict):
+        service = self.server.service
+        if url.path == "/search":
+            self._send(200, service.searchBody(query.get("food", allFood), query.get("neighborhood", allNeighborhoods),
+                                               query.get("open", "0") not in ("", "0", "false")))
+        elif url.path == "/options":
+            self._send(200, json.dumps({"food": [row[0] for row in metadataRows("item.names")],
+                                        "neighborhoods": [row[0] for row in metadataRows("bank.neighborhoods")]}).encode("utf-8"))
+        elif url.path == "/stats":
+            self._send(200, json.dumps(service.stats()).encode("utf-8"))
+        else:
+            self._send(404, json.dumps({"error": f"no such endpoint: {url.path}"}).encode("utf-8"))
+
+    def _send(self, status:int, body:bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass                            #one line per request would cost more than the answer
+
+
+def makeServer(service:RecipientService, host:str=serviceHost, port:int=servicePort) -> ThreadingHTTPServer:
+    """ makeServer(service, host, port)
+    Returns an HTTP server answering from 'service' on host:port (port 0: any free port), one thread per
+        connection; call serve_forever() on it to start serving.
+    """
+    server = ThreadingHTTPServer((host, port), RecipientHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Food-For-You recipient search service")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--listen", default=serviceHost, help="address to listen on")
+    parser.add_argument("--listen-port", type=int, default=servicePort, help="port to listen on")
+    parser.add_argument("--connections", type=int, default=None, help="database connections to keep open")
+    databaseOptions(parser)
+    args = parser.parse_args()
+    useDatabase(**{name: getattr(args, name) for name in databaseSettings})
+
+    pool = ConnectionPool(size=args.connections) if args.connections else None
+    server = makeServer(RecipientService(pool), args.listen, args.listen_port)
+    print(f"serving recipient searches on http://{args.listen}:{server.server_address[1]}/search")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if pool is not None:
+            pool.closeAll()
+        closePool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Name: renderffy.py
+Created: 10/18/2026
+
+Columnar text reports for RecipientUI, DonorUI and the batch reports of reportffy.py.
+    - The columns of a report are chosen from the user's checkboxes, instead of one hand-written line per
+        combination of checkboxes.
+    - Every row is turned into its cells once, and all column widths are found in that same pass over the rows.
+    - The lines are joined into chunks of reportChunk lines and each chunk is written to every sink (the report
+        file, sys.stdout, an io.StringIO, ...), so the text is built once however many places it goes to and a
+        large report never needs to be read back from its file.
+
+Usage:
+    with open(filename, "w") as f:
+        writeReport((f, sys.stdout), [Column("Item", 0), Column("Location", 1)], rows, title=["Food near you"])
+
+Notes:
+    - A column's width is the longest of its title, its minimum and its cells, plus its padding; the last column
+        is not padded, so no line ends in spaces.
+"""
+reportChunk = 512       #lines joined before they are written to the sinks
+
+
+class Column:
+    """ class Column(title, field, minimum, pad)
+    One column of a report.
+    Input: title is the column heading
+           field is the index of the column's value in a row, or a function returning it from the row
+           minimum is the narrowest the column is allowed to be, before padding
+           pad is the number of spaces between this column and the next
+    """
+    def __init__(self, title:str, field, minimum:int=0, pad:int=4):
+        self.title = title
+        self.field = field
+        self.minimum = minimum
+        self.pad = pad
+
+    def cell(self, row) -> str:
+        """the text of this column for 'row'"""
+        value = self.field(row) if callable(self.field) else row[self.field]
+        return "" if value is None else str(value)
+
+
+def writeReport(sinks, columns:list, rows, title=(), rule:str=None, empty:str=None, trailer=(), chunk:int=reportChunk) -> int:
+    """ writeReport(sinks, columns, rows, title, rule, empty, trailer, chunk)
+    Writes a report to every sink in 'sinks' (anything with a write(text) method):
+        the 'title' lines, the column headings, a line of 'rule' characters as wide as the table (if given),
+        one line per row, then the 'trailer' lines. If there are no rows and 'empty' is given, the 'empty' line
+        replaces the headings and rows.
+    Returns the number of rows written.
+    """
+    cells = []
+    widths = [max(len(column.title), column.minimum) for column in columns]
+    for row in rows:                    #the only pass over the rows: cells and widths together
+        line = [column.cell(row) for column in columns]
+        cells.append(line)
+        for i, text in enumerate(line):
+            if len(text) > widths[i]:
+                widths[i] = len(text)
+    widths = [width + column.pad for width, column in zip(widths, columns)]
+
+    def layout(line) -> str:
+        return "".join(text.ljust(width) for text, width in zip(line[:-1], widths)) + line[-1] + "\n"
+
+    buffer = [text + "\n" for text in title]
+
+    def flush():
+        text = "".join(buffer)
+        for sink in sinks:
+            sink.write(text)
+        buffer.clear()
+
+    if not cells and empty is not None:
+        buffer.append(empty + "\n")
+    else:
+        buffer.append(layout([column.title for column in columns]))
+        if rule:
+            buffer.append(rule * (sum(widths) - columns[-1].pad) + "\n")
+        for line in cells:
+            buffer.append(layout(line))
+            if len(buffer) >= chunk:
+                flush()
+    buffer.extend(text + "\n" for text in trailer)
+    flush()
+    return len(cells)
+
+
+# ------------------------------- donor report ------------------------------------
+def needsColumns(address:bool, hours:bool, phone:bool) -> list:
+    """ needsColumns(address, hours, phone)
+    Returns the columns of the donor report for the checkboxes of DonorUI, for rows of
+        (Location, Address, Phone_number, hours) with hours as (opening, closing) or ('', '') if closed today.
+    """
+    columns = [Column("Name", 0, minimum=1)]
+    if address:
+        columns.append(Column("Address", 1, minimum=5))
+    if hours:
+        columns.append(Column("Hours", todayHours, minimum=20))
+    if phone:
+        columns.append(Column("Phone #", 2, minimum=1))
+    return columns
+
+
+def todayHours(row) -> str:
+    """the hours of a donor report row, as "opening - closing" or "Closed Today\""""
+    opening, closing = row[3]
+    if opening.strip() == "" or closing.strip() == "":
+        return "Closed Today"
+    return f"{opening} - {closing}"
+
+
+def writeNeeds(sinks, neighborhood:str, category:str, banks:list, openNow:bool=False, address:bool=False,
+               hours:bool=False, phone:bool=False) -> int:
+    """ writeNeeds(sinks, neighborhood, category, banks, openNow, address, hours, phone)
+    Writes the donor report for the choices 'neighborhood' and 'category' listing 'banks', rows of (Location,
+        Address, Phone_number, (opening, closing)), with the columns chosen by the checkboxes.
+    Returns the number of food banks listed.
+    """
+    title = [f"Results for Food Banks in {neighborhood} in Need of {category}"]
+    if openNow:
+        title.append("showing those open now")
+    return writeReport(sinks, needsColumns(address, hours, phone), banks, title=title, empty="No Results",
+                       trailer=[""])
+
+
+# ------------------------------- recipient report --------------------------------
+def availabilityColumns(address:bool, phone:bool, hours:bool) -> list:
+    """ availabilityColumns(address, phone, hours)
+    Returns the columns of the recipient report for the checkboxes of RecipientUI, for rows of
+        (Item_name, Location, status, Address, Phone_number, opening, closing, "Open Now" or "Closed").
+    """
+    columns = [Column("Item", 0, pad=5), Column("Location", 1, pad=5), Column("Status", 2, pad=5)]
+    if address:
+        columns.append(Column("Address", 3, pad=5))
+    if phone:
+        columns.append(Column("Phone Number", 4, minimum=14, pad=5))
+    if hours:
+        columns += [Column("Open", 5, minimum=5, pad=5), Column("Close", 6, minimum=5, pad=5)]
+    columns.append(Column("Hours", 7))
+    return columns
+
+
+def availabilityRows(results:list, open_stat:list, open_time:list, openNow:bool=False) -> list:
+    """ availabilityRows(results, open_stat, open_time, openNow)
+    Returns the rows of the recipient report from the rows of the recipient search (ordered by quantity, so they
+        stop at the first unavailable item), the locations open now and today's (open, close, location) hours;
+        only those of food banks open now if 'openNow'.
+    """
+    isOpen = set(open_stat)
+    today = {location: (opening.rstrip(), closing.rstrip()) for opening, closing, location in open_time}
+    rows = []
+    for entry in results:
+        item, location, address, phone, status = ("" if value is None else str(value).rstrip() for value in entry[:5])
+        if status == "Unavailable":
+            break
+        if openNow and location not in isOpen:
+            continue
+        opening, closing = today.get(location, ("Closed", "Closed"))
+        rows.append((item, location, status, address, phone, opening, closing,
+                     "Open Now" if location in isOpen else "Closed"))
+    return rows
+
+
+def writeAvailability(sinks, rows:list, address:bool=False, phone:bool=False, hours:bool=False) -> int:
+    """ writeAvailability(sinks, rows, address, phone, hours)
+    Writes the recipient report of 'rows' (see availabilityRows()) with the columns chosen by the checkboxes.
+    Returns the number of items listed.
+    """
+    title = ["Entries are listed in Descending order by Quantity.",
+             "Entries at the top of the table have the greatest availabilty.",
+             "Entries marked as Low Stock have 20 units or less available.",
+             ""]
+    return writeReport(sinks, availabilityColumns(address, phone, hours), rows, title=title, rule="-", trailer=[""])
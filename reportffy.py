@@ -0,0 +1,201 @@
+"""
+Name: reportffy.py
+Created: 10/18/2026
+
+Batch mode of the donor report: writes the "FoodNeedsAt{location}For{category}.txt" file DonorUI writes for one
+choice, for every neighborhood and category at once (each "All ..." choice included).
+    1. One snapshot of the inventory is read in a single read-only transaction: the quantity of every category
+        at every food bank, the food banks' details and the opening hours, so every report agrees with the others.
+    2. The reports are rendered by a pool of worker processes, each given the snapshot once when it starts.
+    3. A report file is only rewritten when its text changed, so unchanged reports keep their modification time
+        and anything syncing or mailing the folder only sees the reports that really changed.
+
+Usage:
+    python3 reportffy.py needs [--out DIR] [--workers N] [--open-now] [--columns address,hours,phone]
+        e.g. every morning from cron, like "python3 migrateffy.py partitions" once a month
+    Also takes --host, --port, --user, --password, --database, --backend and --sqlite-file, e.g. for a kiosk's SQLite file.
+
+Notes:
+    - The text is laid out by renderffy.writeNeeds(), like DonorUI's for the same choices and checkboxes, with
+        hours and open now as of the time the snapshot was taken.
+    - Neighborhoods and categories are matched ignoring case and accents, like the database's collation.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import collections
+import datetime
+import io
+import os
+import time
+
+from utilffy import getPool, closePool, formatMinute, useDatabase, databaseOptions, databaseSettings
+from scheduleffy import ScheduleIndex
+from searchffy import fold
+from renderffy import writeNeeds
+import queryffy as sql
+
+allLocations = "All Locations"          #neighborhood choice of DonorUI that means every neighborhood
+allCategories = "All Categories"        #category choice of DonorUI that means every category
+reportColumns = ("address", "hours", "phone")   #optional columns of the donor report, in the order shown
+reportsPerTask = 16     #reports handed to a worker process at a time
+
+
+def takeSnapshot(connection, when:datetime.datetime=None) -> dict:
+    """ takeSnapshot(connection, when)
+    Reads everything the donor reports need in one consistent read-only transaction and returns it as plain data
+        (picklable, for the worker processes):
+        - "neighborhoods", "categories": the choices of DonorUI's dropdowns, without the "All ..." choices
+        - "needs": {folded neighborhood: {folded category: [(fb_ID, Location, quantity), ...]}}
+        - "banks": {fb_ID: (address, phone, (opening, closing) today or ('', ''), open at 'when')}
+    """
+    when = when if when is not None else datetime.datetime.now()
+    connection.start_transaction(consistent_snapshot=True, readonly=True)
+    try:
+        neighborhoods = [row[0] for row in sql.fetch(connection, "bank.neighborhoods") if row[0] is not None]
+        categories = [row[0] for row in sql.fetch(connection, "item.categories") if row[0] is not None]
+        rows = sql.fetch(connection, "donor.snapshot")
+        schedule = ScheduleIndex(sql.fetch(connection, "hours.schedule"))
+    finally:
+        connection.rollback()
+
+    needs = collections.defaultdict(lambda: collections.defaultdict(list))
+    banks = {}
+    openNow = set(schedule.openNow(when))
+    for fb_ID, location, category, quantity, neighborhood, address, phone in rows:
+        if category is None or neighborhood is None:
+            continue                    #LIKE '%' in the donor query does not match NULL either
+        fb_ID = int(fb_ID)
+        needs[fold(neighborhood)][fold(category)].append((fb_ID, location, int(quantity)))
+        if fb_ID not in banks:
+            openings = schedule.today(fb_ID, when)
+            hours = (formatMinute(openings[0][0]), formatMinute(openings[-1][1])) if openings else ('', '')
+            banks[fb_ID] = (address, phone, hours, fb_ID in openNow)
+    return {"when": when, "neighborhoods": neighborhoods, "categories": categories,
+            "needs": {area: dict(byCategory) for area, byCategory in needs.items()}, "banks": banks}
+
+
+def needsRows(snapshot:dict, neighborhood:str, category:str) -> list:
+    """ needsRows(snapshot, neighborhood, category)
+    Returns the rows DonorUI's "donor.needs" query gives for the choices 'neighborhood' and 'category'
+        (allLocations / allCategories for any), as (fb_ID, Location, total, Address, Phone_number), least total
+        first.
+    """
+    needs = snapshot["needs"]
+    areas = needs.values() if neighborhood == allLocations else [needs.get(fold(neighborhood), {})]
+    totals = collections.Counter()
+    for byCategory in areas:
+        lists = byCategory.values() if category == allCategories else [byCategory.get(fold(category), [])]
+        for found in lists:
+            for fb_ID, location, quantity in found:
+                totals[(fb_ID, location)] += quantity
+    banks = snapshot["banks"]
+    return [(fb_ID, location, total, banks[fb_ID][0], banks[fb_ID][1])
+            for (fb_ID, location), total in sorted(totals.items(), key=lambda entry: (entry[1], entry[0]))]
+
+
+def reportFilename(neighborhood:str, category:str) -> str:
+    """ reportFilename(neighborhood, category)
+    Returns the name DonorUI gives the report for these choices, e.g. "FoodNeedsAtAllLocationsForDairy.txt".
+    """
+    return f"FoodNeedsAt{''.join(str(neighborhood).split())}For{''.join(str(category).split())}.txt"
+
+
+def renderNeeds(snapshot:dict, neighborhood:str, category:str, openNow:bool=False, columns=reportColumns) -> str:
+    """ renderNeeds(snapshot, neighborhood, category, openNow, columns)
+    Returns the text of the donor report for the choices 'neighborhood' and 'category', showing only the food
+        banks open at the snapshot's time if 'openNow' and the optional 'columns' (see reportColumns).
+    """
+    banks = snapshot["banks"]
+    shown = []
+    seen = set()
+    for fb_ID, location, total, address, phone in needsRows(snapshot, neighborhood, category):
+        if (openNow and not banks[fb_ID][3]) or fb_ID in seen:
+            continue
+        seen.add(fb_ID)
+        address, location, phone = (text[:-1] if text[-1:] == "\n" else text for text in (address, location, phone))
+        shown.append((location, address, phone, banks[fb_ID][2]))
+    text = io.StringIO()
+    writeNeeds((text,), neighborhood, category, shown, openNow,
+               "address" in columns, "hours" in columns, "phone" in columns)
+    return text.getvalue()
+
+
+def writeIfChanged(path:str, text:str) -> bool:
+    """ writeIfChanged(path, text)
+    Writes 'text' to 'path' unless the file already holds exactly that text. The new text goes to "<path>.part"
+        first and replaces the file when complete, so a reader never sees half a report.
+    Returns True if the file was written.
+    """
+    try:
+        with open(path, "r") as f:
+            if f.read() == text:
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    with open(path + ".part", "w") as f:
+        f.write(text)
+    os.replace(path + ".part", path)
+    return True
+
+
+_worker = {}            #what each worker process was started with: the snapshot and the report options
+
+
+def _startWorker(snapshot:dict, directory:str, openNow:bool, columns):
+    _worker.update(snapshot=snapshot, directory=directory, openNow=openNow, columns=columns)
+
+
+def _writeReport(choice:tuple) -> tuple:
+    """renders and writes one report in a worker process; returns (filename, True if written)"""
+    neighborhood, category = choice
+    filename = reportFilename(neighborhood, category)
+    text = renderNeeds(_worker["snapshot"], neighborhood, category, _worker["openNow"], _worker["columns"])
+    return filename, writeIfChanged(os.path.join(_worker["directory"], filename), text)
+
+
+def generateReports(snapshot:dict, directory:str=".", openNow:bool=False, columns=reportColumns,
+                    workers:int=None) -> dict:
+    """ generateReports(snapshot, directory, openNow, columns, workers)
+    Writes the donor report of every neighborhood and category choice of 'snapshot' into 'directory' with a pool
+        of 'workers' processes (default: one per CPU).
+    Returns a dict with the number of reports, how many were written and left unchanged, and the seconds taken.
+    """
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    choices = [(neighborhood, category) for neighborhood in [allLocations] + snapshot["neighborhoods"]
+               for category in [allCategories] + snapshot["categories"]]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_startWorker,
+                             initargs=(snapshot, directory, openNow, tuple(columns))) as pool:
+        written = sum(changed for filename, changed in pool.map(_writeReport, choices, chunksize=reportsPerTask))
+    elapsed = time.perf_counter() - start
+    return {"reports": len(choices), "written": written, "unchanged": len(choices) - written, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Food-For-You batch reports")
+    parser.add_argument("command", choices=["needs"])
+    parser.add_argument("--out", default="reports", help="folder the reports are written to")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--open-now", action="store_true", help="only list the food banks open right now")
+    parser.add_argument("--columns", default=",".join(reportColumns),
+                        help="comma-separated optional columns to show: address, hours, phone")
+    databaseOptions(parser)
+    args = parser.parse_args()
+    useDatabase(**{name: getattr(args, name) for name in databaseSettings})
+
+    columns = [column.strip() for column in args.columns.split(",") if column.strip()]
+    unknown = set(columns) - set(reportColumns)
+    if unknown:
+        parser.error(f"unknown columns: {', '.join(sorted(unknown))}")
+    try:
+        with getPool().connection() as connection:
+            snapshot = takeSnapshot(connection)
+    finally:
+        closePool()
+    stats = generateReports(snapshot, args.out, args.open_now, columns, args.workers)
+    print(f"{stats['reports']} reports in {stats['seconds']:.2f} seconds: {stats['written']} written, "
+          f"{stats['unchanged']} unchanged")
+
+
+if __name__ == "__main__":
+    main()
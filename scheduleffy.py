@@ -0,0 +1,175 @@
+"""
+Name: scheduleffy.py
+Created: 10/18/2026
+
+In-memory index of every food bank's weekly opening hours, loaded from opening_hours in one query.
+    - Each food bank's week is kept as a bitmap with one bit per minute of the week (Monday 0:00 is bit 0), so
+        "is bank X open" is one bit test and "when does bank X next open" is one shift and lowest-set-bit.
+    - For every minute of the week the index also keeps a bitmap of the banks open at that minute, built with a
+        single sweep over all openings, so "which banks are open now" is one list lookup for all banks at once.
+
+Usage:
+    with getPool().connection() as connection:
+        schedule = getSchedule(connection)
+    schedule.openNow()          # fb_IDs open right now
+
+Notes:
+    - getSchedule() re-checks a small fingerprint of opening_hours at most every scheduleCheck seconds and reloads
+        the index when the hours changed; invalidate() forces a reload on the next getSchedule() after a save.
+"""
+import datetime
+import threading
+import time
+
+from utilffy import minutesPerDay
+import queryffy as sql
+
+minutesPerWeek = 7 * minutesPerDay
+scheduleCheck = 60      #seconds between checks of whether opening_hours changed
+
+
+def minuteOfWeek(when:datetime.datetime) -> int:
+    """ minuteOfWeek(when)
+    Returns the minute of the week of 'when', counted from Monday 0:00.
+    """
+    return when.weekday() * minutesPerDay + when.hour * 60 + when.minute
+
+
+def mergeOpenings(openings:list) -> list:
+    """ mergeOpenings(openings)
+    Sorts (start, end) minute-of-week intervals and joins the ones that overlap or touch.
+    """
+    merged = []
+    for start, end in sorted(openings):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class ScheduleIndex:
+    """ class ScheduleIndex(rows)
+    Index over the rows of opening_hours joined to food_bank: (fb_ID, weekday, open_minute, close_minute,
+        Location, Neighborhood). Times passed to its methods default to now.
+    """
+    def __init__(self, rows:list, stamp=None):
+        self.stamp = stamp                      #fingerprint of opening_hours the index was built from
+        self.loadedAt = time.monotonic()
+        self.banks = []                         #bank bit position -> fb_ID
+        self.location = {}                      #fb_ID -> Location
+        self.neighborhood = {}                  #fb_ID -> Neighborhood
+        self.openings = {}                      #fb_ID -> {weekday: [(open_minute, close_minute), ...]}
+        self.week = {}                          #fb_ID -> bitmap of the minutes of the week it is open
+
+        intervals = {}
+        for fb_ID, weekday, opening, closing, location, neighborhood in rows:
+            if fb_ID not in intervals:
+                self.banks.append(fb_ID)
+                intervals[fb_ID] = []
+            self.location[fb_ID] = location
+            self.neighborhood[fb_ID] = neighborhood
+            self.openings.setdefault(fb_ID, {}).setdefault(weekday, []).append((opening, closing))
+            intervals[fb_ID].append((weekday * minutesPerDay + opening, weekday * minutesPerDay + closing))
+
+        # each bank flips its bit at the start and end of every opening; sweeping the week once gives the
+        # set of open banks at every minute
+        flips = [0] * (minutesPerWeek + 1)
+        for position, fb_ID in enumerate(self.banks):
+            bit = 1 << position
+            week = 0
+            for start, end in mergeOpenings(intervals[fb_ID]):
+                flips[start] ^= bit
+                flips[end] ^= bit
+                week |= ((1 << (end - start)) - 1) << start
+            self.week[fb_ID] = week
+            for day in self.openings[fb_ID].values():
+                day.sort()
+        self.openAt = []                        #minute of the week -> bitmap of open banks
+        current = 0
+        for minute in range(minutesPerWeek):
+            current ^= flips[minute]
+            self.openAt.append(current)
+
+    def openNow(self, when:datetime.datetime=None, neighborhood:str=None) -> list:
+        """ openNow(when, neighborhood)
+        Returns the fb_IDs open at 'when', optionally only those in 'neighborhood'.
+        """
+        when = when if when is not None else datetime.datetime.now()
+        mask = self.openAt[minuteOfWeek(when)]
+        open_ = []
+        while mask:
+            lowest = mask & -mask
+            fb_ID = self.banks[lowest.bit_length() - 1]
+            if neighborhood is None or self.neighborhood[fb_ID] == neighborhood:
+                open_.append(fb_ID)
+            mask ^= lowest
+        return open_
+
+    def isOpen(self, fb_ID:int, when:datetime.datetime=None) -> bool:
+        """ isOpen(fb_ID, when)
+        Returns True if food bank 'fb_ID' is open at 'when'.
+        """
+        when = when if when is not None else datetime.datetime.now()
+        return bool((self.week.get(fb_ID, 0) >> minuteOfWeek(when)) & 1)
+
+    def nextOpen(self, fb_ID:int, when:datetime.datetime=None):
+        """ nextOpen(fb_ID, when)
+        Returns the datetime food bank 'fb_ID' next opens at or after 'when' ('when' itself, to the minute, if it
+            is open then), or None if it has no opening hours at all.
+        """
+        when = when if when is not None else datetime.datetime.now()
+        week = self.week.get(fb_ID, 0)
+        if not week:
+            return None
+        minute = minuteOfWeek(when)
+        # rotates the week so 'when' is bit 0; the lowest set bit is then the wait in minutes
+        rotated = (week >> minute) | ((week & ((1 << minute) - 1)) << (minutesPerWeek - minute))
+        wait = (rotated & -rotated).bit_length() - 1
+        return when.replace(second=0, microsecond=0) + datetime.timedelta(minutes=wait)
+
+    def today(self, fb_ID:int, when:datetime.datetime=None) -> list:
+        """ today(fb_ID, when)
+        Returns the (open_minute, close_minute) openings of food bank 'fb_ID' on the day of 'when', earliest first.
+        """
+        when = when if when is not None else datetime.datetime.now()
+        return list(self.openings.get(fb_ID, {}).get(when.weekday(), []))
+
+    def openToday(self, when:datetime.datetime=None, neighborhood:str=None) -> list:
+        """ openToday(when, neighborhood)
+        Returns the fb_IDs with any opening on the day of 'when', optionally only those in 'neighborhood'.
+        """
+        when = when if when is not None else datetime.datetime.now()
+        return [fb_ID for fb_ID in self.banks if when.weekday() in self.openings[fb_ID]
+                and (neighborhood is None or self.neighborhood[fb_ID] == neighborhood)]
+
+
+_schedule = None                    #index shared by the program, built on first use
+_scheduleLock = threading.Lock()    #only one thread rebuilds the index at a time
+_scheduleStale = False              #set by invalidate()
+
+
+def getSchedule(connection) -> ScheduleIndex:
+    """ getSchedule(connection)
+    Returns the program-wide schedule index, loading it through 'connection' on first use, after invalidate(),
+        or when opening_hours changed since it was built (checked at most every scheduleCheck seconds).
+    """
+    global _schedule, _scheduleStale
+    with _scheduleLock:
+        if _schedule is not None and not _scheduleStale and time.monotonic() - _schedule.loadedAt < scheduleCheck:
+            return _schedule
+        stamp = tuple(sql.fetch(connection, "hours.stamp")[0])
+        if _schedule is None or _scheduleStale or stamp != _schedule.stamp:
+            _schedule = ScheduleIndex(sql.fetch(connection, "hours.schedule"), stamp)
+        else:
+            _schedule.loadedAt = time.monotonic()       #unchanged: trust it for another scheduleCheck seconds
+        _scheduleStale = False
+        return _schedule
+
+
+def invalidate():
+    """ invalidate()
+    Makes the next getSchedule() reload the index, e.g. after this program saved new opening hours.
+    """
+    global _scheduleStale
+    _scheduleStale = True
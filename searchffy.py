@@ -0,0 +1,137 @@
+"""
+Name: searchffy.py
+Created: 10/18/2026
+
+Turns what the user typed in an item search box into an indexed search of Item_name, used by the staff inventory
+search and the admin data log search.
+    - "bean" finds every item whose name contains "bean", in any case (Beans, Green beans, BEAN SPROUTS).
+        It is answered by the ngram FULLTEXT index on Item_name (schema version 4), with a LIKE re-check of the
+        few candidate rows so the match is an exact substring match.
+    - "bea*" finds the items whose name starts with "bea", as a range scan of the Item_name index.
+    - Text with % or _ is used as a LIKE pattern as typed, the way the search box worked before.
+    - A single character is shorter than an ngram, so it falls back to LIKE '%x%'.
+
+Usage:
+    filterName, params = itemFilter(ItemSearch.get(), IDSearch.get())
+    rows = sql.fetch(connection, f"staff.search_page:{filterName}", params + (location,) + ...)
+
+Search-as-you-type asks narrows() whether the new text only narrows the search already shown (e.g. "bea" became
+"bean"); if every row of that search is loaded, rowMatcher() filters them on the client with no query at all.
+
+Notes:
+    - The statements for every filter are generated in queryffy.py as "<name>_<kind>:<filter>", with the item
+        parameters first, then the food item ID (if any), then the location pattern.
+    - The index is maintained by InnoDB on every insert, update and delete, so it never needs rebuilding.
+"""
+import unicodedata
+
+ngramSize = 2           #ngram_token_size of the server; shorter search text cannot use the FULLTEXT index
+nameFilters = ("all", "like", "contains")   #how the item name is matched, see itemFilter()
+
+
+def likeEscape(text:str) -> str:
+    """ likeEscape(text)
+    Returns 'text' with the LIKE wildcards (% and _) and the escape character escaped, so it matches literally.
+    """
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def phrase(text:str) -> str:
+    """ phrase(text)
+    Returns 'text' as a boolean-mode FULLTEXT phrase: its ngrams must appear together and in order.
+    """
+    return '"' + " ".join(text.replace('"', " ").split()) + '"'
+
+
+def nameFilter(item:str) -> tuple:
+    """ nameFilter(item)
+    Returns (filter, params) matching item names to the search text 'item', where filter is one of nameFilters.
+    """
+    item = (item or "").strip()
+    if item in ("", "%"):
+        return "all", ()
+    if "%" in item or "_" in item:
+        return "like", (item,)                                  #a pattern typed by the user
+    if item.endswith("*") and item.rstrip("*"):
+        return "like", (likeEscape(item.rstrip("*")) + "%",)    #prefix: a range of the Item_name index
+    if len(item.replace('"', "").strip()) < ngramSize:
+        return "like", ("%" + likeEscape(item) + "%",)
+    return "contains", (phrase(item), "%" + likeEscape(item) + "%")
+
+
+def fold(text:str) -> str:
+    """ fold(text)
+    Returns 'text' without case or accents, the way the database's utf8mb4_0900_ai_ci collation compares it.
+    """
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)).casefold()
+
+
+def textMatch(item:str) -> tuple:
+    """ textMatch(item)
+    Returns how nameFilter() matches the search text 'item', as ("all", ""), ("contains", text) or ("prefix", text)
+        with the text folded, or None for a LIKE pattern typed by the user (which is only matched by the server).
+    """
+    item = (item or "").strip()
+    if item in ("", "%"):
+        return "all", ""
+    if "%" in item or "_" in item:
+        return None
+    if item.endswith("*") and item.rstrip("*"):
+        return "prefix", fold(item.rstrip("*"))
+    return "contains", fold(item)
+
+
+def idValue(fd_id):
+    """the food item ID searched for, or None for any"""
+    if fd_id is None or str(fd_id).strip() in ("", "%"):
+        return None
+    return int(str(fd_id).strip())
+
+
+def narrows(previous:tuple, current:tuple) -> bool:
+    """ narrows(previous, current)
+    Returns True if every row matching the search 'current' also matches the search 'previous', both given as
+        (item, fd_id) the way itemFilter() takes them, so 'current' can be answered from the rows of 'previous'.
+    """
+    old, new = textMatch(previous[0]), textMatch(current[0])
+    if old is None or new is None:
+        return False
+    if idValue(previous[1]) is not None and idValue(previous[1]) != idValue(current[1]):
+        return False
+    (oldKind, oldText), (newKind, newText) = old, new
+    if oldKind == "all":
+        return True
+    if oldKind == "contains":
+        return newKind != "all" and oldText in newText      #a name holding newText also holds oldText
+    return newKind == "prefix" and newText.startswith(oldText)
+
+
+def rowMatcher(item:str, fd_id=None):
+    """ rowMatcher(item, fd_id)
+    Returns a function keep(name, food_id) that is True for the rows the search (item, fd_id) matches, or None if
+        the search text is a LIKE pattern.
+    """
+    match, wanted = textMatch(item), idValue(fd_id)
+    if match is None:
+        return None
+    kind, text = match
+
+    def keep(name, food_id) -> bool:
+        if wanted is not None and int(food_id) != wanted:
+            return False
+        if kind == "contains":
+            return text in fold(str(name))
+        return kind == "all" or fold(str(name)).startswith(text)
+    return keep
+
+
+def itemFilter(item:str, fd_id=None) -> tuple:
+    """ itemFilter(item, fd_id)
+    Returns (filter, params) for the search text 'item' and the food item ID box 'fd_id' (None, "" or "%": any).
+    The filter names the generated statement variant, e.g. "contains" or "contains+id".
+    Raises ValueError if 'fd_id' is not a whole number.
+    """
+    filterName, params = nameFilter(item)
+    if idValue(fd_id) is not None:
+        return filterName + "+id", params + (idValue(fd_id),)
+    return filterName, params
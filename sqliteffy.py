@@ -0,0 +1,629 @@
+"""
+Name: sqliteffy.py
+Created: 10/18/2026
+
+The embedded SQLite backend of Food-For-You: the whole database in one local file, with the tables, columns, keys,
+indexes, triggers and staff action procedures of the MySQL schema at version 10, for offline kiosks, fast tests and
+benchmarks with no server and no network round trips.
+
+Set backend = "sqlite" and sqliteFile in utilffy.py (or give the command-line tools --backend sqlite --sqlite-file
+FILE) and every program gets its connections for the shared pool from here instead of from the MySQL server; they
+run the same named statements of queryffy.py and call the same procedures.
+    - Connection and Cursor wrap sqlite3 in the part of the mysql.connector interface the modules use: prepared and
+        unbuffered cursors, executemany, rowcount, lastrowid, callproc and stored_results, start_transaction,
+        in_transaction and ping. Errors are raised as Error, with the MySQL error number where there is one.
+    - Each statement is translated once: %s parameters become ? and LIKE gets MySQL's backslash escape. The few
+        statements SQLite words differently have their SQLite version in queryffy.sqliteStatements.
+    - adjust_quantity, move_item and delete_item are Python functions run by callproc() in one IMMEDIATE
+        transaction each, refusing an action the way the SIGNALs of the stored procedures do.
+    - The ngram FULLTEXT indexes on Item_name become FTS5 trigram indexes, kept up to date by triggers.
+
+Usage:
+    python3 sqliteffy.py create --sqlite-file kiosk.db
+        creates an empty database file (a new file is also created on first connect)
+    python3 sqliteffy.py copy --sqlite-file kiosk.db [--host HOST --database NAME ...]
+        copies the MySQL database into the file, e.g. every night for each offline kiosk
+
+Notes:
+    - Text columns compare ignoring case (COLLATE NOCASE) like utf8mb4_0900_ai_ci, but not ignoring accents:
+        SQLite has no accent-insensitive collation.
+    - outgoing_events is a single table, SQLite has no partitions.
+    - The file is opened in WAL mode, so many programs can read while one writes; writers wait for each other up
+        to the pool timeout. utilffy.allocateIds() commits on a connection of its own, so a transaction reserves
+        its IDs before its first write, or it would wait for itself.
+    - Needs SQLite 3.35 or newer (RETURNING and the FTS5 trigram tokenizer).
+"""
+import argparse
+import datetime
+import decimal
+import functools
+import os
+import re
+import sqlite3
+import zlib
+
+import queryffy
+
+schemaVersion = 10      #MySQL schema version (migrateffy.py) this schema matches
+copyBatch = 5000        #rows copied per batch by copyDatabase()
+duplicate = 1062        #MySQL error number of a duplicate key
+lockWait = 1205         #MySQL error number of a lock wait timeout
+refused = 1644          #MySQL error number of SIGNAL SQLSTATE '45000', for actions the procedures refuse
+
+# ------------------------------------------------------------------------------------------------------------------
+# schema: tables and indexes first, then the triggers, so copyDatabase() can fill the tables before the triggers
+# exist. Column order is the MySQL order, the programs insert with "values (...)" and read "select *" by position.
+# ------------------------------------------------------------------------------------------------------------------
+tables = [
+    """CREATE TABLE food_bank (
+          Location varchar(255) NOT NULL COLLATE NOCASE,
+          Address varchar(255) DEFAULT NULL COLLATE NOCASE,
+          Neighborhood varchar(100) DEFAULT NULL COLLATE NOCASE,
+          Phone_number varchar(32) DEFAULT NULL,
+          fb_ID INTEGER NOT NULL PRIMARY KEY)""",
+    "CREATE INDEX idx_food_bank_location ON food_bank (Location)",
+    "CREATE INDEX idx_food_bank_neighborhood ON food_bank (Neighborhood)",
+
+    """CREATE TABLE food_item (
+          Item_name varchar(255) NOT NULL COLLATE NOCASE,
+          Category varchar(100) NOT NULL DEFAULT '' COLLATE NOCASE,
+          Quantity int NOT NULL DEFAULT 0,
+          Units varchar(50) NOT NULL DEFAULT '' COLLATE NOCASE,
+          Location varchar(255) DEFAULT NULL COLLATE NOCASE,
+          fb_ID int NOT NULL,
+          fd_ID INTEGER NOT NULL PRIMARY KEY)""",
+    "CREATE UNIQUE INDEX uq_food_item_bank_item ON food_item (fb_ID, Item_name, Units, Category)",
+    "CREATE INDEX idx_food_item_name ON food_item (Item_name)",
+    "CREATE INDEX idx_food_item_category ON food_item (Category)",
+    "CREATE INDEX idx_food_item_location ON food_item (Location)",
+    "CREATE INDEX idx_food_item_quantity ON food_item (Quantity, fd_ID)",
+
+    """CREATE TABLE opening_hours (
+          fb_ID int NOT NULL,
+          weekday int NOT NULL,
+          open_minute int NOT NULL,
+          close_minute int NOT NULL,
+          PRIMARY KEY (fb_ID, weekday, open_minute)) WITHOUT ROWID""",
+    "CREATE INDEX idx_opening_hours_day ON opening_hours (weekday, open_minute, close_minute)",
+
+    """CREATE TABLE outgoing (
+          Item_name varchar(255) NOT NULL COLLATE NOCASE,
+          Category varchar(100) DEFAULT NULL COLLATE NOCASE,
+          Quantity int NOT NULL DEFAULT 0,
+          Units varchar(50) DEFAULT NULL COLLATE NOCASE,
+          Location varchar(255) DEFAULT NULL COLLATE NOCASE,
+          fb_ID int NOT NULL,
+          fd_ID INTEGER NOT NULL PRIMARY KEY)""",
+    "CREATE INDEX idx_outgoing_bank_name_units ON outgoing (fb_ID, Item_name, Units)",
+    "CREATE INDEX idx_outgoing_name ON outgoing (Item_name)",
+    "CREATE INDEX idx_outgoing_quantity ON outgoing (Quantity, fd_ID)",
+
+    # MySQL's CURRENT_TIMESTAMP is local time, SQLite's is UTC
+    """CREATE TABLE outgoing_events (
+          event_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+          ts DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+          fd_ID int NOT NULL,
+          fb_ID int NOT NULL,
+          delta int NOT NULL,
+          Item_name varchar(255) NOT NULL COLLATE NOCASE,
+          Category varchar(100) DEFAULT NULL COLLATE NOCASE,
+          Units varchar(50) DEFAULT NULL COLLATE NOCASE,
+          Location varchar(255) DEFAULT NULL COLLATE NOCASE)""",
+    "CREATE INDEX idx_outgoing_events_item ON outgoing_events (fd_ID, ts)",
+    "CREATE INDEX idx_outgoing_events_bank ON outgoing_events (fb_ID, ts)",
+
+    """CREATE TABLE outgoing_rollup (
+          period varchar(4) NOT NULL CHECK (period IN ('day', 'week')),
+          period_start DATE NOT NULL,
+          dimension varchar(8) NOT NULL CHECK (dimension IN ('item', 'category', 'bank')),
+          dim_key varchar(255) NOT NULL COLLATE NOCASE,
+          quantity int NOT NULL DEFAULT 0,
+          events int NOT NULL DEFAULT 0,
+          PRIMARY KEY (dimension, period, dim_key, period_start)) WITHOUT ROWID""",
+    "CREATE INDEX idx_outgoing_rollup_period ON outgoing_rollup (dimension, period, period_start)",
+
+    "CREATE TABLE id_sequences (name varchar(32) NOT NULL PRIMARY KEY, next_id int NOT NULL)",
+    """CREATE TABLE data_versions (
+          name varchar(64) NOT NULL,
+          shard int NOT NULL,
+          version int NOT NULL DEFAULT 0,
+          PRIMARY KEY (name, shard)) WITHOUT ROWID""",
+    """CREATE TABLE schema_migrations (
+          version int NOT NULL PRIMARY KEY,
+          description varchar(255) NOT NULL,
+          applied_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')))""",
+
+    # item name search (searchffy.py): the trigram index answers LIKE '%text%' without scanning the names
+    "CREATE VIRTUAL TABLE food_item_names USING fts5(Item_name, content='food_item', content_rowid='fd_ID', tokenize='trigram')",
+    "CREATE VIRTUAL TABLE outgoing_names USING fts5(Item_name, content='outgoing', content_rowid='fd_ID', tokenize='trigram')",
+
+    # the old 14-column hours layout, like the view of schema version 3
+    "CREATE VIEW hours AS SELECT fb.fb_ID, " +
+    ", ".join(f"COALESCE(MAX(CASE WHEN d.weekday = {i} THEN printf('%d:%02d:00', (d.open_minute % 1440) / 60, d.open_minute % 60) END), '') AS {day}, "
+              f"COALESCE(MAX(CASE WHEN d.weekday = {i} THEN printf('%d:%02d:00', (d.close_minute % 1440) / 60, d.close_minute % 60) END), '') AS {day}_close"
+              for i, day in enumerate(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"])) +
+    " FROM food_bank fb LEFT JOIN (SELECT fb_ID, weekday, MIN(open_minute) AS open_minute, "
+    "MAX(close_minute) AS close_minute FROM opening_hours GROUP BY fb_ID, weekday) d USING(fb_ID) "
+    "GROUP BY fb.fb_ID",
+]
+
+# period -> start of the period holding ts (weeks start on Monday); dimension -> key of an event
+rollupPeriods = {"day": "date(NEW.ts)",
+                 "week": "date(NEW.ts, '-' || ((CAST(strftime('%w', NEW.ts) AS int) + 6) % 7) || ' days')"}
+rollupKeys = {"item": "NEW.Item_name", "category": "COALESCE(NEW.Category, '')", "bank": "NEW.fb_ID"}
+
+triggers = [
+    # outgoing is the per-item total of the log, as in schema version 5
+    """CREATE TRIGGER outgoing_events_total AFTER INSERT ON outgoing_events BEGIN
+        INSERT INTO outgoing (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID)
+        VALUES (NEW.Item_name, NEW.Category, NEW.delta, NEW.Units, NEW.Location, NEW.fb_ID, NEW.fd_ID)
+        ON CONFLICT (fd_ID) DO UPDATE SET Quantity = Quantity + excluded.Quantity, Item_name = excluded.Item_name,
+            Category = excluded.Category, Units = excluded.Units, Location = excluded.Location, fb_ID = excluded.fb_ID;
+    END""",
+    # the six rollup rows of an event, as in schema version 6
+    "CREATE TRIGGER outgoing_events_rollup AFTER INSERT ON outgoing_events BEGIN "
+    "INSERT INTO outgoing_rollup (period, period_start, dimension, dim_key, quantity, events) VALUES " +
+    ", ".join(f"('{period}', {start}, '{dimension}', {key}, NEW.delta, 1)"
+              for period, start in rollupPeriods.items() for dimension, key in rollupKeys.items()) +
+    " ON CONFLICT (dimension, period, dim_key, period_start) DO UPDATE SET quantity = quantity + excluded.quantity, "
+    "events = events + 1; END",
+]
+for table in ("food_item", "outgoing"):
+    triggers += [
+        f"CREATE TRIGGER {table}_names_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {table}_names (rowid, Item_name) VALUES (NEW.fd_ID, NEW.Item_name); END",
+        f"CREATE TRIGGER {table}_names_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {table}_names ({table}_names, rowid, Item_name) VALUES ('delete', OLD.fd_ID, OLD.Item_name); END",
+        f"CREATE TRIGGER {table}_names_update AFTER UPDATE OF Item_name, fd_ID ON {table} BEGIN "
+        f"INSERT INTO {table}_names ({table}_names, rowid, Item_name) VALUES ('delete', OLD.fd_ID, OLD.Item_name); "
+        f"INSERT INTO {table}_names (rowid, Item_name) VALUES (NEW.fd_ID, NEW.Item_name); END",
+    ]
+# the inventory version of schema version 9; one writer at a time, so one shard (copied databases keep theirs)
+for table in ("food_item", "food_bank"):
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        triggers.append(f"CREATE TRIGGER {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN "
+                        f"UPDATE data_versions SET version = version + 1 WHERE name = 'inventory' AND shard = 0; END")
+
+startingRows = [
+    ("INSERT INTO id_sequences (name, next_id) VALUES ('food_item', 1), ('food_bank', 1)", ()),
+    ("INSERT INTO data_versions (name, shard, version) VALUES ('inventory', 0, 1)", ()),
+    ("INSERT INTO schema_migrations (version, description) VALUES (?, ?)",
+     (schemaVersion, f"SQLite schema matching MySQL schema version {schemaVersion}")),
+]
+
+# version -> (description, statements) bringing a file created at the version before up to it
+upgrades = {
+    10: ("quantity indexes for quantity-sorted table pages",
+         ["CREATE INDEX IF NOT EXISTS idx_food_item_quantity ON food_item (Quantity, fd_ID)",
+          "CREATE INDEX IF NOT EXISTS idx_outgoing_quantity ON outgoing (Quantity, fd_ID)"]),
+}
+
+
+def createSchema(db:sqlite3.Connection, withTriggers:bool=True, withRows:bool=True):
+    """ createSchema(db, withTriggers, withRows)
+    Creates the tables, indexes and view (and the triggers and starting rows, unless told not to) in the sqlite3
+        connection 'db', in one transaction. Does nothing if the database already has its tables.
+    """
+    db.execute("BEGIN IMMEDIATE")       #two programs opening a new file at once: the second one waits, then skips
+    try:
+        if db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'food_item'").fetchone() is None:
+            for statement in tables + (triggers if withTriggers else []):
+                db.execute(statement)
+            if withRows:
+                for statement, params in startingRows:
+                    db.execute(statement, params)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+
+
+def upgradeSchema(db:sqlite3.Connection):
+    """ upgradeSchema(db)
+    Applies the upgrades a file created by an older version of this module is missing, in one transaction.
+    """
+    if db.execute("SELECT MAX(version) FROM schema_migrations").fetchone()[0] >= schemaVersion:
+        return
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        current = db.execute("SELECT MAX(version) FROM schema_migrations").fetchone()[0]    #another program may have won
+        for version in range(current + 1, schemaVersion + 1):
+            description, statements = upgrades[version]
+            for statement in statements:
+                db.execute(statement)
+            db.execute("INSERT INTO schema_migrations (version, description) VALUES (?, ?)", (version, description))
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# values: dates and times are stored as ISO text and read back as datetime.date / datetime.datetime by declared type
+# ------------------------------------------------------------------------------------------------------------------
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(" ", "seconds"))
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(decimal.Decimal, lambda value: int(value) if value == value.to_integral_value() else float(value))
+sqlite3.register_converter("DATETIME", lambda text: datetime.datetime.fromisoformat(text.decode()))
+sqlite3.register_converter("DATE", lambda text: datetime.date.fromisoformat(text.decode()))
+
+
+def concatWs(separator, *values):
+    """MySQL's CONCAT_WS(): the non-NULL values joined by 'separator'"""
+    return None if separator is None else str(separator).join(str(value) for value in values if value is not None)
+
+
+def crc32(text):
+    """MySQL's CRC32()"""
+    return None if text is None else zlib.crc32(str(text).encode("utf-8"))
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# statements
+# ------------------------------------------------------------------------------------------------------------------
+likeParameter = re.compile(r"\blike\s+%s", re.IGNORECASE)
+returningClause = re.compile(r"\breturning\b", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def sqliteVersions() -> dict:
+    """MySQL text -> SQLite text of the statements in queryffy.sqliteStatements"""
+    return {queryffy.statements[name]: text for name, text in queryffy.sqliteStatements.items()}
+
+
+@functools.lru_cache(maxsize=4096)
+def translate(statement:str) -> tuple:
+    """ translate(statement)
+    Returns (SQLite text of the MySQL statement 'statement', True if it ends in RETURNING).
+    """
+    statement = sqliteVersions().get(statement, statement)
+    statement = likeParameter.sub("LIKE %s ESCAPE '\\\\'", statement)     #MySQL escapes LIKE with \ by default
+    return statement.replace("%s", "?"), returningClause.search(statement) is not None
+
+
+class Error(Exception):
+    """ class Error(msg, errno)
+    Raised for any error of the SQLite backend. Like mysql.connector.Error it has 'msg' and 'errno', the MySQL error
+        number where there is one (duplicate, refused, lockWait), otherwise 0.
+    """
+    def __init__(self, msg:str, errno:int=0):
+        super().__init__(msg)
+        self.msg = msg
+        self.errno = errno
+
+
+def wrapped(error:sqlite3.Error) -> Error:
+    """the Error raised in place of a sqlite3 error"""
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError) and "UNIQUE" in message:
+        return Error(message, duplicate)
+    if isinstance(error, sqlite3.OperationalError) and "locked" in message:
+        return Error(message, lockWait)
+    return Error(message)
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# staff action procedures (schema version 8), each returning the one row its stored procedure ends with
+# ------------------------------------------------------------------------------------------------------------------
+def adjustQuantity(db, fd_ID:int, name:str, units:str, quantity:int) -> list:
+    if quantity is None or quantity < 0:
+        raise Error("Quantity must be non-negative", refused)
+    row = db.execute("SELECT Quantity, Item_name, Category, Units, Location, fb_ID FROM food_item WHERE fd_ID = ?",
+                     (fd_ID,)).fetchone()
+    if row is None:
+        raise Error("The item no longer exists.", refused)
+    current, oldName, category, oldUnits, location, bank = row
+    db.execute("UPDATE food_item SET Item_name = ?, Units = ?, Quantity = ? WHERE fd_ID = ?", (name, units, quantity, fd_ID))
+    if quantity < current:
+        db.execute("INSERT INTO outgoing_events (fd_ID, fb_ID, delta, Item_name, Category, Units, Location) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?)", (fd_ID, bank, current - quantity, oldName, category, oldUnits, location))
+    return [(fd_ID, max(current - quantity, 0))]
+
+
+def moveItem(db, fd_ID:int, destination:str, quantity:int, new_fd_ID:int) -> list:
+    if quantity is None or quantity < 0:
+        raise Error("The move quantity cannot be negative", refused)
+    bank = db.execute("SELECT fb_ID FROM food_bank WHERE Location = ? LIMIT 1", (destination,)).fetchone()
+    row = db.execute("SELECT Quantity, Item_name, Category, Units, fb_ID FROM food_item WHERE fd_ID = ?",
+                     (fd_ID,)).fetchone()
+    if row is None or bank is None:
+        raise Error("The item or the food bank it was being moved to no longer exists.", refused)
+    available, name, category, units, source = row
+    bank = bank[0]
+    if quantity > available:
+        raise Error("The move quantity cannot be greater than the current quantity", refused)
+    if bank == source:
+        raise Error("Select a different location.", refused)
+    target = db.execute("SELECT fd_ID FROM food_item WHERE fb_ID = ? AND Item_name = ? AND Units = ? AND Category = ?",
+                        (bank, name, units, category)).fetchone()
+    if target is None and db.execute("SELECT 1 FROM food_item WHERE fb_ID = ? AND Item_name = ? AND Units = ?",
+                                     (bank, name, units)).fetchone():
+        raise Error("The items are not the same. Check units and category.", refused)
+    db.execute("UPDATE food_item SET Quantity = Quantity - ? WHERE fd_ID = ?", (quantity, fd_ID))
+    if target is None:
+        db.execute("INSERT INTO food_item (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?)", (name, category, quantity, units, destination, bank, new_fd_ID))
+        return [(new_fd_ID, 1)]
+    db.execute("UPDATE food_item SET Quantity = Quantity + ? WHERE fd_ID = ?", (quantity, target[0]))
+    return [(target[0], 0)]
+
+
+def deleteItem(db, fd_ID:int) -> list:
+    if db.execute("DELETE FROM food_item WHERE fd_ID = ?", (fd_ID,)).rowcount == 0:
+        raise Error("The item no longer exists.", refused)
+    return [(fd_ID,)]
+
+
+procedures = {"adjust_quantity": adjustQuantity, "move_item": moveItem, "delete_item": deleteItem}
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# connections
+# ------------------------------------------------------------------------------------------------------------------
+class Result:
+    """one result set of a procedure, as returned by Cursor.stored_results()"""
+    def __init__(self, rows:list):
+        self.rows = rows
+
+    def fetchall(self) -> list:
+        return self.rows
+
+
+class Cursor:
+    """ class Cursor(connection)
+    A cursor of a SQLite Connection, used like a mysql.connector cursor.
+    """
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.db.cursor()
+        self._rows = None           #rows of a RETURNING statement or procedure, read as soon as it ran
+        self._results = []
+        self.rowcount = -1
+        self.lastrowid = None
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, operation:str, params=()):
+        """runs one statement, written for MySQL, with 'params'"""
+        statement, returning = translate(operation)
+        self._rows = None
+        self.connection.statements += 1
+        try:
+            self._cursor.execute(statement, tuple(params))
+            if returning:
+                self._rows = self._cursor.fetchall()
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+        if returning:
+            self.rowcount = len(self._rows)
+            self.lastrowid = self._rows[0][0] if self._rows else 0
+        else:
+            self.rowcount = self._cursor.rowcount
+            self.lastrowid = self._cursor.lastrowid
+
+    def executemany(self, operation:str, seq_params):
+        """runs one statement, written for MySQL, once for every parameter tuple of 'seq_params'"""
+        statement, returning = translate(operation)
+        self._rows = None
+        self.connection.statements += 1
+        try:
+            self._cursor.executemany(statement, (tuple(params) for params in seq_params))
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+        self.rowcount = self._cursor.rowcount
+
+    def callproc(self, procname:str, args=()):
+        """runs one of the staff action procedures in its own transaction, committing it like the stored procedure"""
+        procedure = procedures.get(procname)
+        if procedure is None:
+            raise Error(f"PROCEDURE {procname} does not exist")
+        db = self.connection.db
+        self.connection.statements += 1
+        try:
+            if db.in_transaction:
+                db.commit()             #START TRANSACTION in the procedure commits an open transaction too
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = procedure(db, *args)
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+        self._results = [Result(rows)]
+        return args
+
+    def stored_results(self):
+        return iter(self._results)
+
+    def fetchall(self) -> list:
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        try:
+            return self._cursor.fetchall()
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+
+    def fetchmany(self, size:int=1) -> list:
+        if self._rows is not None:
+            rows, self._rows = self._rows[:size], self._rows[size:]
+            return rows
+        try:
+            return self._cursor.fetchmany(size)
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    """ class Connection(db)
+    A SQLite database connection, used like a mysql.connector connection: like those, it is not in autocommit
+        mode, so changes are kept only once commit() is called.
+    """
+    dialect = "sqlite"
+
+    def __init__(self, db:sqlite3.Connection):
+        self.db = db
+        self.statements = 0         #statements run, counted like the server's Questions (benchffy.py)
+
+    def cursor(self, **options) -> Cursor:
+        """a new cursor; the options of mysql.connector (prepared, buffered, ...) change nothing here"""
+        return Cursor(self)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.db.in_transaction
+
+    def start_transaction(self, consistent_snapshot:bool=False, isolation_level:str=None, readonly:bool=None):
+        """begins a transaction; every read in it sees the database as it was at its first read"""
+        if self.db.in_transaction:
+            raise Error("Transaction already in progress")
+        try:
+            self.db.execute("BEGIN")
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+
+    def commit(self):
+        try:
+            self.db.commit()
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+
+    def rollback(self):
+        try:
+            self.db.rollback()
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+
+    def ping(self, reconnect:bool=False, attempts:int=1, delay:int=0):
+        """raises Error if the connection was closed"""
+        try:
+            self.db.execute("SELECT 1").fetchall()
+        except sqlite3.Error as e:
+            raise wrapped(e) from e
+
+    def consume_results(self):
+        pass                        #SQLite results need no draining before the next statement
+
+    def interrupt(self):
+        """stops the statement running on this connection, from any thread (utilffy.ConnectionPool.interrupt())"""
+        self.db.interrupt()
+
+    def close(self):
+        self.db.close()
+
+
+def connect(path:str, timeout:float=10.0) -> Connection:
+    """ connect(path, timeout)
+    Opens the database file 'path', creating it with the full schema if it is new and upgrading it if it was
+        created at an older schema version. A writer waits up to 'timeout' seconds for another one to finish.
+    """
+    try:
+        db = sqlite3.connect(path, timeout=timeout, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False,
+                             cached_statements=512)
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA synchronous = NORMAL")   #WAL stays consistent; a power cut may lose the last commits
+        db.create_function("CONCAT_WS", -1, concatWs, deterministic=True)
+        db.create_function("CRC32", 1, crc32, deterministic=True)
+        if db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'food_item'").fetchone() is None:
+            createSchema(db)
+        else:
+            upgradeSchema(db)
+    except sqlite3.Error as e:
+        raise wrapped(e) from e
+    return Connection(db)
+
+
+# ------------------------------------------------------------------------------------------------------------------
+# copying the MySQL database
+# ------------------------------------------------------------------------------------------------------------------
+# table -> columns, in an order that keeps every trigger-maintained table (outgoing, outgoing_rollup) as copied
+copiedTables = {
+    "food_bank": ["Location", "Address", "Neighborhood", "Phone_number", "fb_ID"],
+    "opening_hours": ["fb_ID", "weekday", "open_minute", "close_minute"],
+    "food_item": ["Item_name", "Category", "Quantity", "Units", "Location", "fb_ID", "fd_ID"],
+    "outgoing": ["Item_name", "Category", "Quantity", "Units", "Location", "fb_ID", "fd_ID"],
+    "outgoing_events": ["event_ID", "ts", "fd_ID", "fb_ID", "delta", "Item_name", "Category", "Units", "Location"],
+    "outgoing_rollup": ["period", "period_start", "dimension", "dim_key", "quantity", "events"],
+    "id_sequences": ["name", "next_id"],
+    "data_versions": ["name", "shard", "version"],
+}
+
+
+def copyDatabase(source, path:str, size:int=copyBatch, progress=print) -> dict:
+    """ copyDatabase(source, path, size, progress)
+    Copies every table of the MySQL connection 'source' into a new SQLite file at 'path', replacing the file only
+        once the copy is complete. The tables are filled before the triggers exist, so nothing is counted twice,
+        and the name search indexes are built at the end.
+    Returns the rows copied per table.
+    """
+    partial = path + ".part"
+    for leftover in (partial, partial + "-wal", partial + "-shm"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    db = sqlite3.connect(partial, detect_types=sqlite3.PARSE_DECLTYPES)
+    copied = {}
+    try:
+        createSchema(db, withTriggers=False, withRows=False)
+        for table, names in copiedTables.items():
+            reader = source.cursor()
+            reader.execute(f"SELECT {', '.join(names)} FROM {table}")
+            insert = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(['?'] * len(names))})"
+            copied[table] = 0
+            while True:
+                rows = reader.fetchmany(size)
+                if not rows:
+                    break
+                db.executemany(insert, rows)
+                copied[table] += len(rows)
+            reader.close()
+            db.commit()
+            progress(f"  {table}: {copied[table]:,} rows")
+        for table in ("food_item", "outgoing"):
+            db.execute(f"INSERT INTO {table}_names ({table}_names) VALUES ('rebuild')")
+        for statement in triggers:
+            db.execute(statement)
+        db.execute(startingRows[-1][0], startingRows[-1][1])
+        db.commit()
+        db.execute("PRAGMA journal_mode = WAL")
+    finally:
+        db.close()
+    os.replace(partial, path)
+    return copied
+
+
+def main():
+    import utilffy          #here, not at the top: utilffy imports this module for its connections
+
+    parser = argparse.ArgumentParser(description="Food-For-You embedded SQLite database")
+    parser.add_argument("command", choices=["create", "copy"])
+    utilffy.databaseOptions(parser)
+    args = parser.parse_args()
+    path = args.sqliteFile or utilffy.sqliteFile
+
+    if args.command == "create":
+        connect(path).close()
+        print(f"{path} is ready (schema version {schemaVersion})")
+        return
+    utilffy.useDatabase(**{name: getattr(args, name) for name in utilffy.databaseSettings
+                           if name not in ("backend", "sqliteFile")}, backend="mysql")
+    try:
+        with utilffy.getPool().connection() as source:
+            copied = copyDatabase(source, path)
+    finally:
+        utilffy.closePool()
+    print(f"copied {sum(copied.values()):,} rows into {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,15 +14,30 @@ Modifications:
     3/8/2023: Added ID search, cleaned up GUI -KS
     3/9/2023: Full implementation of insert of deletion -KP
     3/10/2023: Integrated with util.py -KS
+    10/18/2026: Borrow short-lived cursors from the shared connection pool instead of a module-level connection
+                Run every query as a named prepared statement from queryffy.py
+                New food item IDs come from allocateIds() instead of MAX(fd_ID) + 1
+                Locations and categories come from the metadata cache in utilffy; saves invalidate it
+                Searches run on a worker thread through taskffy.py, with a busy indicator
+                The table is a tableffy.PagedTable, loading keyset pages of rows as the user scrolls
+                Saves return the food item IDs they touched and only those table rows are refreshed
+                Item search matches any part of the name, case-insensitively, through searchffy.py ("name*": prefix)
+                Search as you type: the search boxes search after a short pause, narrowing loaded rows when they can
+                Quantity decreases are appended to the outgoing_events log in one insert instead of read-modify-write
+                Updates, moves and deletes are one call each to the stored procedures of schema version 8 through
+                    inventoryffy.py, which check, change and log the action in a single transaction
+                New items are one upsert through inventoryffy.addItem(); adding an existing item adds to its quantity
 References:
     EasyA, admin.py from Jerry Pi
         -Recycled code to display database into table and update items from data to database
 """
 
 from utilffy import *
-
-connection = None #initialize connection to none
-cursor = None #initialize cursor to none
+import queryffy as sql
+from taskffy import BackgroundQueries, busyIndicator, Debouncer
+from tableffy import PagedTable, pageAfter
+from searchffy import itemFilter, narrows, rowMatcher
+from inventoryffy import addItem, adjustQuantity, moveItem, deleteItem, InventoryError
 
 class NewItem:
     """ class NewItem(parent)
@@ -37,8 +52,8 @@ class NewItem:
         self.swidth = 300
         self.screen.geometry(f'{self.swidth}x300')
         self.screen.configure(background='white')
-        self.locations = fetchLocations(cursor)     #holds list of locations in database
-        self.categories = fetchCategory(cursor)     #holds list of categories in databse
+        self.locations = fetchLocations()       #holds list of locations in database (cached)
+        self.categories = fetchCategory()       #holds list of categories in databse (cached)
         #--------------------------------------------------------------
 
         #============== holds user input of the new item ==========
@@ -78,7 +93,9 @@ class NewItem:
             This function saves all of the user's input to the SQL database. All input is retrieved and then 
             verified to make sure it meets the system requirements. If any of the input is incorrect the SQL queries
             will not be executed, and a window will be shown to display what the error is to the food bank staff.
+            Returns the set of food item IDs added (empty if nothing was saved).
             """
+            touched = set()     #food item ids written by this save
             # pulls user input and removes trailing new_lines/spaces
             item_name = iteminput.get().strip()         #Assign item name to variable
             quantity = (quantityinput.get().strip())    #Assign quantity to variable
@@ -86,48 +103,37 @@ class NewItem:
             units = unitsInput.get().strip()            #Assign units to variable
             category = categoryinput.get().strip()      #Assign category to variable
 
-            # search for the Food Bank ID for a certain location and store it in the cursor
-            cursor.execute(f"select fb.fb_ID from food_bank fb where fb.Location='{location}'")
-            temp = cursor.fetchall()        #Store the cursor data in a temporary variable
-
             if (category != "" and item_name != "" and units != "" and quantity != "" and location != ""): #Checks if all input fields from the tkinter window are non empty
                 if(quantity.isdigit()):
                     quantity = int(quantity)            #convert the quantity to an int
                     if (quantity >= 0):                 #if the quantity is greater than 0, we can continue processing the item addtion
-                        if (temp != []):                #If the foodBank ID list is not empty, we can continue since the food bank exists
-                            fb_id = int(temp[0][0])     #assign the food bank ID from the temp variable to a new variable
-                            cursor.execute(
-                                f"select * from food_item fi where fi.Item_name = '{item_name}' and fi.units = '{units}' and fi.location = '{location}' and fi.fb_ID = {fb_id}") #retrieve all entries from the databse where the current item may exist
-                            result = cursor.fetchall()              #store SQL data in a variable
-                            if (result == []): #if the result is empty, this item does not exist so we can continue insertion
-                                cursor.execute(f"select MAX(fi.fd_ID) from food_item fi") #select the max food item ID so a brand new unique item ID can be generated
-                                temp = cursor.fetchall()            #fetch data into a temp variable
-                                key = 1                             #initialize food item ID to 1
-                                if (temp != []):                    #if the temp var is not empty convert into an int and increment by 1 to get a new unique ID
-                                    key = int(temp[0][0]) + 1       #if the list is empty there is nothing in the data base and the food ID will start at 1
-                                cursor.execute(
-                                    f"insert into foodforyou.food_item values ('{item_name}', '{category}', {quantity}, '{units}', '{location}', {int(fb_id)}, {key})") #insert the data into the database cursor
-                                connection.commit()                 #commit the data to the database so it can be written to disk.
-
-                                self.screen.destroy()               # Upon sucessful completion destroy the window
-                                messagebox.showinfo("Success", "Item added")  # indicate that the operation was successfully completed.
-
-                            else:        #show an error indicating the item is already in the database.
-                                messagebox.showerror("ERROR",
-                                                    "This item appears to exist in the database, please find entry and modify.")
-                                return     # error checking -> doesn't allow user to change, still views FB screen
-                        else:           #show that the location is not valid
-                            messagebox.showerror("ERROR", "Location is not valid, please pick valid location.")
-                            return
+                        with getPool().connection() as connection:   #borrow a connection for this save
+                            try:
+                                # one upsert: adds to the same item at this food bank, or inserts it
+                                key, created = addItem(connection, item_name, category, quantity, units, location)
+                            except InventoryError as e: #show that the location is not valid
+                                messagebox.showerror(e.title, str(e))
+                                return touched
+                            connection.commit()                 #commit the data to the database so it can be written to disk.
+                        invalidateMetadata("item.categories", "item.names")     #the item may add a new name or category
+                        touched.add(key)
+                        refreshRows(touched)                #shows the new or changed item if it matches the search
+
+                        self.screen.destroy()               # Upon sucessful completion destroy the window
+                        if (created):
+                            messagebox.showinfo("Success", "Item added")  # indicate that the operation was successfully completed.
+                        else:       #the food bank already had this item, so the stock was added to it
+                            messagebox.showinfo("Success", "This item already existed, the quantity was added to it.")
                     else:               #tell user to use a positive quantity
                         messagebox.showerror("ERROR", "Enter a non-negative quantity.")
-                        return
+                        return touched
                 else:
                     messagebox.showerror("ERROR", "Quantity must be an integer.")
-                    return
+                    return touched
             else:                       #if any fields are empty, we will prompt the food bank staff to re-enter the information.
                 messagebox.showerror("ERROR", "Please enter all fields to insert an item.")
-                return
+                return touched
+            return touched
 
         submitButton = ttk.Button(self.screen, text="Save changes", width=15, command=saveChanges) #set attributes of submit button
         submitButton.place(x=(self.swidth) / 2 - 60, y=250) #place the submit button
@@ -162,7 +168,7 @@ class UpdateItem:
         screen.configure(background='white')
         self.swidth = 300
         self.screen.geometry(f'{self.swidth}x300')
-        self.locations = fetchLocations(cursor)
+        self.locations = fetchLocations()       #cached list of locations
 
         #============== holds what the user inputs =================
         self.quantity_to_update = IntVar()      #quantity
@@ -211,126 +217,70 @@ class UpdateItem:
 
 
         # ------------------------------ modification functions -----------------------------------------------
-        def compareItems(item1:tuple, item2:tuple)->bool:
-            """
-            This function compares two items in the database and ensures they are the same so they can be merged 
-            upon moving an item that already exists in another database.
-            """
-            name = (item1[0] == item2[0])       #create bool for if the item names are equal
-            category = (item1[1] == item2[1])   #create a bool for if the categories are the samee
-            units = (item1[3] == item2[3])      #create a bool for if the units are the same
-            return (name and category and units) #use boolean algebra to determine if the items are the same
-
         def saveChanges():
             """
             This function saves all of the user's input to the SQL database. All input is retrieved and then 
             verified to make sure it meets the system requirements. If any of the input is incorrect the SQL queries
             will not be executed, and a window will be shown to display what the error is to the food bank staff.
+            Returns the set of food item IDs the save changed, so only those rows of the table are refreshed.
             """
+            touched = set()     #food item ids written by this save
             # If one or more required field is empty, show error
-            operation = self.screenopt.get()        #obtain the operation so the correct code can be executed.
-            cursor.execute(f"select fb.fb_id from food_bank fb where fb.Location = '{location}'") #obtain the food bank id of the location from the database.
-            fb_id = [int(i[0]) for i in cursor.fetchall()][0] #store the food bank ID in a variable
-            if (operation == 'update'):              #if the update operation is specified execute code below
-                if(quantityinput.get().isdigit()):
-                    if (int(quantityinput.get()) < 0): #verify quantity to be updated is non-negative
-                        messagebox.showerror("ERROR", "Quantity must be non-negative") #show message if quantity is negative
-                    else:                           #continue if quantity is correct
-                        currentfb_id = fb_id        #set new var for fb_id
-                        cursor.execute(
-                            f"select * from food_item fi where fi.Item_name='{item}' and fi.fb_id={currentfb_id} and fi.units = '{units}'") #select all columns for food item matching input from database
-                        origEntry = cursor.fetchall()[0] #set database result to variable
-                        origQuantity = origEntry[2] #set variable for original quantity
-
-                        cursor.execute(
-                            f"update foodforyou.food_item set Item_name='{iteminput.get().strip()}', Quantity={int(quantityinput.get())}, Units='{unitsInput.get().strip()}', Location='{location}', fb_id='{currentfb_id}' where fd_ID='{int(food_id)}'")
-                            #update entry in food_item table to set quantity of current food item to its new quantity
-                        if (int(quantityinput.get()) < origQuantity): #if the quantity set in the database was less than original record it to the outgoing database for record keeping
-                            cursor.execute(
-                                f"select * from outgoing o where o.Item_name='{item}' and o.fb_ID={fb_id} and o.fd_ID={food_id}") #select item if it exists in the outgoing database
-                            outgoingEntry = cursor.fetchall() #store in variable
-                            if (outgoingEntry != []): #if the entry is not empty we will update it 
-                                cursor.execute(
-                                    f"update foodforyou.outgoing set Quantity={int(outgoingEntry[0][2]) + origQuantity - int(quantityinput.get())} where fd_ID='{int(food_id)}'") #increment quantity in outgoing table
+            with getPool().connection() as connection:   #borrow a connection for this save
+                operation = self.screenopt.get()        #obtain the operation so the correct code can be executed.
+                if (operation == 'update'):              #if the update operation is specified execute code below
+                    if(quantityinput.get().isdigit()):
+                        if (int(quantityinput.get()) < 0): #verify quantity to be updated is non-negative
+                            messagebox.showerror("ERROR", "Quantity must be non-negative") #show message if quantity is negative
+                        else:                           #continue if quantity is correct
+                            try:
+                                # sets the new values and logs any decrease as given out, committed by the procedure
+                                adjustQuantity(connection, int(food_id), iteminput.get().strip(), unitsInput.get().strip(),
+                                               int(quantityinput.get()))
+                            except InventoryError as e:
+                                messagebox.showerror(e.title, str(e)) #show why the update was refused
                             else:
-                                cursor.execute(
-                                    f"insert into foodforyou.outgoing (Item_name, Category, Quantity, Units, Location, fb_ID, fd_ID) values ('{item}', '{origEntry[1]}', {origQuantity - int(quantityinput.get())}, '{origEntry[3]}', '{origEntry[4]}', {int(origEntry[5])}, {int(origEntry[6])})")
-                                #if the entry is not in the table, insert it 
-                        connection.commit() #commit the connection, so the insertions are written to disk inthe database
-                        messagebox.showinfo("Success", "Quantity successfully updated.") #show a message showing success
-                else:
-                    messagebox.showerror("ERROR", "Quantity must be an integer.")
-
-            elif (operation == 'move'): #if the move operation is specified execute code below
-                cursor.execute(f"select fi.Quantity from food_item fi where fi.fd_id = '{food_id}'") #select quantity for food_item
-                origQuantity = [int(i[0]) for i in cursor.fetchall()][0] #store quantity in variable
-                moveQuantity = (quantityinput.get()) #get the quantity to move and store in variable
-                if(moveQuantity.isdigit()):
-                    moveQuantity = int(moveQuantity)
-                    if (moveQuantity > origQuantity): # check if move quantity is greater than available
-                        messagebox.showerror("ERROR", "The move quantity cannot be greater than the current quantity") #show error if it is
-                    elif (moveQuantity < 0): #move quantity cannot be less than 0
-                        messagebox.showerror("ERROR", "The move quantity cannot be negative") #show error if less than 0
-                    elif (locationDD.get() == "None" or locationDD.get() == ""): #Location cannot be None or empty
-                        messagebox.showerror("Operation Cancelled", "Move location was none.") #show error
-                    elif (locationDD.get() == location): #Cannot move to the same location
-                        messagebox.showerror("Location cannot be the same.", "Select a different location.")
+                                touched.add(int(food_id))
+                                messagebox.showinfo("Success", "Quantity successfully updated.") #show a message showing success
+                    else:
+                        messagebox.showerror("ERROR", "Quantity must be an integer.")
+
+                elif (operation == 'move'): #if the move operation is specified execute code below
+                    moveQuantity = (quantityinput.get()) #get the quantity to move and store in variable
+                    if(moveQuantity.isdigit()):
+                        moveQuantity = int(moveQuantity)
+                        if (locationDD.get() == "None" or locationDD.get() == ""): #Location cannot be None or empty
+                            messagebox.showerror("Operation Cancelled", "Move location was none.") #show error
+                        elif (locationDD.get() == location): #Cannot move to the same location
+                            messagebox.showerror("Location cannot be the same.", "Select a different location.")
+                        else:
+                            try:
+                                # checks the quantity and categories and moves both quantities in one transaction
+                                newFoodID, created = moveItem(connection, int(food_id), locationDD.get(), moveQuantity)
+                            except InventoryError as e:
+                                messagebox.showerror(e.title, str(e)) #show why the move was refused
+                            else:
+                                touched.update((int(food_id), newFoodID))
+                                if (created): #indicate success, and addition of new item
+                                    messagebox.showinfo("Item does not exist", "The item did not exist in the food bank it was being moved to an entry was created automatically")
+                                else:
+                                    messagebox.showinfo("Success", "Quantity successfully moved.") #display message indicating success
+                    else:
+                        messagebox.showerror("ERROR", "Quantity must be an integer.")
+                elif (operation == 'delete'): #if operation is delete do code below
+                    try:
+                        deleteItem(connection, int(food_id)) #delete the food item, committed by the procedure
+                    except InventoryError as e:
+                        messagebox.showerror(e.title, str(e))
                     else:
-                        cursor.execute(f"select fb.fb_id from food_bank fb where fb.Location = '{locationDD.get()}'") #get food bank ID for move location
-                        movefb_id = [int(i[0]) for i in cursor.fetchall()][0] #store food bank ID in varaible
-                        cursor.execute(
-                            f"select * from food_item fi where fi.Item_name='{item}' and fi.units = '{units}' and fi.fb_id={movefb_id}") #select all columns for current item in move location
-                        itemCheck = cursor.fetchall() #store in variable
-                        # print(a)
-                        if (itemCheck != []): #if the item exists in the move location itemCheck will not be empty
-                            item2 = itemCheck[0] #set item to variable
-                            cursor.execute(f"select * from food_item fi where fi.Item_name='{item}' and fi.fb_id={fb_id}") #select all columns for current item in current location 
-                            item1 = cursor.fetchall()[0] #set current location item to variable
-                            if (compareItems(item1, item2)): #verify that both items are the same
-                                cursor.execute(
-                                    f"select fi.fd_id from food_item fi join food_bank fb using (fb_id) where fb_id = '{movefb_id}' and fi.Item_name = '{iteminput.get().strip()}'") #select food item ID if item exists
-                                newFoodID = [int(i[0]) for i in cursor.fetchall()][0] #store food_item id
-                                cursor.execute(f"select fi.Quantity from food_item fi where fi.fd_id = '{newFoodID}'") #select quantity for moved food item
-                                existingNewQuantity = [int(i[0]) for i in cursor.fetchall()][0] #store existing move quantity to variable
-                                updateQuantity = moveQuantity + existingNewQuantity #add to location being moved to, so set to variable
-                                currentItemUpdateQuantity = origQuantity - moveQuantity #set variable for update to current location
-                                cursor.execute(
-                                    f"update foodforyou.food_item set Quantity='{currentItemUpdateQuantity}' where fd_ID='{int(food_id)}'") #write new quantity to database for current location
-                                cursor.execute(
-                                    f"update foodforyou.food_item set Quantity='{updateQuantity}' where fd_ID='{int(newFoodID)}'") #write new quantity for moved location
-
-                                connection.commit() # write database updates to disk 
-                                messagebox.showinfo("Success", "Quantity successfully moved.") #display message indicating success
-                            else: #if both items are not the same, show an error
-                                messagebox.showerror("ERROR", "The items are not the same. Check units and category.")
-                        else:#if item does not exist in location being moved to, insert it
-                            cursor.execute(f"select fb.fb_id from food_bank fb where fb.Location = '{locationDD.get()}'") #get food bank id for move location
-                            movefb_id = [int(i[0]) for i in cursor.fetchall()][0] #store move location ID in variable
-                            cursor.execute(f"select * from food_item fi where fi.Item_name='{item}' and fi.fb_id={fb_id}") #select all columns for item at current location
-                            item1 = cursor.fetchall()[0] #store item in variable
-                            cursor.execute(f"select MAX(fi.fd_ID) from food_item fi") #find max food_item ID to create unique ID
-                            temp = cursor.fetchall() #store in temp var
-                            key = 1 #initialize key to 1
-                            if (temp != []): #if no IDs exist, 1 will be used to start table
-                                key = int(temp[0][0]) + 1 #covert maxID to int and increment by 1 to get new unique ID
-                            newQuantity = origQuantity - moveQuantity #store new quantity for current location in variable
-                            cursor.execute(
-                                    f"update foodforyou.food_item set Quantity='{newQuantity}' where fd_ID='{int(food_id)}'") #update quantity for current location 
-                            cursor.execute(
-                                f"insert into foodforyou.food_item values ('{item}', '{item1[1]}', {moveQuantity}, '{units}', '{locationDD.get()}', {int(movefb_id)}, {key})"
-                            ) #insert quantity for move location
-
-                            messagebox.showinfo("Item does not exist", "The item did not exist in the food bank it was being moved to an entry was created automatically") #indicate success, and addition of new item
+                        messagebox.showinfo("Success", "Item successfully removed.") #show message indicating success
+                    touched.add(int(food_id))       #refreshed either way: a missing item leaves the table
                 else:
-                    messagebox.showerror("ERROR", "Quantity must be an integer.")
-            elif (operation == 'delete'): #if operation is delete do code below
-                cursor.execute(f"delete from food_item where fd_id = {food_id}") #delete all rows matching current food id
-                connection.commit() #commit changes to disk
-                messagebox.showinfo("Success", "Item successfully removed.") #show message indicating success
-            else:
-                messagebox.showerror("ERROR", "Select a valid option from the dropdown.")
-            fetchData() #refresh screen
+                    messagebox.showerror("ERROR", "Select a valid option from the dropdown.")
+            invalidateMetadata("item.categories", "item.names")    #renames and deletions change the item lists
+            refreshRows(touched) #refresh only the changed rows of the screen
             screen.destroy() #destroy child window
+            return touched
 
         def showScreen(a, b, c):
             """ ShowScreen
@@ -393,11 +343,13 @@ class StaffGUI:
         self.screenWidth = 900
         self.root.geometry(f'{self.screenWidth}x540')
         self.ascSort = BooleanVar()
-        self.locations = fetchLocations(cursor)         #grab exisiting locations
+        self.locations = fetchLocations()           #grab exisiting locations (cached)
         use_theme(root, "10")
 
         #-----------------------------setting up background---------------------------------------
         global fetchData #set fetchData functiont o be global so screen can be refreshed by any class
+        global refreshRows #lets the item windows refresh just the rows they changed
+        self.shownCriteria = None       #search criteria of the rows currently in the table
         #structured to catch errors if user does not have background images,
             # allows the user to run the program without bg images
         try:
@@ -413,22 +365,61 @@ class StaffGUI:
         root.configure(background='white') #set background to white
 
         def onClose(): #override built in close function in Tkinter so connection is terminated to prevent memory leaks on SQL database side.
-            connection.close() #close the connection
+            typing.cancel() #drop a search still waiting for the user to stop typing
+            queries.shutdown(wait=True) #stop the background search workers before their connections go away
+            closePool() #close the pooled connections
             root.destroy() #destory the main window
 
         #-------------------------- item modification functions ---------------------------------------------
         def fetchData():
-            search() #call search function to store all entries in cursor
-            rows = cursor.fetchall() #set rows from cursor
-
-            # Delete the old table and insert each row in the current database to accomplish refresh
-            if rows != 0:
-                table.delete(*table.get_children())
+            criteria = searchCriteria() #read the search boxes on the UI thread
+            self.shownCriteria = criteria
+            # loads the first page on a worker thread, later pages load as the user scrolls;
+                # a newer search replaces one still running
+            table.load(lambda lastRow, limit: search(criteria, lastRow, limit), lambda: countMatches(criteria),
+                       orderKey=(lambda row: (row[1], row[3])) if criteria[3] else None)    #quantity then food id when ascending
+
+        def refreshRows(touched):
+            """refreshRows(touched)
+                Re-reads only the food items in 'touched' and patches those table rows in place;
+                reloads the whole table instead if the search boxes changed since it was loaded.
+                Never raises for the search boxes: the saves calling it have already committed.
+            """
+            try:
+                criteria = searchCriteria()
+            except ValueError:
+                criteria = self.shownCriteria #the item ID box is mid-edit, keep patching the search shown
+            if criteria is None:
+                return #nothing loaded yet
+            if criteria != self.shownCriteria:
+                fetchData()
+            else:
+                table.refreshRows(touched, lambda key: searchRow(criteria, key))
 
-                for row in rows: #populate table with new entries
-                    table.insert('', END, values=row)
+        def liveSearch():
+            """ liveSearch()
+                Searches as the user types (called once typing pauses). If the new text only narrows the search
+                shown and all of its rows are loaded, the rows are filtered here without a query; otherwise
+                the new search replaces the one shown (or still running).
+            """
+            try:
+                criteria = searchCriteria()
+            except ValueError:
+                return #the item ID box does not hold a whole number yet
+            shown = self.shownCriteria
+            if criteria == shown:
+                return #e.g. an arrow key, nothing changed
+            item, location, fd_id, ascending = criteria
+            if (shown is not None and shown[1] == location and shown[3] == ascending
+                    and narrows((shown[0], shown[2]), (item, fd_id))):
+                keep = rowMatcher(item, fd_id)
+                if table.narrow(lambda row: keep(row[0], row[3])):
+                    self.shownCriteria = criteria
+                    return
+            fetchData()
 
-        def search():
+        def searchCriteria():
+            """reads the search boxes and returns (item, location, fd_id, ascending) for search()"""
             item = ItemSearch.get() #get item name from search box
             locationBool = True #initialize location bool to true 
             itemBool = True #initialize item bool to true
@@ -443,12 +434,35 @@ class StaffGUI:
                 fd_id = "%"
             else:
                 fd_id = int(fd_id.strip())
-            if (ascending): #if ascending is specified, execute this query
-                cursor.execute(
-                    f"SELECT fi.Item_name, fi.Quantity, fi.Units, fi.fd_id, fb.Location from food_item fi join food_bank fb using(fb_id) where fi.Item_name like '{item}' and fb.location like '{location}' and fi.fd_id like '{fd_id}' order by fi.Quantity ASC")
-            else: #if ascending not specified use this query
-                cursor.execute(
-                    f"SELECT fi.Item_name, fi.Quantity, fi.Units, fi.fd_id, fb.Location from food_item fi join food_bank fb using(fb_id) where fi.Item_name like '{item}' and fb.location like '{location}' and fi.fd_id like '{fd_id}'")
+            return item, location, fd_id, ascending
+
+        def search(criteria, lastRow, limit):
+            """returns the page of up to 'limit' matching rows after 'lastRow' (None for the first page);
+                called on a worker thread, so it must not touch any widget"""
+            item, location, fd_id, ascending = criteria
+            filterName, filters = itemFilter(item, fd_id) #indexed substring/prefix match of the item name
+            filters += (location,)
+            with getPool().connection() as connection:
+                if (ascending): #if ascending is specified, page by quantity then food id
+                    return sql.fetch(connection, f"staff.search_page_asc:{filterName}", filters + pageAfter(lastRow, True) + (limit,))
+                else: #if ascending not specified page by food id
+                    return sql.fetch(connection, f"staff.search_page:{filterName}", filters + pageAfter(lastRow, False) + (limit,))
+
+        def countMatches(criteria):
+            """returns the number of rows matching the search; called on a worker thread"""
+            item, location, fd_id, ascending = criteria
+            filterName, filters = itemFilter(item, fd_id)
+            with getPool().connection() as connection:
+                return sql.fetch(connection, f"staff.search_count:{filterName}", filters + (location,))[0][0]
+
+        def searchRow(criteria, key):
+            """returns food item 'key' as the search shows it, or None if the search does not include it;
+                called on a worker thread"""
+            item, location, fd_id, ascending = criteria
+            filterName, filters = itemFilter(item, fd_id)
+            with getPool().connection() as connection:
+                rows = sql.fetch(connection, f"staff.search_row:{filterName}", filters + (location, key))
+            return rows[0] if rows else None
 
         def update(e):
             # taken from focus(e) by jerry
@@ -480,6 +494,11 @@ class StaffGUI:
         IDSearch = ttk.Entry(root, width=25)
         IDSearch.place(x=675, y=190)
 
+        # search as the user types, once typing pauses
+        typing = Debouncer(root, liveSearch)
+        ItemSearch.bind("<KeyRelease>", typing)
+        IDSearch.bind("<KeyRelease>", typing)
+
         # widgets to filter by location
         ttk.Label(root, text="Sort by location").place(x=675, y=230)
         LocationFilter = ttk.Combobox(root, values=self.locations, state="readonly")
@@ -498,16 +517,21 @@ class StaffGUI:
         addButton = ttk.Button(text="New Item +", command=addItem, width=15)
         addButton.place(x=675, y=410)
 
+        # shows that a search is running
+        statusLabel = ttk.Label(root, text="")
+        statusLabel.place(x=675, y=383)
+        queries = BackgroundQueries(root, busyIndicator(root, statusLabel))     #runs searches off the UI thread
+
 
         #------------------------------------ table ---------------------------------------------------
         viewFrame = Frame(root, bd=5, relief='ridge', bg='wheat')
         viewFrame.place(x=30, y=110, width=600, height=350)
         xScroll = Scrollbar(viewFrame, orient=HORIZONTAL)   #allows the user to scroll
         yScroll = Scrollbar(viewFrame, orient=VERTICAL)
-        table = ttk.Treeview(viewFrame, columns=(
+        table = PagedTable(viewFrame, columns=(
             'item_to_filter', 'quantity_to_filter', 'units', 'fid_to_filter', 'location_to_filter'),
                              xscrollcommand=xScroll.set,
-                             yscrollcommand=yScroll.set)
+                             scrollbar=yScroll, runner=queries)      #loads pages of rows as the user scrolls
 
         table.heading("item_to_filter", text="item")
         table.heading("quantity_to_filter", text="quantity")
@@ -532,9 +556,4 @@ class StaffGUI:
         root.mainloop()
 
 
-connection = connectToDatabase() #create connection to database using function from utilffy.py
-#connection = connectToDatabase("kp", "pass", "127.0.0.1", 3306, "foodforyou")
-cursor = connection.cursor() #initialize cursor to database
-
-
 StaffGUI() #start tkinter interface
\ No newline at end of file
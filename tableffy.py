@@ -0,0 +1,238 @@
+"""
+Name: tableffy.py
+Created: 10/18/2026
+
+PagedTable: a ttk.Treeview that loads its rows one page at a time instead of inserting a whole result set.
+The first page is loaded when a search starts, and the next page is fetched when the user scrolls near the bottom
+of what is loaded, so a search over a large inventory shows its first rows at once and only keeps the pages the
+user actually scrolled through.
+
+Pages are read with keyset pagination: each page asks for the rows that sort after the last row already shown
+(e.g. "fd_ID > last fd_ID ORDER BY fd_ID LIMIT n"), which uses the index and costs the same on page 1 or page 500,
+unlike LIMIT/OFFSET.
+
+Usage:
+    table = PagedTable(viewFrame, columns=(...), runner=queries)
+    table.load(lambda lastRow, limit: fetchPage(criteria, lastRow, limit), lambda: fetchCount(criteria))
+
+Notes:
+    - Rows are inserted with their food item ID (keyColumn) as the Treeview item id.
+    - The total number of matching rows comes from a COUNT(*) query, so rowCount is known without loading them.
+    - After a save, refreshRows() re-reads only the rows it touched and patches them in place (update, insert at
+        their sorted position, or remove) instead of reloading the whole search.
+    - Once every matching row is loaded, narrow() can answer a narrower search by hiding rows, with no query.
+"""
+from tkinter import ttk, messagebox, END
+import bisect
+import itertools
+
+tablePage = 200         #rows fetched per page
+prefetchAt = 0.9        #fetch the next page once the view reaches this fraction of the loaded rows
+lowestQuantity = -2 ** 31   #sorts before every quantity, used as the starting key of quantity-ordered pages
+
+
+def pageAfter(lastRow, byQuantity:bool, quantityColumn:int=1, keyColumn:int=3) -> tuple:
+    """ pageAfter(lastRow, byQuantity, quantityColumn, keyColumn)
+    Returns the keyset parameters for the page after 'lastRow' (None for the first page):
+        (fd_ID,) for pages ordered by fd_ID, or (Quantity, Quantity, fd_ID) for pages ordered by quantity then fd_ID.
+    """
+    if byQuantity:
+        if lastRow is None:
+            return (lowestQuantity, lowestQuantity, -1)
+        return (lastRow[quantityColumn], lastRow[quantityColumn], lastRow[keyColumn])
+    return (-1 if lastRow is None else lastRow[keyColumn],)
+
+
+class PagedTable(ttk.Treeview):
+    """ class PagedTable(master, columns, scrollbar, runner, pageSize, keyColumn, **options)
+    Treeview whose rows come from load(fetchPage, fetchCount).
+    Input: scrollbar is an optional vertical Scrollbar kept in step with the table
+           runner is an optional taskffy.BackgroundQueries; without one pages are fetched on the calling thread
+           pageSize is the number of rows fetched per page
+           keyColumn is the column holding each row's unique key, used as its Treeview item id
+    """
+    def __init__(self, master, columns, scrollbar=None, runner=None, pageSize:int=tablePage, keyColumn:int=3,
+                 **options):
+        options.pop("yscrollcommand", None)
+        super().__init__(master, columns=columns, yscrollcommand=self._scrolled, **options)
+        self.scrollbar = scrollbar
+        self.runner = runner
+        self.pageSize = pageSize
+        self.keyColumn = keyColumn
+        self.rowCount = 0               #rows matching the current search (from fetchCount)
+        self._fetchPage = None
+        self._lastRow = None            #last row loaded, where the next page starts
+        self._exhausted = True          #every matching row is loaded
+        self._loading = False
+        self._generation = 0            #bumped by load(), so pages of an older search are ignored
+        self._orderKey = self._byKey    #row -> value the current search is sorted by
+        self._rows = {}                 #item id -> row, for every loaded row
+        self._order = []                #sorted (order key, item id) of every loaded row
+        self._refreshes = itertools.count()     #gives each refreshRows() its own runner key
+
+    @property
+    def columnCount(self) -> int:
+        """number of columns in the table"""
+        return len(self["columns"])
+
+    @property
+    def loadedCount(self) -> int:
+        """number of rows currently loaded into the table"""
+        return len(self.get_children())
+
+    def _byKey(self, row):
+        return row[self.keyColumn]
+
+    def load(self, fetchPage, fetchCount=None, done=None, orderKey=None):
+        """ load(fetchPage, fetchCount, done, orderKey)
+        Replaces the table's rows with the first page of a new search.
+            - fetchPage(lastRow, limit) returns up to 'limit' rows after 'lastRow' (None for the first page)
+            - fetchCount() returns the number of matching rows
+            - done() is called once the first page is shown
+            - orderKey(row) returns what the pages are sorted by (default: the key column)
+        Both fetch functions may run on a worker thread, so they must not touch any widget.
+        """
+        self._generation += 1
+        generation = self._generation
+        self._fetchPage = fetchPage
+        self._orderKey = orderKey if orderKey is not None else self._byKey
+        self._lastRow = None
+        self._exhausted = False
+        self._loading = True
+
+        def work():
+            rows = fetchPage(None, self.pageSize)
+            return rows, (fetchCount() if fetchCount is not None else None)
+
+        def show(result):
+            if generation != self._generation:
+                return
+            rows, count = result
+            self.delete(*self.get_children())
+            self._rows, self._order = {}, []
+            self.rowCount = count if count is not None else len(rows)
+            self._append(rows)
+            if done is not None:
+                done()
+
+        self._run(work, show)
+
+    def loadMore(self):
+        """ loadMore()
+        Fetches the page after the last loaded row, unless one is already on its way or every row is loaded.
+        """
+        if self._loading or self._exhausted or self._fetchPage is None:
+            return
+        self._loading = True
+        generation, fetchPage, lastRow = self._generation, self._fetchPage, self._lastRow
+
+        def show(rows):
+            if generation == self._generation:
+                self._append(rows)
+
+        self._run(lambda: fetchPage(lastRow, self.pageSize), show)
+
+    def refreshRows(self, keys, fetchRow):
+        """ refreshRows(keys, fetchRow)
+        Re-reads the rows with the given keys and patches just those items: changed rows are updated and moved
+            to their sorted position, rows that no longer match (or were deleted) are removed, and new matching
+            rows are inserted if they fall within the pages already loaded.
+            - fetchRow(key) returns the row as the current search shows it, or None if the search no longer
+                includes it; it may run on a worker thread
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        generation = self._generation
+
+        def show(found):
+            if generation == self._generation:
+                for key, row in found:
+                    self._patch(str(key), row)
+
+        self._run(lambda: [(key, fetchRow(key)) for key in keys], show, f"{self}.refresh{next(self._refreshes)}")
+
+    def narrow(self, keep) -> bool:
+        """ narrow(keep)
+        Removes the loaded rows for which keep(row) is False, as the answer to a search narrower than the one
+            loaded. Only done when every row of the loaded search is in the table and none is on its way.
+        Returns True if the table was narrowed, False if the caller has to load() the new search instead.
+        """
+        if self._loading or not self._exhausted:
+            return False
+        self._generation += 1           #refreshes started for the wider search no longer apply
+        dropped = [iid for iid, row in self._rows.items() if not keep(row)]
+        if dropped:
+            self.delete(*dropped)
+            for iid in dropped:
+                del self._rows[iid]
+            self._order = [entry for entry in self._order if entry[1] in self._rows]
+        self.rowCount = len(self._rows)
+        return True
+
+    def _patch(self, iid, row):
+        """applies one re-read row (None: no longer in the search) to the table"""
+        old = self._rows.pop(iid, None)
+        if old is not None:
+            self._order.remove((self._orderKey(old), iid))
+        if row is None:
+            if old is not None:
+                self.delete(iid)
+                self.rowCount -= 1
+            return
+        if old is None:
+            self.rowCount += 1
+        key = self._orderKey(row)
+        # past the last loaded row: the row arrives with its page when the user scrolls that far
+        if not self._exhausted and self._lastRow is not None and key > self._orderKey(self._lastRow):
+            if old is not None:
+                self.delete(iid)
+            return
+        index = bisect.bisect(self._order, (key, iid))
+        self._order.insert(index, (key, iid))
+        self._rows[iid] = row
+        if old is not None:
+            self.item(iid, values=row)
+            self.move(iid, '', index)
+        else:
+            self.insert('', index, iid=iid, values=row)
+
+    def _append(self, rows):
+        """inserts a page at the end of the table"""
+        for row in rows:
+            iid = str(row[self.keyColumn])
+            if iid in self._rows:
+                continue                #already shown, e.g. patched in by refreshRows()
+            self.insert('', END, iid=iid, values=row)
+            self._rows[iid] = row
+            self._order.append((self._orderKey(row), iid))
+        if rows:
+            self._lastRow = rows[-1]
+        self._exhausted = len(rows) < self.pageSize
+        self._loading = False
+        self.rowCount = max(self.rowCount, self.loadedCount)
+        # a short page may not fill the view, in which case no scrolling will ask for the next one
+        if not self._exhausted and self.yview()[1] >= prefetchAt:
+            self.loadMore()
+
+    def _failed(self, error):
+        self._loading = False
+        messagebox.showerror("ERROR", f"The table could not be loaded: {error}")
+
+    def _run(self, work, show, key:str=None):
+        """runs 'work' through the runner (or right away) and passes its result to 'show' on the Tk thread;
+            work under the same 'key' (default: this table's page loads) supersedes earlier work"""
+        if self.runner is not None:
+            self.runner.submit(key if key is not None else str(self), work, show, self._failed)
+        else:
+            try:
+                show(work())
+            except Exception as e:
+                self._failed(e)
+
+    def _scrolled(self, first, last):
+        """yscrollcommand: keeps the scrollbar in step and fetches the next page near the bottom"""
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if float(last) >= prefetchAt:
+            self.loadMore()
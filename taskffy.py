@@ -0,0 +1,169 @@
+"""
+Name: taskffy.py
+Created: 10/18/2026
+
+Runs database work off the Tk main thread so windows keep redrawing and responding while a query is in flight.
+Work is handed to a small pool of worker threads; its result is passed back to the Tk thread, where the 'done'
+callback runs from an after() poll, so callbacks may update widgets as usual.
+
+Usage:
+    queries = BackgroundQueries(root, busyIndicator(root, statusLabel))
+    queries.submit("search", lambda: runSearch(criteria), showRows)
+
+Notes:
+    - Work functions must not touch Tk widgets or variables: read the user's input first, then submit.
+    - Submitting again under the same key supersedes the earlier request: it is cancelled if it has not started;
+        if it has, its running statement is stopped (utilffy.QueryScope: KILL QUERY from another connection) and
+        whatever it returns is dropped, so only the latest search ever reaches the table or the database.
+    - Debouncer delays a search until the user stops typing, so a burst of keystrokes costs one query.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox, TclError
+import queue
+import threading
+import traceback
+
+from utilffy import QueryScope, queryScope
+
+queryWorkers = 2        #worker threads per window; each borrows its own pooled connection
+pollInterval = 30       #milliseconds between checks for finished work while any is pending
+typingDelay = 250       #milliseconds without a keystroke before a search-as-you-type runs
+
+
+def busyIndicator(widget, label=None, text:str="Searching..."):
+    """ busyIndicator(widget, label, text)
+    Returns a busy(flag) function that shows the "watch" cursor over 'widget' while work is pending and, if a
+        label is given, shows 'text' in it.
+    """
+    def busy(flag:bool):
+        try:
+            widget.configure(cursor="watch" if flag else "")
+            if label is not None:
+                label.configure(text=text if flag else "")
+        except TclError:
+            pass        #the window was closed while work was running
+    return busy
+
+
+class Debouncer:
+    """ class Debouncer(widget, function, delay)
+    Callable (e.g. as a <KeyRelease> binding) that runs function() on the Tk thread once 'delay' milliseconds
+        have passed without another call; every call restarts the wait.
+    """
+    def __init__(self, widget, function, delay:int=typingDelay):
+        self.widget = widget
+        self.function = function
+        self.delay = delay
+        self._pending = None            #after() id of the scheduled run
+
+    def __call__(self, event=None):
+        self.cancel()
+        self._pending = self.widget.after(self.delay, self._fire)
+
+    def _fire(self):
+        self._pending = None
+        self.function()
+
+    def cancel(self):
+        """ cancel()
+        Drops the scheduled run, if any.
+        """
+        if self._pending is not None:
+            try:
+                self.widget.after_cancel(self._pending)
+            except TclError:
+                pass                    #the window was closed
+            self._pending = None
+
+
+class BackgroundQueries:
+    """ class BackgroundQueries(root, busy, workers)
+    Runs submitted work on worker threads and delivers each result to the Tk thread of 'root'.
+    Input: root is any widget of the window (its after() is used to poll for results)
+           busy is an optional function called with True when work starts and False when none is left
+           workers is the number of worker threads
+    """
+    def __init__(self, root, busy=None, workers:int=queryWorkers):
+        self.root = root
+        self.busy = busy
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._finished = queue.Queue()  #(key, generation, callback, result, error) posted by the workers
+        self._latest = {}               #key -> generation of the newest submit
+        self._futures = {}              #key -> future of the newest submit
+        self._scopes = {}               #key -> QueryScope of the newest submit, to stop it once superseded
+        self._pending = 0               #submitted and neither finished nor cancelled
+        self._polling = False
+
+    def submit(self, key:str, work, done, failed=None):
+        """ submit(key, work, done, failed)
+        Runs work() on a worker thread, then calls done(result) on the Tk thread. If work raises, failed(error)
+            is called instead (by default the error is shown in a message box).
+        An earlier submit with the same 'key' that has not delivered yet is superseded.
+        """
+        generation = self._latest.get(key, 0) + 1
+        self._latest[key] = generation
+        previous = self._futures.get(key)
+        if previous is not None and previous.cancel():
+            self._pending -= 1          #never started, so it will never post a result
+        elif previous is not None and not previous.done():
+            # running: stop its statement; KILL QUERY is a round trip, so not on the Tk thread
+            threading.Thread(target=self._scopes[key].cancel, daemon=True).start()
+        scope = QueryScope()
+        self._scopes[key] = scope
+        self._futures[key] = self._executor.submit(self._run, key, generation, scope, work, done, failed)
+        self._pending += 1
+        if self.busy is not None:
+            self.busy(True)
+        if not self._polling:
+            self._polling = True
+            self.root.after(pollInterval, self._poll)
+
+    def _run(self, key, generation, scope, work, done, failed):
+        """runs on a worker thread: only posts the outcome, never calls back into Tk"""
+        try:
+            with queryScope(scope):
+                result = work()
+            self._finished.put((key, generation, done, result, None))
+        except Exception as e:
+            self._finished.put((key, generation, failed, None, e))
+
+    def _poll(self):
+        """runs on the Tk thread: delivers finished work and keeps polling while any is pending"""
+        while True:
+            try:
+                key, generation, callback, result, error = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if generation != self._latest.get(key):
+                continue                #superseded by a newer submit
+            self._futures.pop(key, None)
+            self._scopes.pop(key, None)
+            try:
+                if error is None:
+                    callback(result)
+                elif callback is not None:
+                    callback(error)
+                else:
+                    messagebox.showerror("ERROR", f"The database request failed: {error}")
+            except Exception:
+                traceback.print_exc()   #like Tk does for a failed callback; the other results still get delivered
+        try:
+            if self._pending > 0:
+                self.root.after(pollInterval, self._poll)
+                return
+        except TclError:
+            pass                        #the window was closed
+        self._polling = False
+        if self.busy is not None:
+            self.busy(False)
+
+    def shutdown(self, wait:bool=False):
+        """ shutdown(wait)
+        Cancels work that has not started, stops the running statements of work that has, and stops accepting new
+            work. With 'wait', returns once the workers have ended, so none of them borrows a connection after
+            the window closes the pool.
+        """
+        for scope in list(self._scopes.values()):
+            scope.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
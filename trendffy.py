@@ -0,0 +1,73 @@
+"""
+Name: trendffy.py
+Created: 10/18/2026
+
+Outgoing trends for the "Trends" tab of AdminView, read from outgoing_rollup (schema version 6). The rollup holds
+daily and weekly totals of outgoing_events per item name, category and food bank, and a trigger adds every new
+event to it, so a year of history is a few hundred rows per key instead of a scan of the event log.
+
+Usage:
+    with getPool().connection() as connection:
+        top = topKeys(connection, "category", "Last 12 weeks")
+        points = series(connection, "category", top[0][0], "Last 12 weeks")
+
+Notes:
+    - Weeks start on Monday, like the rollup.
+    - Periods without any outgoing quantity have no rollup row; series() fills them in with zero.
+"""
+import datetime
+
+import queryffy as sql
+
+# range shown -> (period of the rollup rows read, number of periods)
+ranges = {
+    "Last 30 days": ("day", 30),
+    "Last 12 weeks": ("week", 12),
+    "Last 52 weeks": ("week", 52),
+}
+dimensions = {"Item": "item", "Category": "category", "Food bank": "bank"}     #label -> rollup dimension
+topCount = 50           #keys listed by topKeys()
+
+
+def periodStart(day:datetime.date, period:str) -> datetime.date:
+    """ periodStart(day, period)
+    Returns the first day of the "day" or "week" period holding 'day'.
+    """
+    return day - datetime.timedelta(days=day.weekday()) if period == "week" else day
+
+
+def rangeStarts(rangeName:str, today:datetime.date=None) -> list:
+    """ rangeStarts(rangeName, today)
+    Returns the start date of every period of the range 'rangeName' (a key of ranges), oldest first, ending with
+        the period holding 'today'.
+    """
+    today = today if today is not None else datetime.date.today()
+    period, count = ranges[rangeName]
+    step = datetime.timedelta(days=7 if period == "week" else 1)
+    last = periodStart(today, period)
+    return [last - step * i for i in range(count - 1, -1, -1)]
+
+
+def topKeys(connection, dimension:str, rangeName:str, limit:int=topCount, today:datetime.date=None) -> list:
+    """ topKeys(connection, dimension, rangeName, limit, today)
+    Returns the 'limit' keys of 'dimension' with the most outgoing quantity over the range, most first, as
+        (key, label, quantity, events); the label is the food bank's location for "bank" and the key otherwise.
+    """
+    period = ranges[rangeName][0]
+    return sql.fetch(connection, "trends.top",
+                     (dimension, period, rangeStarts(rangeName, today)[0], limit, dimension))
+
+
+def series(connection, dimension:str, key, rangeName:str, today:datetime.date=None) -> list:
+    """ series(connection, dimension, key, rangeName, today)
+    Returns (period start, quantity, events) for every period of the range, oldest first, for one key of
+        'dimension', or for all outgoing quantity if 'key' is None.
+    """
+    period = ranges[rangeName][0]
+    starts = rangeStarts(rangeName, today)
+    if key is None:
+        rows = sql.fetch(connection, "trends.total", (period, starts[0]))
+    else:
+        rows = sql.fetch(connection, "trends.series", (dimension, period, str(key), starts[0]))
+    found = {row[0]: (int(row[1]), int(row[2])) for row in rows}
+    return [(start,) + found.get(start, (0, 0)) for start in starts]
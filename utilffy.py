@@ -9,11 +9,30 @@ Modifications:
     3/09/2023 Added connection function to database, fetch location, and fetch category.
     3/12/2023 Changed input parameters to connection function to all be contained in this file 
               for easy modification.
+    10/18/2026 Added ConnectionPool so every module borrows short-lived cursors from a shared set
+              of warm connections instead of opening its own.
+              fetchLocations() and fetchCategory() run the named prepared statements from queryffy.py.
+              Added allocateIds() to hand out food item and food bank IDs from the id_sequences table.
+              Added minuteOfDay(), formatMinute() and hoursToRows() for the minute-based opening_hours table.
+              Added MetadataCache: dropdown lists (locations, categories, neighborhoods, item names) are kept
+              for metadataTTL seconds and dropped by invalidateMetadata() after writes.
+              Added reserveId(): single IDs handed out from a block reserved idBlock at a time.
+              Added useDatabase() and databaseOptions() so command-line tools can point at a local database.
+              Added the backend setting: "sqlite" makes connectToDatabase() open the embedded SQLite database
+              of sqliteffy.py instead of the MySQL server. A server that cannot be reached raises an error
+              after four tries instead of exiting the program.
+              Added QueryScope and ConnectionPool.interrupt(): a running statement of superseded background
+              work is stopped from another connection (KILL QUERY on MySQL).
 """
 from tkinter import *
 from tkinter import ttk
 import mysql.connector
 from tkinter import messagebox
+from contextlib import contextmanager
+import threading
+import time
+import queryffy
+import sqliteffy
 
 font = "Helvetica"
 searchInputSize = "9"
@@ -23,6 +42,14 @@ user = "jerryp" #set username for database to variable
 password = "111" #set password for database to variable
 host = "ix-dev.cs.uoregon.edu" #set hostname to variable
 database = "foodforyou" #set database name for variable
+backend = "mysql"       #"mysql": the server above, "sqlite": the local database file below (sqliteffy.py)
+sqliteFile = "foodforyou.db"    #database file of the sqlite backend
+
+poolSize = 4            #most connections a single program keeps open to the server
+poolTimeout = 10        #seconds to wait for a free connection before giving up
+poolHealthCheck = 30    #seconds a connection may sit idle before it is pinged on checkout
+metadataTTL = 300       #seconds a cached dropdown list is used before it is read again
+idBlock = 20            #IDs reserveId() takes from a sequence at a time
 
 def use_theme(window:Tk, regFontSize):
     """ use_theme(window)
@@ -38,33 +65,77 @@ def use_theme(window:Tk, regFontSize):
     style.configure("TEntry", font=(f'{font}, {regFontSize}'))
     style.configure("TSpinbox", font=(f'{font} {regFontSize}'))
 
-def fetchLocations(cursor):
-    """ fetchLocations(cursor)
-    Pulls the existing locations from the database from the cursor.
+def fetchLocations(connection=None):
+    """ fetchLocations(connection)
+    Pulls the existing locations from the metadata cache, reading them from the database through the
+        connection (or a pooled one) when the cache has none.
     """
-    cursor.execute("SELECT fb.Location from food_bank fb order by fb.Location ASC") #selects all foodbank locations from food bank database
+    rows = metadataRows("bank.locations", connection) #selects all foodbank locations from food bank database
     locations = []
     locations.append(None)
     #for each row in the databsae
-    for row in cursor:
+    for row in rows:
         #grab the location and appends to return value
         for col in row:
             locations.append(col)
     return locations
 
-def fetchCategory(cursor):
-    """ fetchLocations(cursor)
-        Pulls the existing categories from the database from the cursor.
+def fetchCategory(connection=None):
+    """ fetchCategory(connection)
+        Pulls the existing categories from the metadata cache, reading them from the database through the
+        connection (or a pooled one) when the cache has none.
     """
-    cursor.execute("SELECT DISTINCT fi.Category from food_item fi order by fi.Category ASC") #selects all distinct categories from food bank database
+    rows = metadataRows("item.categories", connection) #selects all distinct categories from food bank database
     categories = []
     #for each row in the databsae
-    for row in cursor:
+    for row in rows:
         #grab the category and appends to return value
         for col in row:
             categories.append(col)
     return categories
 
+weekdays = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]  #index = datetime weekday()
+minutesPerDay = 24 * 60
+
+def minuteOfDay(text):
+    """ minuteOfDay(text)
+    Converts a time of day written as "H:MM" or "H:MM:SS" (or a datetime.time) to minutes after midnight.
+    Returns None for an empty value, which is how a closed day is stored in the old hours columns.
+    """
+    if text is None or str(text).strip() == "":
+        return None
+    hour, minute = str(text).strip().split(":")[:2]
+    return int(hour) * 60 + int(minute)
+
+def formatMinute(minute:int) -> str:
+    """ formatMinute(minute)
+    Formats minutes after midnight the way the hours were always displayed, e.g. 570 -> "9:30:00".
+    """
+    hour, minute = divmod(minute % minutesPerDay, 60)
+    return f"{hour}:{minute:02}:00"
+
+def hoursToRows(fb_ID:int, times:list) -> list:
+    """ hoursToRows(fb_ID, times)
+    Converts the 14 open/close values of the old hours layout (Monday, Monday_close, ... Sunday_close) into
+        opening_hours rows (fb_ID, weekday, open_minute, close_minute); closed days produce no row.
+    Notes:
+        - "0:00" to "0:00" means open all day and becomes 0 to 1440
+        - a closing time before the opening time that is still in the morning is read as afternoon
+            (12:00 to 4:00 becomes 12:00 to 16:00), which is how such times were entered
+    """
+    rows = []
+    for weekday in range(7):
+        opening, closing = minuteOfDay(times[2 * weekday]), minuteOfDay(times[2 * weekday + 1])
+        if opening is None or closing is None:
+            continue
+        if opening == closing == 0:
+            closing = minutesPerDay
+        elif closing < opening and closing < 12 * 60:
+            closing += 12 * 60
+        if closing > opening:
+            rows.append((fb_ID, weekday, opening, closing))
+    return rows
+
 def connectToDatabase():
     """ connectToDatabase(user, password, host, port, database)
     user: username
@@ -72,14 +143,14 @@ def connectToDatabase():
     host: server name
     port: port number
     database: database name
-    This function creates a connection to the MySQL database.
+    This function creates a connection to the MySQL database, or opens sqliteFile if backend is "sqlite".
+    Raises the last connection error (one of databaseErrors) once 4 connection attempts have failed.
     """
+    if backend == "sqlite":
+        return sqliteffy.connect(sqliteFile, timeout=poolTimeout) #no network, so nothing to retry
     dbconnect = None #Initialize variable to connection
     counter = 0 #initialize counter for connection tries
     while dbconnect is None: #while the connection is not initialized we will keep trying to connect
-        if (counter >= 4): #once 4 connection attempts have been failed, exit the program.
-            print("Check connection to internet")
-            exit()
         try:
             dbconnect = mysql.connector.connect(
                 host=host,
@@ -88,8 +159,430 @@ def connectToDatabase():
                 port=port,
                 database=database) #use mysql connector with the database parameters for a connection
             # print("Connected")
-        except:
+        except mysql.connector.Error:
             print("Connection failed") #when connection fails, catch exception 
             dbconnect = None
             counter += 1 #increment counter by 1
-    return dbconnect #return connection to file calling function.
\ No newline at end of file
+            if (counter >= 4): #once 4 connection attempts have been failed, give up
+                print("Check connection to internet")
+                raise
+    return dbconnect #return connection to file calling function.
+
+databaseErrors = (mysql.connector.Error, sqliteffy.Error)   #errors raised by the connections of either backend
+
+
+class QueryCancelled(Exception):
+    """raised when cancelled work borrows another pooled connection"""
+
+
+class QueryScope:
+    """ class QueryScope()
+    Keeps track of the pooled connections borrowed by the code running inside it ("with queryScope(scope):"),
+        so another thread can stop that code's running statement with cancel(). taskffy.py runs every piece of
+        background work in its own scope, so a superseded search stops using the database.
+    """
+    def __init__(self):
+        self.cancelled = False
+        self._held = {}                 #id(connection) -> (connection, pool) borrowed and not yet released
+        self._lock = threading.Lock()   #held while cancelling, so no connection goes back to its pool mid-KILL
+
+    def cancel(self):
+        """ cancel()
+        Stops the statements running on the scope's connections; they fail with a database error. Borrowing
+            another connection inside the scope raises QueryCancelled from then on.
+        """
+        with self._lock:
+            self.cancelled = True
+            for connection, pool in list(self._held.values()):
+                pool.interrupt(connection)
+
+    def _borrowed(self, connection, pool):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("the background work was cancelled")
+            self._held[id(connection)] = (connection, pool)
+
+    def _returned(self, connection):
+        with self._lock:
+            self._held.pop(id(connection), None)
+
+_scopes = threading.local()     #.current: the QueryScope of the code running on this thread, if any
+
+@contextmanager
+def queryScope(scope:QueryScope):
+    """ queryScope(scope)
+    Context manager under which every connection borrowed from a ConnectionPool by this thread is part of 'scope'.
+    """
+    previous = getattr(_scopes, "current", None)
+    _scopes.current = scope
+    try:
+        yield scope
+    finally:
+        _scopes.current = previous
+
+
+class ConnectionPool:
+    """ class ConnectionPool(size, timeout, connect)
+    Keeps up to 'size' open connections to the database and lends them out one operation at a time.
+        - Idle connections are reused most-recently-used first, since those are the warmest.
+        - A connection that sat idle longer than poolHealthCheck seconds is pinged (and reconnected
+            if the server dropped it) before it is handed out.
+        - Callers block for up to 'timeout' seconds when every connection is busy; the time spent
+            waiting is recorded and reported by stats().
+    Input: size is the maximum number of open connections
+           timeout is how long acquire() waits for a free connection
+           connect is the function used to open a new connection (defaults to connectToDatabase)
+    """
+    def __init__(self, size:int=poolSize, timeout:float=poolTimeout, connect=None):
+        self.size = size
+        self.timeout = timeout
+        self.connect = connect if connect is not None else connectToDatabase
+        self._idle = []                         #stack of (connection, time it was released)
+        self._opened = 0                        #connections currently open (idle + in use)
+        self._lock = threading.Condition()      #guards every counter below
+        self._checkouts = 0                     #number of acquire() calls served
+        self._waits = 0                         #number of acquire() calls that had to wait
+        self._waitTime = 0.0                    #total seconds spent waiting
+        self._maxWait = 0.0                     #longest single wait
+        self._reconnects = 0                    #stale connections that had to be replaced
+        self._killer = None                     #connection interrupt() sends KILL QUERY on, opened on first use
+        self._killLock = threading.Lock()       #one KILL at a time on that connection
+
+    def acquire(self):
+        """ acquire()
+        Returns an open connection, waiting for one to be released if the pool is exhausted.
+        Raises mysql.connector.errors.PoolError if none frees up within self.timeout seconds.
+        """
+        start = time.monotonic()
+        waited = False
+        with self._lock:
+            while True:
+                if self._idle:                          #reuse the warmest idle connection
+                    connection, lastUsed = self._idle.pop()
+                    break
+                if self._opened < self.size:            #room to open a new one
+                    self._opened += 1
+                    connection, lastUsed = None, None
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise mysql.connector.errors.PoolError(
+                        f"No free database connection after {self.timeout} seconds (pool size {self.size})")
+                waited = True
+                self._lock.wait(remaining)
+            elapsed = time.monotonic() - start
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._waitTime += elapsed
+                self._maxWait = max(self._maxWait, elapsed)
+
+        try:
+            if connection is None:
+                connection = self.connect()
+            elif time.monotonic() - lastUsed > poolHealthCheck:
+                connection = self._checkHealth(connection)
+        except BaseException:
+            self._forget()      #the slot is free again if the connection could not be opened
+            raise
+        return connection
+
+    def release(self, connection):
+        """ release(connection)
+        Returns a borrowed connection to the pool. Any transaction left open is rolled back so the
+            next borrower never inherits locks or uncommitted changes.
+        """
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except databaseErrors:
+            connection.close()
+            self._forget()
+            return
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+            self._lock.notify()
+
+    def _checkHealth(self, connection):
+        """ _checkHealth(connection)
+        Pings a connection that has been idle for a while, replacing it if the server dropped it.
+        """
+        try:
+            connection.ping(reconnect=False)
+            return connection
+        except databaseErrors:
+            with self._lock:
+                self._reconnects += 1
+            try:
+                connection.close()
+            except databaseErrors:
+                pass
+            return self.connect()
+
+    def _forget(self):
+        """ _forget()
+        Frees the slot of a connection that was closed instead of being returned to the pool.
+        """
+        with self._lock:
+            self._opened -= 1
+            self._lock.notify()
+
+    def interrupt(self, connection):
+        """ interrupt(connection)
+        Stops the statement a borrowed connection is running, if any; it fails with a database error in the
+            thread that ran it. On MySQL this sends KILL QUERY over a connection of its own, kept open outside the
+            pool's size; on SQLite it interrupts the connection directly. Does nothing if the statement already finished.
+        """
+        if getattr(connection, "dialect", "mysql") == "sqlite":
+            connection.interrupt()
+            return
+        with self._killLock:
+            try:
+                if self._killer is None:
+                    self._killer = self.connect()
+                cursor = self._killer.cursor()
+                try:
+                    cursor.execute(f"KILL QUERY {int(connection.connection_id)}")
+                finally:
+                    cursor.close()
+            except databaseErrors:
+                if self._killer is not None and not self._killer.is_connected():
+                    self._killer = None         #open a new one next time; a finished statement needs nothing
+
+    @contextmanager
+    def connection(self):
+        """ connection()
+        Context manager which borrows a connection for the duration of a 'with' block. Inside a queryScope()
+            the connection belongs to that scope until it is returned.
+        """
+        connection = self.acquire()
+        scope = getattr(_scopes, "current", None)
+        try:
+            if scope is not None:
+                scope._borrowed(connection, self)
+            yield connection
+        finally:
+            if scope is not None:
+                scope._returned(connection)
+            self.release(connection)
+
+    @contextmanager
+    def cursor(self, commit:bool=False, **options):
+        """ cursor(commit, **options)
+        Context manager which borrows a connection and yields a fresh cursor for one operation.
+            - commit: commits the transaction when the 'with' block finishes without an error
+            - options: passed on to connection.cursor() (e.g. buffered=True, prepared=True)
+        Any error inside the block rolls the transaction back before it is re-raised.
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor(**options)
+            try:
+                yield cursor
+                if commit:
+                    connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+            finally:
+                try:
+                    cursor.close()
+                except databaseErrors:
+                    pass        #unbuffered cursor with unread rows, release() rolls back the rest
+
+    def stats(self) -> dict:
+        """ stats()
+        Reports the pool size and how long callers have waited for a connection.
+        """
+        with self._lock:
+            return {"size": self.size,
+                    "open": self._opened,
+                    "idle": len(self._idle),
+                    "in_use": self._opened - len(self._idle),
+                    "checkouts": self._checkouts,
+                    "waits": self._waits,
+                    "total_wait": self._waitTime,
+                    "max_wait": self._maxWait,
+                    "avg_wait": self._waitTime / self._waits if self._waits else 0.0,
+                    "reconnects": self._reconnects}
+
+    def closeAll(self):
+        """ closeAll()
+        Closes every idle connection. Called when a program's main window is closed.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        with self._killLock:
+            if self._killer is not None:
+                idle.append((self._killer, None))
+                self._killer = None
+        for connection, lastUsed in idle:
+            try:
+                connection.close()
+            except databaseErrors:
+                pass
+
+
+_pool = None                    #shared pool for this program, created on first use
+_poolLock = threading.Lock()    #makes sure only one pool is created
+
+def getPool() -> ConnectionPool:
+    """ getPool()
+    Returns the program-wide connection pool, creating it on first use.
+    """
+    global _pool
+    with _poolLock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+def closePool():
+    """ closePool()
+    Closes every connection held by the program-wide pool.
+    """
+    if _pool is not None:
+        _pool.closeAll()
+
+databaseSettings = ("host", "port", "user", "password", "database", "backend", "sqliteFile")  #module settings useDatabase() may change
+databaseFlags = {"sqliteFile": "--sqlite-file"}     #command-line option of a setting, when it is not --<setting>
+
+def useDatabase(**settings):
+    """ useDatabase(host, port, user, password, database, backend, sqliteFile)
+    Points every connection opened from now on at another server, database or backend, e.g. a local one for
+        benchmarks; settings left out (or None) keep their values. Connections the program-wide pool holds are closed.
+    """
+    unknown = set(settings) - set(databaseSettings)
+    if unknown:
+        raise TypeError(f"unknown database settings: {', '.join(sorted(unknown))}")
+    globals().update({name: value for name, value in settings.items() if value is not None})
+    closePool()
+
+def databaseOptions(parser):
+    """ databaseOptions(parser)
+    Adds --host, --port, --user, --password, --database, --backend and --sqlite-file to an argparse parser; pass the
+        parsed arguments' values (named like the settings) to useDatabase() to apply them.
+    """
+    for name in databaseSettings:
+        parser.add_argument(databaseFlags.get(name, f"--{name}"), dest=name, type=int if name == "port" else str,
+                            default=None, choices=("mysql", "sqlite") if name == "backend" else None,
+                            help=f"database {name} (default: {globals()[name]})" if name != "password" else "database password")
+
+def allocateIds(name:str, count:int=1, pool:ConnectionPool=None) -> int:
+    """ allocateIds(name, count, pool)
+    Reserves 'count' consecutive IDs from the sequence 'name' ("food_item" or "food_bank") and returns the first one.
+    The sequence row is advanced and read back in a single statement and committed on its own connection right
+        away, so two terminals can never be handed the same ID and the row lock is held only for that statement.
+        IDs reserved by a save that is later cancelled are simply skipped.
+    Uses the program-wide pool unless another 'pool' is given.
+    Requires schema version 2 (python3 migrateffy.py upgrade).
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    pool = pool if pool is not None else getPool()
+    with pool.connection() as connection:
+        changed = queryffy.execute(connection, "sequence.advance", (count, name))
+        nextId = queryffy.lastInsertId(connection, "sequence.advance")
+        connection.commit()
+    if changed != 1:
+        raise mysql.connector.errors.ProgrammingError(
+            f"No '{name}' sequence in id_sequences, run 'python3 migrateffy.py upgrade' first")
+    return nextId - count
+
+
+_idBlocks = {}                  #sequence name -> [next id, end] of the block this program holds
+_idLock = threading.Lock()
+
+def reserveId(name:str) -> int:
+    """ reserveId(name)
+    Returns one unused ID from the sequence 'name', taken from a block of idBlock IDs that this program reserves
+        with allocateIds() when the previous block runs out, so most new rows cost no extra round trip.
+    IDs left in the block when the program exits are skipped, like those of a cancelled save.
+    """
+    with _idLock:
+        block = _idBlocks.get(name)
+        if block is None or block[0] >= block[1]:
+            first = allocateIds(name, idBlock)
+            block = _idBlocks[name] = [first, first + idBlock]
+        block[0] += 1
+        return block[0] - 1
+
+
+class MetadataCache:
+    """ class MetadataCache(ttl)
+    Keeps the rows of the small lookup statements behind the dropdowns ("bank.locations", "item.categories",
+        "bank.neighborhoods", "item.names") for 'ttl' seconds, so opening a dialog does not scan the tables again.
+        - Programs that change those lists call invalidate() right after committing.
+        - Changes made by other programs show up once the entry is older than 'ttl'.
+        - Hits and misses are counted and reported by stats().
+        - Rows read while invalidate() runs are returned but not kept, since they may be from before the change.
+    """
+    def __init__(self, ttl:float=metadataTTL):
+        self.ttl = ttl
+        self._entries = {}              #statement name -> (rows, time loaded)
+        self._generation = 0            #bumped by invalidate(); a load begun under an older one is not kept
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def rows(self, name:str, connection=None) -> list:
+        """ rows(name, connection)
+        Returns a copy of the rows of statement 'name', reading them through 'connection' (or a pooled
+            connection) when they are missing or older than the ttl.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self._hits += 1
+                return list(entry[0])
+            self._misses += 1
+            generation = self._generation
+        if connection is not None:
+            rows = queryffy.fetch(connection, name)
+        else:
+            with getPool().connection() as borrowed:
+                rows = queryffy.fetch(borrowed, name)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[name] = (tuple(rows), time.monotonic())
+        return list(rows)
+
+    def invalidate(self, *names):
+        """ invalidate(names)
+        Drops the cached rows of the given statements, or of every statement if none are given.
+        """
+        with self._lock:
+            self._generation += 1
+            if names:
+                for name in names:
+                    self._entries.pop(name, None)
+            else:
+                self._entries.clear()
+
+    def stats(self) -> dict:
+        """ stats()
+        Returns the number of hits and misses and the statements currently cached.
+        """
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "cached": sorted(self._entries)}
+
+
+_metadata = MetadataCache()     #dropdown lists shared by the whole program
+
+def metadataRows(name:str, connection=None) -> list:
+    """ metadataRows(name, connection)
+    Returns the rows of lookup statement 'name' from the program-wide metadata cache.
+    """
+    return _metadata.rows(name, connection)
+
+def invalidateMetadata(*names):
+    """ invalidateMetadata(names)
+    Drops the given lookup statements (or all of them) from the program-wide metadata cache; call after a commit
+        that adds or removes food banks, categories or item names.
+    """
+    _metadata.invalidate(*names)
+
+def metadataStats() -> dict:
+    """ metadataStats()
+    Returns the hit and miss counters of the program-wide metadata cache.
+    """
+    return _metadata.stats()